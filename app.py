@@ -1,80 +1,166 @@
+import importlib
+import time
+import uuid
 import streamlit as st
-from config import get_projeto_config
-from utils_dados import get_all_issues 
-from view_datas_sprints import sprint_tab
-from view_burndown import burndown_tab
-from view_visao_geral import dados_gerais
-from view_todas_issues import all_issues_tab
-from view_performance_time import desempenho_tab
-from view_entregas_dev import entregas_tab
-from view_metricas_projeto import entregas_projeto_tab
-from utils_performance import cache_jira_data, measure_performance, show_performance_metrics
+from config import ORCAMENTO_CHAMADAS_RENDER, PROJETOS, get_projeto_config
+from utils_carregamento import iniciar_prefetch, invalidar_projeto, obter_dados_projeto, progresso_projeto
+from utils_armazenamento import idade_snapshot, versao_publicada
+from utils_frescor import invalidar_fontes, sondar_frescor
+from utils_quota import definir_sessao
+from utils_performance import cache_jira_data, measure_performance, show_api_metrics, show_performance_metrics
+from utils_requisicoes import contabilizar, nova_contabilidade
+from utils_tracing import definir_sessao_trace, span
 
 st.set_page_config(page_title="Métricas Jira", layout="wide", page_icon="📊")
 
-st.sidebar.title("Painel de Controle")
-projeto_selecionado = st.sidebar.selectbox("Selecione o Projeto", ["PROJETO 1", "PROJETO 2"])
-
-jira_url, board_id, headers = get_projeto_config(projeto_selecionado)
+if 'sessao_id' not in st.session_state:
+    st.session_state.sessao_id = uuid.uuid4().hex
+definir_sessao(st.session_state.sessao_id)
+definir_sessao_trace(st.session_state.sessao_id)
+if 'api_sessao' not in st.session_state:
+    st.session_state.api_sessao = nova_contabilidade()
+
+PAGINAS = {
+    "📊 Dados Gerais": ("view_visao_geral", "dados_gerais"),
+    "📋 Datas das Sprints": ("view_datas_sprints", "sprint_tab"),
+    "📉 Burndown Atual": ("view_burndown", "burndown_tab"),
+    "📊 Desempenho por Sprint": ("view_performance_time", "desempenho_tab"),
+    "🚀 Desempenho por Desenvolvedor": ("view_entregas_dev", "entregas_tab"),
+    "📦 Entregas do Projeto": ("view_metricas_projeto", "entregas_projeto_tab"),
+    "📈 Todas Issues do Projeto": ("view_todas_issues", "all_issues_tab"),
+    "🌐 Visão entre Projetos": ("view_visao_projetos", "visao_projetos_tab"),
+}
+
+PAGINAS_PARCIAIS = {"📊 Dados Gerais", "📈 Todas Issues do Projeto"}
+INTERVALO_PROGRESSO = 1.0
+
+def carregar_pagina(nome_pagina):
+    modulo, funcao = PAGINAS[nome_pagina]
+    return getattr(importlib.import_module(modulo), funcao)
 
 @measure_performance
 @cache_jira_data(ttl=600)
-def load_all_data(_jira_url, _board_id, _headers):
-    return get_all_issues(_jira_url, _board_id, _headers)
+def load_all_data(nome_projeto):
+    dados = obter_dados_projeto(nome_projeto)
+    return dados["issues"], dados["versao"], dados["marca"]
 
-cache_key = f"jira_data_{projeto_selecionado}"
+def mostrar_progresso(progresso):
+    carregadas = len(progresso["issues"])
+    total = progresso["total"]
+    texto = f"🔄 Carregando {projeto_selecionado}: {progresso['paginas']} página(s), {carregadas}" + (f" de {total}" if total else "") + " issues"
+    if progresso["eta"] is not None:
+        texto += f" · faltam ~{progresso['eta']:.0f}s"
+    st.progress(min(1.0, carregadas / total) if total else 0.0, text=texto)
 
-if cache_key not in st.session_state:
-    with st.spinner(f"🔄 Carregando dados do {projeto_selecionado}..."):
-        try:
-            st.session_state[cache_key] = load_all_data(jira_url, board_id, headers)
-        except Exception as e:
-            st.error(f"Erro ao carregar dados: {e}")
-            st.stop()
+with contabilizar(st.session_state.api_sessao) as contabilidade_rerun:
+    st.sidebar.title("Painel de Controle")
+    projeto_selecionado = st.sidebar.selectbox("Selecione o Projeto", list(PROJETOS))
+
+    jira_url, board_id, headers = get_projeto_config(projeto_selecionado)
+    iniciar_prefetch(prioritario=projeto_selecionado)
 
-all_issues_data = st.session_state[cache_key]
-
-pagina = st.sidebar.radio(
-    "Selecione a Página:",
-    options=[
-        "📊 Dados Gerais",
-        "📋 Datas das Sprints", 
-        "📉 Burndown Atual",
-        "📊 Desempenho por Sprint",
-        "🚀 Desempenho por Desenvolvedor",
-        "📦 Entregas do Projeto",
-        "📈 Todas Issues do Projeto",
-    ]
-)
-
-st.sidebar.markdown("---")
-show_performance_metrics()
-
-if st.sidebar.button("🔄 Atualizar Cache"):
     cache_key = f"jira_data_{projeto_selecionado}"
-    if cache_key in st.session_state:
+    versao_key = f"versao_{cache_key}"
+    marca_key = f"marca_{cache_key}"
+    publicada_key = f"publicada_{cache_key}"
+
+    publicada = versao_publicada(jira_url)
+    if cache_key in st.session_state and st.session_state.get(publicada_key) != publicada:
         del st.session_state[cache_key]
-    if 'jira_cache' in st.session_state:
         st.session_state.jira_cache = {}
+        invalidar_projeto(projeto_selecionado)
+
+    progresso = None
+    if cache_key not in st.session_state:
+        progresso = progresso_projeto(projeto_selecionado)
+        if progresso["status"] == "erro":
+            st.error(f"Erro ao carregar dados do {projeto_selecionado}: {progresso['erro']}")
+            if st.button("🔁 Tentar novamente"):
+                invalidar_projeto(projeto_selecionado)
+                st.rerun()
+            st.stop()
+        if progresso["pronto"]:
+            progresso = None
+            with st.spinner(f"🔄 Carregando dados do {projeto_selecionado}..."):
+                try:
+                    st.session_state[cache_key], st.session_state[versao_key], st.session_state[marca_key] = load_all_data(projeto_selecionado)
+                    st.session_state[publicada_key] = publicada
+                except Exception as e:
+                    st.error(f"Erro ao carregar dados: {e}")
+                    st.stop()
+
+    all_issues_data = progresso["issues"] if progresso is not None else st.session_state[cache_key]
+
+    pagina = st.sidebar.radio(
+        "Selecione a Página:",
+        options=list(PAGINAS)
+    )
+
+    idade_dados = idade_snapshot(jira_url, board_id)
+    if idade_dados is not None:
+        st.sidebar.caption(f"📦 Dados locais sincronizados há {idade_dados / 60:.0f} min")
+
+    st.sidebar.markdown("---")
+    painel_performance = st.sidebar.container()
+    painel_api = st.sidebar.container()
+
+    if st.sidebar.button("🔄 Atualizar Cache"):
+        with st.sidebar, st.spinner("Verificando alterações no Jira..."):
+            fontes, st.session_state[marca_key] = sondar_frescor(jira_url, board_id, headers, st.session_state.get(marca_key))
+        invalidados = invalidar_fontes(fontes, jira_url, board_id, headers)
+        if "issues" in fontes:
+            if cache_key in st.session_state:
+                del st.session_state[cache_key]
+            if 'jira_cache' in st.session_state:
+                st.session_state.jira_cache = {}
+            invalidar_projeto(projeto_selecionado)
+            invalidados.insert(0, "issues do projeto")
+        st.session_state.frescor = invalidados
+        st.rerun()
+
+    if "frescor" in st.session_state:
+        invalidados = st.session_state.pop("frescor")
+        st.sidebar.caption(f"♻️ Recarregados: {', '.join(invalidados)}" if invalidados else "✅ Dados já estavam atualizados")
+
+    carregando = progresso is not None and pagina in PAGINAS_PARCIAIS
+    if carregando:
+        mostrar_progresso(progresso)
+
+    modulo_pagina = PAGINAS[pagina][0]
+    with span(f"import.{modulo_pagina}"):
+        renderizar_pagina = carregar_pagina(pagina)
+
+    with span(f"render.{modulo_pagina}"):
+        if carregando and not all_issues_data:
+            st.info("Aguardando a primeira página de issues do Jira...")
+
+        elif pagina == "📊 Dados Gerais":
+            renderizar_pagina(jira_url, board_id, headers, all_issues_data)
+
+        elif pagina == "📋 Datas das Sprints":
+            renderizar_pagina(jira_url, board_id, headers)
+
+        elif pagina == "📉 Burndown Atual":
+            renderizar_pagina(jira_url, board_id, headers)
+
+        elif pagina == "📊 Desempenho por Sprint":
+            renderizar_pagina(jira_url, board_id, headers)
+
+        elif pagina == "🚀 Desempenho por Desenvolvedor":
+            renderizar_pagina(jira_url, board_id, headers)
+
+        elif pagina == "📦 Entregas do Projeto":
+            renderizar_pagina(jira_url, board_id, headers)
+
+        elif pagina == "📈 Todas Issues do Projeto":
+            renderizar_pagina(jira_url, board_id, headers, all_issues_data, st.session_state.get(versao_key) if progresso is None else None)
+
+        elif pagina == "🌐 Visão entre Projetos":
+            renderizar_pagina()
+
+show_performance_metrics(painel_performance)
+show_api_metrics(contabilidade_rerun, st.session_state.api_sessao, ORCAMENTO_CHAMADAS_RENDER, painel_api)
+
+if carregando:
+    time.sleep(INTERVALO_PROGRESSO)
     st.rerun()
-
-if pagina == "📊 Dados Gerais":
-    dados_gerais(jira_url, board_id, headers, all_issues_data)
-
-elif pagina == "📋 Datas das Sprints":
-    sprint_tab(jira_url, board_id, headers)
-
-elif pagina == "📉 Burndown Atual":
-    burndown_tab(jira_url, board_id, headers)
-
-elif pagina == "📊 Desempenho por Sprint":
-    desempenho_tab(jira_url, board_id, headers)
-
-elif pagina == "🚀 Desempenho por Desenvolvedor":
-    entregas_tab(jira_url, board_id, headers, all_issues_data)
-
-elif pagina == "📦 Entregas do Projeto":
-    entregas_projeto_tab(jira_url, board_id, headers)
-
-elif pagina == "📈 Todas Issues do Projeto":
-    all_issues_tab(jira_url, board_id, headers, all_issues_data)
\ No newline at end of file
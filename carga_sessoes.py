@@ -0,0 +1,379 @@
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(DIRETORIO, "app.py")
+
+STATUS = [("A Fazer", "To Do"), ("Em Andamento", "In Progress"), ("Em Revisão", "In Progress"), ("Concluído", "Done")]
+TIPOS = ["História", "Tarefa", "Melhoria", "Problema", "Correção"]
+DEVS = ["Ana Souza", "Bruno Lima", "Carla Dias", "Diego Alves", "Elisa Rocha", "Fábio Melo", "Gabriela Nunes"]
+DURACAO_SPRINT = 14
+PERCENTIS = (50, 95, 99)
+
+
+def formatar_data(data):
+    return data.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+
+
+def gerar_projeto(board_id, project_id, qtd_issues, qtd_sprints, rng):
+    hoje = datetime.now(timezone.utc).replace(microsecond=0)
+    inicio_historico = hoje - timedelta(days=DURACAO_SPRINT * (qtd_sprints - 1))
+
+    sprints = []
+    for numero in range(qtd_sprints):
+        inicio = inicio_historico + timedelta(days=DURACAO_SPRINT * numero)
+        fim = inicio + timedelta(days=DURACAO_SPRINT - 1)
+        ativa = numero == qtd_sprints - 1
+        sprints.append({
+            "id": board_id * 1000 + numero + 1,
+            "name": f"Sprint {numero + 1}",
+            "state": "active" if ativa else "closed",
+            "startDate": inicio.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "endDate": fim.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            **({} if ativa else {"completeDate": fim.strftime("%Y-%m-%dT%H:%M:%S.000Z")}),
+            "originBoardId": board_id,
+        })
+
+    issues, changelogs = [], {}
+    for numero in range(qtd_issues):
+        criado = inicio_historico + timedelta(seconds=rng.uniform(0, (hoje - inicio_historico).total_seconds()))
+        sprint = sprints[min(qtd_sprints - 1, (criado - inicio_historico).days // DURACAO_SPRINT)]
+        etapa_final = rng.choices(range(len(STATUS)), weights=[1, 1, 1, 4])[0]
+
+        historico, data = [], criado
+        for etapa in range(etapa_final):
+            data = min(hoje, data + timedelta(hours=rng.uniform(2, 72)))
+            historico.append({
+                "id": str(len(historico) + 1),
+                "created": formatar_data(data),
+                "items": [{"field": "status", "fromString": STATUS[etapa][0], "toString": STATUS[etapa + 1][0]}],
+            })
+
+        nome_status, categoria = STATUS[etapa_final]
+        issue_id = str(project_id * 100000 + numero + 1)
+        issues.append({
+            "id": issue_id,
+            "key": f"P{project_id}-{numero + 1}",
+            "fields": {
+                "summary": f"Item {numero + 1}",
+                "status": {"name": nome_status, "statusCategory": {"name": categoria}},
+                "issuetype": {"name": rng.choice(TIPOS)},
+                "assignee": {"displayName": rng.choice(DEVS)},
+                "priority": {"name": rng.choice(["Alta", "Média", "Baixa"])},
+                "created": formatar_data(criado),
+                "updated": formatar_data(data),
+                "resolutiondate": formatar_data(data) if categoria == "Done" else None,
+                "timetracking": {"originalEstimate": f"{rng.randint(1, 16)}h", "timeSpent": f"{rng.randint(0, 16)}h"},
+                "subtasks": [{"fields": {"summary": "Bug na validação"}}] if rng.random() < 0.1 else [],
+                "customfield_10020": [sprint],
+                "worklog": {"worklogs": []},
+            },
+        })
+        changelogs[issue_id] = historico
+
+    issues.sort(key=lambda issue: issue["fields"]["created"], reverse=True)
+    return {"board_id": board_id, "project_id": str(project_id), "sprints": sprints, "issues": issues, "changelogs": changelogs}
+
+
+def _data_jql(valor):
+    return datetime.fromisoformat(valor).replace(tzinfo=timezone.utc)
+
+
+def filtrar_jql(projetos, jql):
+    condicoes, _, ordem = jql.partition(" ORDER BY ")
+    issues = [issue for projeto in projetos.values() for issue in projeto["issues"]]
+
+    if m := re.search(r'project = "?([^"\s]+)"?', condicoes):
+        issues = [i for i in issues if i["id"].startswith(m.group(1)) and len(i["id"]) == len(m.group(1)) + 5]
+    if m := re.search(r"sprint = (\d+)", condicoes):
+        issues = [i for i in issues if any(s["id"] == int(m.group(1)) for s in i["fields"]["customfield_10020"])]
+    if m := re.search(r"key in \(([^)]*)\)", condicoes):
+        chaves = {chave.strip().strip('"') for chave in m.group(1).split(",")}
+        issues = [i for i in issues if i["key"] in chaves]
+    if m := re.search(r'created >= "([^"]+)"', condicoes):
+        issues = [i for i in issues if datetime.strptime(i["fields"]["created"], "%Y-%m-%dT%H:%M:%S.%f%z") >= _data_jql(m.group(1))]
+    if m := re.search(r'created < "([^"]+)"', condicoes):
+        issues = [i for i in issues if datetime.strptime(i["fields"]["created"], "%Y-%m-%dT%H:%M:%S.%f%z") < _data_jql(m.group(1))]
+    if "statusCategory = Done" in condicoes:
+        issues = [i for i in issues if i["fields"]["status"]["statusCategory"]["name"] == "Done"]
+    if m := re.search(r'resolutiondate >= "([^"]+)"', condicoes):
+        issues = [i for i in issues if i["fields"]["resolutiondate"] and i["fields"]["resolutiondate"][:10] >= m.group(1)]
+    if m := re.search(r"updated >= -(\d+)m", condicoes):
+        limite = formatar_data(datetime.now(timezone.utc) - timedelta(minutes=int(m.group(1))))
+        issues = [i for i in issues if i["fields"]["updated"] >= limite]
+
+    if ordem.startswith("created"):
+        issues = sorted(issues, key=lambda i: i["fields"]["created"], reverse=ordem.endswith("DESC"))
+    return issues
+
+
+def criar_jira_falso(projetos, latencia):
+    from utils_requisicoes import classificar_endpoint
+
+    chamadas = Counter()
+    lock = threading.Lock()
+    boards = {projeto["board_id"]: projeto for projeto in projetos.values()}
+
+    class JiraFalso(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _responder(self, dados, status=200):
+            corpo = json.dumps(dados).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def _registrar(self, caminho):
+            with lock:
+                chamadas[classificar_endpoint(caminho)] += 1
+            if latencia:
+                time.sleep(latencia)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+            self._registrar(url.path)
+
+            if m := re.fullmatch(r"/rest/agile/1\.0/board/(\d+)", url.path):
+                projeto = boards.get(int(m.group(1)))
+                return self._responder({"id": projeto["board_id"], "location": {"projectId": projeto["project_id"]}})
+            if m := re.fullmatch(r"/rest/agile/1\.0/board/(\d+)/sprint", url.path):
+                return self._responder({"values": boards[int(m.group(1))]["sprints"], "isLast": True})
+            if url.path == "/rest/api/3/search/jql":
+                issues = filtrar_jql(projetos, params.get("jql", ""))
+                inicio = int(params.get("nextPageToken") or 0)
+                fim = inicio + int(params.get("maxResults", 50))
+                resposta = {"issues": issues[inicio:fim], "isLast": fim >= len(issues)}
+                if fim < len(issues):
+                    resposta["nextPageToken"] = str(fim)
+                return self._responder(resposta)
+            if url.path == "/rest/api/3/status":
+                return self._responder([{"name": nome, "statusCategory": {"name": categoria}} for nome, categoria in STATUS])
+            if m := re.fullmatch(r"/rest/api/3/issue/([^/]+)/changelog", url.path):
+                issue = next((i for p in projetos.values() for i in p["issues"] if m.group(1) in (i["key"], i["id"])), None)
+                historico = next(p["changelogs"].get(issue["id"], []) for p in projetos.values()) if issue else []
+                return self._responder({"values": historico, "isLast": True})
+            self._responder({"errorMessages": [f"Não simulado: {url.path}"]}, 404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            corpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            self._registrar(url.path)
+
+            if url.path == "/rest/api/3/search/approximate-count":
+                return self._responder({"count": len(filtrar_jql(projetos, corpo.get("jql", "")))})
+            if url.path == "/rest/api/3/changelog/bulkfetch":
+                historicos = {}
+                for projeto in projetos.values():
+                    historicos.update(projeto["changelogs"])
+                ids = [str(i) for i in corpo.get("issueIdsOrKeys", [])]
+                return self._responder({
+                    "issueChangeLogs": [{"issueId": i, "changeHistories": historicos.get(i, [])} for i in ids]
+                })
+            self._responder({"errorMessages": [f"Não simulado: {url.path}"]}, 404)
+
+        def log_message(self, formato, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), JiraFalso)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, chamadas
+
+
+def compartilhar_runtime_apptest():
+    # O AppTest cria e descarta um Runtime global a cada run; com sessões em threads paralelas,
+    # todas passam a enxergar um único Runtime simulado, como acontece no servidor real.
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    compartilhado = MagicMock(spec=Runtime)
+    compartilhado.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    compartilhado.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or compartilhado)
+    Runtime.exists = classmethod(lambda cls: True)
+    config.set_option("global.appTest", True)
+
+
+def memoria_mb():
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def _executar(app, registro, acao):
+    inicio = time.perf_counter()
+    app.run()
+    registro["reruns"].append({"acao": acao, "segundos": time.perf_counter() - inicio})
+    if app.exception:
+        registro["erros"].append(f"{acao}: {app.exception[0].message}")
+
+
+def _alterar_filtro(app, rng):
+    widgets = [w for w in [*app.main.selectbox, *app.main.multiselect, *app.main.slider] if not w.disabled]
+    if not widgets:
+        return False
+    widget = rng.choice(widgets)
+    if widget.type == "multiselect":
+        widget.set_value(rng.sample(list(widget.options), k=rng.randint(1, len(widget.options))))
+    elif widget.type == "selectbox":
+        widget.select(rng.choice(list(widget.options)))
+    else:
+        widget.set_value(rng.randint(int(widget.min), int(widget.max)) if isinstance(widget.min, int) else widget.value)
+    return True
+
+
+def simular_sessao(indice, projetos, paginas, passos, timeout, semente, registros):
+    from streamlit.testing.v1 import AppTest
+    from utils_requisicoes import total_chamadas
+
+    rng = random.Random(semente + indice)
+    registro = {"sessao": indice, "reruns": [], "erros": [], "chamadas_jira": 0}
+    registros.append(registro)
+
+    app = AppTest.from_file(APP, default_timeout=timeout)
+    _executar(app, registro, "inicial")
+    paginas = paginas or list(app.sidebar.radio[0].options)
+    for _ in range(passos):
+        acao = rng.choice(["projeto", "pagina", "pagina", "filtro", "filtro", "filtro"])
+        if acao == "projeto":
+            app.sidebar.selectbox[0].select(rng.choice(projetos))
+        elif acao == "pagina":
+            app.sidebar.radio[0].set_value(rng.choice(paginas))
+        elif not _alterar_filtro(app, rng):
+            continue
+        _executar(app, registro, acao)
+
+    if "api_sessao" in app.session_state:
+        registro["chamadas_jira"] = total_chamadas(app.session_state["api_sessao"])
+    registro["app"] = app
+
+
+def imprimir_relatorio(registros, chamadas_servidor, chamadas_aquecimento, memoria_base, memoria_final, duracao):
+    reruns = [r for registro in registros for r in registro["reruns"]]
+    sessoes = len(registros)
+    print(f"\n== {sessoes} sessão(ões), {len(reruns)} rerun(s) em {duracao:.1f}s")
+
+    print(f"{'ação':<10} {'reruns':>7} " + " ".join(f"{f'p{p} (s)':>9}" for p in PERCENTIS) + f" {'máx (s)':>9}")
+    for acao in ["todas", "inicial", "projeto", "pagina", "filtro"]:
+        tempos = [r["segundos"] for r in reruns if acao == "todas" or r["acao"] == acao]
+        if tempos:
+            print(f"{acao:<10} {len(tempos):>7} " + " ".join(f"{percentil(tempos, p):>9.3f}" for p in PERCENTIS) + f" {max(tempos):>9.3f}")
+
+    print(f"\nMemória: {memoria_base:.0f} MB → {memoria_final:.0f} MB ({(memoria_final - memoria_base) / max(sessoes, 1):.1f} MB por sessão)")
+    por_sessao = [registro["chamadas_jira"] for registro in registros]
+    print(f"Chamadas ao Jira por sessão (contabilidade da sessão): média {sum(por_sessao) / max(sessoes, 1):.1f}, máx {max(por_sessao, default=0)}")
+    print(f"Chamadas recebidas pelo Jira falso: {sum(chamadas_aquecimento.values())} no aquecimento, {sum(chamadas_servidor.values())} durante a carga ({sum(chamadas_servidor.values()) / max(sessoes, 1):.1f} por sessão)")
+    for endpoint, quantidade in chamadas_servidor.most_common():
+        print(f"  {quantidade:>6}  {endpoint}")
+
+    erros = [erro for registro in registros for erro in registro["erros"]]
+    if erros:
+        print(f"\n{len(erros)} rerun(s) com exceção:")
+        for erro, quantidade in Counter(erros).most_common(10):
+            print(f"  {quantidade:>4}x {erro}")
+
+    return {
+        "sessoes": sessoes,
+        "reruns": len(reruns),
+        "duracao_s": duracao,
+        "latencia_s": {f"p{p}": percentil([r["segundos"] for r in reruns], p) for p in PERCENTIS},
+        "memoria_por_sessao_mb": (memoria_final - memoria_base) / max(sessoes, 1),
+        "chamadas_jira_por_sessao": sum(por_sessao) / max(sessoes, 1),
+        "chamadas_servidor": dict(chamadas_servidor),
+        "erros": len(erros),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do app.py com sessões simultâneas contra um Jira falso local")
+    parser.add_argument("--sessoes", type=int, default=5, help="Sessões simultâneas simuladas")
+    parser.add_argument("--passos", type=int, default=10, help="Interações por sessão (projeto, página ou filtro)")
+    parser.add_argument("--projetos", type=int, default=2)
+    parser.add_argument("--issues", type=int, default=500, help="Issues por projeto")
+    parser.add_argument("--sprints", type=int, default=8, help="Sprints por projeto")
+    parser.add_argument("--latencia-jira", type=float, default=0.02, help="Latência simulada por chamada ao Jira, em segundos")
+    parser.add_argument("--paginas", nargs="+", help="Páginas sorteadas (padrão: todas)")
+    parser.add_argument("--timeout", type=float, default=300, help="Tempo máximo de um rerun, em segundos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--json", metavar="ARQUIVO", help="Grava o resumo em JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, DIRETORIO)
+    rng = random.Random(args.semente)
+    projetos = {
+        f"Projeto {numero}": gerar_projeto(numero, 100 + numero, args.issues, args.sprints, rng)
+        for numero in range(1, args.projetos + 1)
+    }
+    servidor, chamadas_servidor = criar_jira_falso(projetos, args.latencia_jira)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    temporario = tempfile.mkdtemp(prefix="carga_sessoes_")
+    arquivo_projetos = os.path.join(temporario, "projetos.json")
+    with open(arquivo_projetos, "w", encoding="utf-8") as arquivo:
+        json.dump([
+            {"nome": nome, "url": url, "board_id": projeto["board_id"], "email": "carga@example.com", "api_token": "token"}
+            for nome, projeto in projetos.items()
+        ], arquivo)
+    os.environ.update({"arquivo_projetos": arquivo_projetos, "diretorio_dados": os.path.join(temporario, "dados")})
+    compartilhar_runtime_apptest()
+
+    aquecimento = []
+    simular_sessao(-1, list(projetos), args.paginas, 0, args.timeout, args.semente, aquecimento)
+    chamadas_aquecimento = Counter(chamadas_servidor)
+    chamadas_servidor.clear()
+
+    registros = []
+    memoria_base = memoria_mb()
+    inicio = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=simular_sessao,
+            args=(indice, list(projetos), args.paginas, args.passos, args.timeout, args.semente, registros),
+            name=f"sessao-{indice}",
+        )
+        for indice in range(args.sessoes)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    resumo = imprimir_relatorio(registros, chamadas_servidor, chamadas_aquecimento, memoria_base, memoria_mb(), duracao)
+    servidor.shutdown()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
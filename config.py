@@ -1,4 +1,5 @@
 import os
+import json
 import base64
 from dotenv import load_dotenv
 
@@ -10,20 +11,58 @@ def get_env_int(var_name, default=0):
         return int(value)
     return default
 
-PROJETOS = {
-    "PROJETO 1": {
-        "email": os.getenv("email_projeto1"),
-        "api_token": os.getenv("api_token_projeto1"),
-        "url": os.getenv("url_projeto1"),
-        "board_id": get_env_int("board_projeto1"),
-    },
-    "PROJETO 2": {
-        "email": os.getenv("email_projeto2"),
-        "api_token": os.getenv("api_token_projeto2"),
-        "url": os.getenv("url_projeto2"),
-        "board_id": get_env_int("board_projeto2"),
-    }
-}
+ORCAMENTO_CHAMADAS_RENDER = get_env_int("orcamento_chamadas_render", 200)
+DIRETORIO_DADOS = os.getenv("diretorio_dados", "dados_jira")
+
+REQUISICOES_POR_SEGUNDO = get_env_int("requisicoes_por_segundo", 10)
+ORCAMENTO_REQUISICOES_MINUTO = get_env_int("orcamento_requisicoes_minuto", REQUISICOES_POR_SEGUNDO * 60)
+MAX_PROJETOS_PARALELOS = get_env_int("max_projetos_paralelos", 4)
+MAX_CHANGELOGS_PARALELOS = get_env_int("max_changelogs_paralelos", 4)
+MAX_SHARDS_PARALELOS = get_env_int("max_shards_paralelos", 4)
+MAX_PROCESSOS_COMPUTACAO = get_env_int("max_processos_computacao", 2)
+ARQUIVO_PROJETOS = os.getenv("arquivo_projetos", "projetos.json")
+WEBHOOK_SEGREDO = os.getenv("webhook_segredo")
+CAMPO_SPRINT = os.getenv("campo_sprint", "customfield_10020")
+WEBHOOK_PORTA = get_env_int("webhook_porta", 8600)
+WEBHOOK_SILENCIO_PUBLICACAO = get_env_int("webhook_silencio_publicacao", 30)
+WEBHOOK_ATRASO_MAXIMO_PUBLICACAO = get_env_int("webhook_atraso_maximo_publicacao", 300)
+
+def _expandir(valor):
+    expandido = os.path.expandvars(str(valor or ""))
+    return None if not expandido or "$" in expandido else expandido
+
+def carregar_projetos_arquivo(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        definicoes = json.load(arquivo)
+
+    projetos = {}
+    for definicao in definicoes:
+        projetos[definicao["nome"]] = {
+            "email": _expandir(definicao.get("email")),
+            "api_token": _expandir(definicao.get("api_token")),
+            "url": (_expandir(definicao.get("url")) or "").rstrip("/"),
+            "board_id": int(definicao.get("board_id", 0)),
+        }
+    return projetos
+
+def carregar_projetos_env():
+    projetos = {}
+    numero = 1
+    while numero <= 2 or os.getenv(f"url_projeto{numero}"):
+        projetos[f"PROJETO {numero}"] = {
+            "email": os.getenv(f"email_projeto{numero}"),
+            "api_token": os.getenv(f"api_token_projeto{numero}"),
+            "url": os.getenv(f"url_projeto{numero}"),
+            "board_id": get_env_int(f"board_projeto{numero}"),
+        }
+        numero += 1
+    return projetos
+
+PROJETOS = (
+    carregar_projetos_arquivo(ARQUIVO_PROJETOS)
+    if os.path.exists(ARQUIVO_PROJETOS)
+    else carregar_projetos_env()
+)
 
 def get_projeto_config(nome_projeto):
     config = PROJETOS.get(nome_projeto)
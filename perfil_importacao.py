@@ -0,0 +1,80 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def modulos_app(caminho=APP):
+    with open(caminho, encoding="utf-8") as arquivo:
+        arvore = ast.parse(arquivo.read())
+
+    inicializacao, paginas = [], []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            inicializacao.extend(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module:
+            inicializacao.append(no.module)
+        elif isinstance(no, ast.Assign) and any(isinstance(alvo, ast.Name) and alvo.id == "PAGINAS" for alvo in no.targets):
+            paginas = [modulo for modulo, _ in ast.literal_eval(no.value).values()]
+    return list(dict.fromkeys(inicializacao)), paginas
+
+
+def medir_importacao(modulos):
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulos}: {resultado.stderr.strip().splitlines()[-1]}")
+
+    registros = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, cumulativo, nome = linha[len("import time:"):].split("|")
+        registros.append({
+            "modulo": nome.strip(),
+            "nivel": (len(nome) - len(nome.lstrip()) - 1) // 2,
+            "proprio_ms": int(proprio) / 1000,
+            "cumulativo_ms": int(cumulativo) / 1000,
+        })
+    return registros
+
+
+def total_ms(registros):
+    return sum(r["cumulativo_ms"] for r in registros if r["nivel"] == 0)
+
+
+def imprimir_relatorio(titulo, registros, top):
+    print(f"\n== {titulo}: {total_ms(registros):.1f} ms ({len(registros)} módulos)")
+    print(f"{'cumulativo (ms)':>16} {'próprio (ms)':>13}  módulo")
+    for r in sorted(registros, key=lambda r: r["cumulativo_ms"], reverse=True)[:top]:
+        print(f"{r['cumulativo_ms']:>16.1f} {r['proprio_ms']:>13.1f}  {r['modulo']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de tempo de importação do app.py")
+    parser.add_argument("--top", type=int, default=15, help="Quantidade de módulos listados por relatório")
+    parser.add_argument("--paginas", action="store_true", help="Mede também a primeira importação de cada página")
+    args = parser.parse_args()
+
+    modulos_inicializacao, modulos_paginas = modulos_app()
+    base = medir_importacao(["streamlit"])
+    inicializacao = medir_importacao(["streamlit"] + modulos_inicializacao)
+    imprimir_relatorio("Inicialização (app.py)", inicializacao, args.top)
+    print(f"-- sem contar streamlit: {total_ms(inicializacao) - total_ms(base):.1f} ms")
+
+    if args.paginas:
+        for modulo in modulos_paginas:
+            registros = medir_importacao(["streamlit"] + modulos_inicializacao + [modulo])
+            print(f"\n-- {modulo}: +{total_ms(registros) - total_ms(inicializacao):.1f} ms na primeira seleção")
+
+
+if __name__ == "__main__":
+    main()
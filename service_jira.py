@@ -1,11 +1,74 @@
+import contextvars
 import requests
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from config import MAX_CHANGELOGS_PARALELOS
+from utils_json import json_resposta
+from utils_quota import aguardar_vez, suspender_quota
+from utils_requisicoes import classificar_endpoint, registrar_chamada
+from utils_tracing import anotar, rastrear, span
 
+MAX_TENTATIVAS = 3
+STATUS_RETENTATIVA = {429, 502, 503, 504}
+LOTE_CHANGELOG = 1000
+LOTE_WORKLOGS = 1000
+PAGINA_CHANGELOG = 100
+
+_bulk_indisponivel = set()
+
+def _requisitar(metodo, url, headers, params=None, json=None, timeout=60):
+    endpoint = classificar_endpoint(url, params)
+    with span(f"http.{endpoint}"):
+        inicio = time.perf_counter()
+        retentativas = 0
+        while True:
+            aguardar_vez(url, headers)
+            try:
+                response = requests.request(metodo, url, headers=headers, params=params, json=json, timeout=timeout)
+            except requests.ConnectionError:
+                if retentativas + 1 >= MAX_TENTATIVAS:
+                    registrar_chamada(endpoint, time.perf_counter() - inicio, 0, retentativas, erro=True)
+                    raise
+                retentativas += 1
+                time.sleep(2 ** retentativas)
+                continue
+
+            if response.status_code in STATUS_RETENTATIVA and retentativas + 1 < MAX_TENTATIVAS:
+                retentativas += 1
+                espera = response.headers.get("Retry-After")
+                espera = float(espera) if espera and espera.isdigit() else 2 ** retentativas
+                if response.status_code == 429:
+                    suspender_quota(url, headers, espera)
+                else:
+                    time.sleep(espera)
+                continue
+            break
+
+        tamanho = len(response.content)
+        registrar_chamada(
+            endpoint,
+            time.perf_counter() - inicio,
+            tamanho,
+            retentativas,
+            erro=response.status_code >= 400,
+            headers=response.headers
+        )
+        anotar(contagem=1, tamanho_bytes=tamanho, status=response.status_code, retentativas=retentativas)
+        return response
+
+def jira_get(url, headers, params=None, timeout=60):
+    return _requisitar("GET", url, headers, params=params, timeout=timeout)
+
+def jira_post(url, headers, json=None, timeout=60):
+    return _requisitar("POST", url, headers, json=json, timeout=timeout)
+
+@rastrear("fetch.sprints")
 def get_sprints(jira_url, board_id, headers):
     url = f"{jira_url}/rest/agile/1.0/board/{board_id}/sprint"
-    response = requests.get(url, headers=headers)
+    response = jira_get(url, headers)
     if response.status_code == 200:
-        return response.json().get("values", [])
+        return json_resposta(response).get("values", [])
     else:
         raise Exception(f"Erro ao buscar sprints: {response.status_code} - {response.text}")
 
@@ -21,6 +84,7 @@ def get_active_sprint(jira_url, board_id, headers):
             }
     return None
 
+@rastrear("fetch.sprint_issues")
 def get_issues_from_sprint(jira_url, sprint_id, headers):
     url = f"{jira_url}/rest/api/3/search/jql"
 
@@ -35,29 +99,132 @@ def get_issues_from_sprint(jira_url, sprint_id, headers):
         "validateQuery": "warn"
     }
 
-    response = requests.get(url, headers=headers, params=params)
+    response = jira_get(url, headers, params=params)
     response.raise_for_status()
-    return response.json().get("issues", [])
+    return json_resposta(response).get("issues", [])
 
+@rastrear("fetch.sprints")
 def get_all_sprints(jira_url, board_id, headers, filtro_nome=None):
-    response = requests.get(f"{jira_url}/rest/agile/1.0/board/{board_id}/sprint", headers=headers)
+    response = jira_get(f"{jira_url}/rest/agile/1.0/board/{board_id}/sprint", headers)
     if response.status_code != 200:
         raise Exception(f"Erro ao buscar sprints: {response.status_code}")
-    sprints = response.json().get("values", [])
+    sprints = json_resposta(response).get("values", [])
     if filtro_nome:
         sprints = [s for s in sprints if filtro_nome.lower() in s["name"].lower()]
     return sprints
 
-def get_status_transitions(jira_url, issue_key, headers):
-    url = f"{jira_url}/rest/api/3/issue/{issue_key}?expand=changelog"
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    issue = response.json()
+def _data_historico(created):
+    if isinstance(created, (int, float)):
+        return datetime.fromtimestamp(created / 1000, tz=timezone.utc)
+    return datetime.strptime(created, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+def extrair_transicoes_status(histories):
     transitions = []
-    for history in issue.get("changelog", {}).get("histories", []):
+    for history in histories:
         for item in history.get("items", []):
             if item.get("field") == "status":
-                change_date = datetime.strptime(history["created"], "%Y-%m-%dT%H:%M:%S.%f%z")
-                transitions.append((item.get("fromString"), item.get("toString"), change_date))
+                change_date = _data_historico(history["created"])
+                transitions.append((item.get("fromString", "N/A"), item.get("toString", "N/A"), change_date))
     transitions.sort(key=lambda x: x[2])
-    return transitions
\ No newline at end of file
+    return transitions
+
+def get_changelog(jira_url, issue_key, headers):
+    url = f"{jira_url}/rest/api/3/issue/{issue_key}/changelog"
+    histories = []
+    start_at = 0
+    while True:
+        response = jira_get(url, headers, params={"startAt": start_at, "maxResults": PAGINA_CHANGELOG})
+        response.raise_for_status()
+        data = json_resposta(response)
+        valores = data.get("values", [])
+        histories.extend(valores)
+        start_at += len(valores)
+        if data.get("isLast", True) or not valores:
+            return histories
+
+@rastrear("fetch.changelog")
+def get_status_transitions(jira_url, issue_key, headers):
+    return extrair_transicoes_status(get_changelog(jira_url, issue_key, headers))
+
+def _bulkfetch_changelogs(jira_url, issues, headers):
+    url = f"{jira_url}/rest/api/3/changelog/bulkfetch"
+    chaves_por_id = {str(issue["id"]): issue["key"] for issue in issues}
+    body = {"issueIdsOrKeys": list(chaves_por_id), "fieldIds": ["status"], "maxResults": LOTE_CHANGELOG}
+    histories_por_issue = {key: [] for key in chaves_por_id.values()}
+
+    while True:
+        response = jira_post(url, headers, json=body)
+        if response.status_code in (404, 405):
+            return None
+        response.raise_for_status()
+        data = json_resposta(response)
+        for changelog in data.get("issueChangeLogs", []):
+            key = chaves_por_id.get(str(changelog.get("issueId")))
+            if key is not None:
+                histories_por_issue[key].extend(changelog.get("changeHistories", []))
+        if not data.get("nextPageToken"):
+            return histories_por_issue
+        body["nextPageToken"] = data["nextPageToken"]
+
+def _transicoes_paralelas(jira_url, issues, headers):
+    with ThreadPoolExecutor(max_workers=MAX_CHANGELOGS_PARALELOS, thread_name_prefix="changelog") as executor:
+        futuros = {
+            issue["key"]: executor.submit(contextvars.copy_context().run, get_status_transitions, jira_url, issue["key"], headers)
+            for issue in issues
+        }
+        return {key: futuro.result() for key, futuro in futuros.items()}
+
+def iterar_transicoes_em_lote(jira_url, issues, headers):
+    for inicio in range(0, len(issues), LOTE_CHANGELOG):
+        lote = issues[inicio:inicio + LOTE_CHANGELOG]
+        with span("fetch.changelog_lote", issues=len(lote)):
+            histories_por_issue = None
+            if jira_url not in _bulk_indisponivel:
+                histories_por_issue = _bulkfetch_changelogs(jira_url, lote, headers)
+                if histories_por_issue is None:
+                    _bulk_indisponivel.add(jira_url)
+
+            if histories_por_issue is None:
+                transicoes = _transicoes_paralelas(jira_url, lote, headers)
+            else:
+                transicoes = {key: extrair_transicoes_status(h) for key, h in histories_por_issue.items()}
+            anotar(contagem=len(transicoes))
+        yield transicoes
+
+def get_transicoes_em_lote(jira_url, issues, headers):
+    transicoes_por_issue = {}
+    for transicoes in iterar_transicoes_em_lote(jira_url, issues, headers):
+        transicoes_por_issue.update(transicoes)
+    return transicoes_por_issue
+
+def _ids_worklogs_desde(url, headers, desde):
+    ids = []
+    params = {"since": desde}
+    while True:
+        response = jira_get(url, headers, params=params)
+        response.raise_for_status()
+        data = json_resposta(response)
+        ids.extend(str(valor["worklogId"]) for valor in data.get("values", []))
+        ate = data.get("until", desde)
+        if data.get("lastPage", True):
+            return ids, ate
+        params = {"since": ate}
+
+@rastrear("fetch.worklogs_alterados")
+def get_ids_worklogs_alterados(jira_url, headers, desde=0):
+    return _ids_worklogs_desde(f"{jira_url}/rest/api/3/worklog/updated", headers, desde)
+
+@rastrear("fetch.worklogs_removidos")
+def get_ids_worklogs_removidos(jira_url, headers, desde=0):
+    return _ids_worklogs_desde(f"{jira_url}/rest/api/3/worklog/deleted", headers, desde)
+
+@rastrear("fetch.worklogs")
+def get_worklogs(jira_url, ids, headers):
+    worklogs = []
+    for inicio in range(0, len(ids), LOTE_WORKLOGS):
+        lote = [int(i) for i in ids[inicio:inicio + LOTE_WORKLOGS]]
+        response = jira_post(f"{jira_url}/rest/api/3/worklog/list", headers, json={"ids": lote})
+        response.raise_for_status()
+        worklogs.extend(json_resposta(response))
+    anotar(contagem=len(worklogs))
+    return worklogs
@@ -0,0 +1,166 @@
+import argparse
+import sys
+import time
+
+from config import PROJETOS, get_projeto_config
+from service_jira import get_ids_worklogs_alterados, get_ids_worklogs_removidos, get_sprints, get_worklogs, iterar_transicoes_em_lote
+from utils_armazenamento import (
+    anexar_transicoes,
+    caminho_instancia,
+    completar_chaves_worklogs,
+    instancia,
+    issues_com_changelog_pendente,
+    ler_indice_issues,
+    ler_marca,
+    publicar_versao,
+    remover_issues,
+    remover_worklogs,
+    salvar_board,
+    salvar_marca,
+    salvar_marcas_changelog,
+    upsert_issues,
+    upsert_worklogs,
+)
+from utils_dados import extrair_worklogs, get_all_issues_projeto, get_project_id
+from utils_quota import SEGUNDO_PLANO, prioridade
+from utils_tracing import span
+from utils_worklogs import normalizar_worklog
+
+
+def log(mensagem):
+    print(f"[{time.strftime('%H:%M:%S')}] {mensagem}", flush=True)
+
+
+def etapa(nome, funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    quantidade = len(resultado) if hasattr(resultado, "__len__") else "-"
+    log(f"  {nome}: {quantidade} registro(s) em {time.perf_counter() - inicio:.1f}s")
+    return resultado
+
+
+def buscar_transicoes(jira_url, issues, headers):
+    transicoes_por_issue = {}
+    total = len(issues)
+    for transicoes in iterar_transicoes_em_lote(jira_url, issues, headers):
+        transicoes_por_issue.update(transicoes)
+        log(f"    changelogs {len(transicoes_por_issue)}/{total}")
+    return transicoes_por_issue
+
+
+def sincronizar_transicoes(jira_url, issues, headers):
+    pendentes = issues_com_changelog_pendente(jira_url, issues)
+    log(f"  changelogs pendentes: {len(pendentes)} de {len(issues)} issue(s)")
+    if not pendentes:
+        return 0
+
+    transicoes = buscar_transicoes(jira_url, pendentes, headers)
+    novas = anexar_transicoes(jira_url, transicoes, {issue["key"]: str(issue["id"]) for issue in pendentes})
+    salvar_marcas_changelog(jira_url, pendentes)
+    return novas
+
+
+def remover_ausentes(jira_url, project_id, issues):
+    indice = ler_indice_issues(jira_url)
+    if indice.empty:
+        return []
+    armazenadas = set(indice.loc[indice["project_id"] == str(project_id), "id"])
+    ausentes = armazenadas - {str(issue.get("id")) for issue in issues}
+    return remover_issues(jira_url, ausentes) if ausentes else []
+
+
+def sincronizar_worklogs(jira_url, headers):
+    desde = ler_marca(jira_url, "worklogs", 0)
+    alterados, ate = get_ids_worklogs_alterados(jira_url, headers, desde)
+    removidos, _ = get_ids_worklogs_removidos(jira_url, headers, desde)
+
+    indice = ler_indice_issues(jira_url)
+    chaves_por_id = dict(zip(indice["id"], indice["key"]))
+    worklogs = [
+        normalizar_worklog(worklog, chaves_por_id.get(str(worklog.get("issueId"))))
+        for worklog in get_worklogs(jira_url, alterados, headers)
+    ]
+    upsert_worklogs(jira_url, worklogs)
+    completados = completar_chaves_worklogs(jira_url, chaves_por_id)
+    quantidade_removidos = remover_worklogs(jira_url, removidos)
+    salvar_marca(jira_url, "worklogs", ate)
+    sem_issue = sum(1 for worklog in worklogs if worklog["issue_key"] is None)
+    log(f"  worklogs: {len(worklogs)} alterado(s) ({sem_issue} sem issue sincronizada), {completados} associado(s) a issues novas, {quantidade_removidos} removido(s) desde {desde}")
+
+
+def agrupar_por_instancia(nomes_projetos):
+    grupos = {}
+    for nome_projeto in nomes_projetos:
+        try:
+            jira_url, board_id, headers = get_projeto_config(nome_projeto)
+        except ValueError as e:
+            log(f"Ignorando {nome_projeto}: {e}")
+            continue
+        grupos.setdefault(instancia(jira_url), []).append((nome_projeto, jira_url, board_id, headers))
+    return grupos
+
+
+def sincronizar_instancia(boards):
+    jira_url = boards[0][1]
+    log(f"Sincronizando {instancia(jira_url)} ({len(boards)} board(s)) em {caminho_instancia(jira_url)}")
+    inicio = time.perf_counter()
+
+    with span("sync.instancia", instancia=instancia(jira_url)):
+        projetos = {}
+        for nome_projeto, _, board_id, headers in boards:
+            project_id = get_project_id(jira_url, board_id, headers)
+            projetos.setdefault(project_id, {"headers": headers, "boards": []})["boards"].append((nome_projeto, board_id))
+
+        for project_id, projeto in projetos.items():
+            nomes = ", ".join(nome for nome, _ in projeto["boards"])
+            log(f" projeto {project_id} (boards: {nomes})")
+            headers = projeto["headers"]
+
+            issues = etapa("issues", get_all_issues_projeto, jira_url, project_id, headers)
+            alteradas = upsert_issues(jira_url, issues)
+            log(f"  {len(alteradas)} issue(s) nova(s) ou alterada(s)")
+            removidas = remover_ausentes(jira_url, project_id, issues)
+            log(f"  {len(removidas)} issue(s) removida(s) ou movida(s) para outro projeto")
+
+            inicio_transicoes = time.perf_counter()
+            novas = sincronizar_transicoes(jira_url, issues, headers)
+            log(f"  transições: {novas} nova(s) em {time.perf_counter() - inicio_transicoes:.1f}s")
+
+            upsert_worklogs(jira_url, extrair_worklogs(issues))
+
+            for nome_projeto, board_id in projeto["boards"]:
+                sprints = etapa(f"sprints ({nome_projeto})", get_sprints, jira_url, board_id, headers)
+                salvar_board(
+                    jira_url, board_id, project_id, sprints,
+                    projeto=nome_projeto,
+                    sincronizado_em=time.time(),
+                    issues=len(issues),
+                )
+
+        sincronizar_worklogs(jira_url, boards[0][3])
+
+        versao = publicar_versao(jira_url)
+        log(f"  versão publicada: {versao}")
+
+    log(f"{instancia(jira_url)} concluída em {time.perf_counter() - inicio:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sincroniza os projetos do Jira para o armazenamento local")
+    parser.add_argument("--projeto", action="append", choices=list(PROJETOS), help="Projeto a sincronizar (padrão: todos)")
+    args = parser.parse_args()
+
+    falhas = 0
+    for boards in agrupar_por_instancia(args.projeto or list(PROJETOS)).values():
+        try:
+            with prioridade(SEGUNDO_PLANO):
+                sincronizar_instancia(boards)
+        except Exception as e:
+            falhas += 1
+            log(f"Erro ao sincronizar {instancia(boards[0][1])}: {e}")
+
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
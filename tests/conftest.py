@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils_armazenamento
+
+
+@pytest.fixture
+def armazenamento(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils_armazenamento, "DIRETORIO_DADOS", str(tmp_path))
+    monkeypatch.setattr(utils_armazenamento, "_memoria", {})
+    monkeypatch.setattr(utils_armazenamento, "_mapeadas", {})
+    return "https://exemplo.atlassian.net"
@@ -0,0 +1,101 @@
+import multiprocessing
+from datetime import datetime, timezone
+
+import utils_armazenamento
+from utils_armazenamento import (
+    PARTES_ISSUES,
+    anexar_transicoes,
+    issues_com_changelog_pendente,
+    ler_indice_issues,
+    ler_issues,
+    ler_transicoes,
+    publicar_versao,
+    salvar_board,
+    salvar_marcas_changelog,
+    upsert_issues,
+)
+
+
+def issue(issue_id, updated="2024-01-01T10:00:00.000+0000", resumo="Item"):
+    return {
+        "id": issue_id,
+        "key": f"P-{issue_id}",
+        "fields": {"summary": resumo, "updated": updated, "project": {"id": "10"}},
+    }
+
+
+def data(dia, hora=10):
+    return datetime(2024, 1, dia, hora, tzinfo=timezone.utc)
+
+
+def test_upsert_grava_apenas_issues_alteradas(armazenamento):
+    assert upsert_issues(armazenamento, [issue("1"), issue("2")]) == {"1", "2"}
+    assert upsert_issues(armazenamento, [issue("1"), issue("2")]) == set()
+    assert upsert_issues(armazenamento, [issue("1"), issue("2", resumo="Novo título")]) == {"2"}
+
+    indice = ler_indice_issues(armazenamento)
+    assert sorted(indice["id"]) == ["1", "2"]
+
+
+def test_upsert_preserva_issues_da_mesma_parte(armazenamento):
+    upsert_issues(armazenamento, [issue("1"), issue("17")])
+    upsert_issues(armazenamento, [issue("17", resumo="Alterada")])
+    salvar_board(armazenamento, 5, "10", [])
+
+    resumos = {i["id"]: i["fields"]["summary"] for i in ler_issues(armazenamento, 5)}
+    assert resumos == {"1": "Item", "17": "Alterada"}
+
+
+def test_anexar_transicoes_ignora_as_ja_gravadas(armazenamento):
+    ids = {"P-1": "1"}
+    assert anexar_transicoes(armazenamento, {"P-1": [("A Fazer", "Em Andamento", data(1))]}, ids) == 1
+
+    novas = {"P-1": [("A Fazer", "Em Andamento", data(1)), ("Em Andamento", "Concluído", data(2))]}
+    assert anexar_transicoes(armazenamento, novas, ids) == 1
+    assert anexar_transicoes(armazenamento, novas, ids) == 0
+
+    assert [para for _, para, _ in ler_transicoes(armazenamento)["P-1"]] == ["Em Andamento", "Concluído"]
+
+
+def test_changelog_pendente_apenas_quando_updated_avanca(armazenamento):
+    issues = [issue("1"), issue("2")]
+    assert issues_com_changelog_pendente(armazenamento, issues) == issues
+
+    salvar_marcas_changelog(armazenamento, issues)
+    assert issues_com_changelog_pendente(armazenamento, issues) == []
+
+    alterada = issue("2", updated="2024-01-02T10:00:00.000+0000")
+    assert issues_com_changelog_pendente(armazenamento, [issues[0], alterada]) == [alterada]
+
+
+def test_leitura_publicada_decodifica_apenas_o_projeto_do_board(armazenamento, monkeypatch):
+    outra = issue("2")
+    outra["fields"]["project"] = {"id": "20"}
+    upsert_issues(armazenamento, [issue("1"), outra, issue("3")])
+    salvar_board(armazenamento, 5, "10", [])
+    publicar_versao(armazenamento)
+
+    decodificados = []
+    original = utils_armazenamento.carregar_json
+    monkeypatch.setattr(utils_armazenamento, "carregar_json", lambda payload: decodificados.append(payload) or original(payload))
+
+    assert sorted(i["id"] for i in ler_issues(armazenamento, 5)) == ["1", "3"]
+    assert len(decodificados) == 2
+
+
+def _gravar_issues(diretorio, jira_url, inicio):
+    utils_armazenamento.DIRETORIO_DADOS = diretorio
+    for numero in range(inicio, inicio + 20):
+        upsert_issues(jira_url, [issue(str(numero * PARTES_ISSUES))])
+
+
+def test_upserts_de_processos_diferentes_nao_se_perdem(armazenamento, tmp_path):
+    contexto = multiprocessing.get_context("spawn")
+    processos = [contexto.Process(target=_gravar_issues, args=(str(tmp_path), armazenamento, inicio)) for inicio in (0, 100)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join(60)
+
+    assert len(ler_indice_issues(armazenamento)) == 40
+    assert not list(tmp_path.rglob("*.tmp"))
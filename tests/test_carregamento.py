@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import Future
+
+import utils_carregamento
+
+
+def futuro_com_erro():
+    futuro = Future()
+    futuro.set_exception(RuntimeError("falhou"))
+    return futuro
+
+
+def test_espera_apos_falha_dobra_ate_o_maximo():
+    esperas = [utils_carregamento.espera_apos_falha(tentativas) for tentativas in range(1, 5)]
+    assert esperas == [5, 10, 20, 40]
+    assert utils_carregamento.espera_apos_falha(50) == utils_carregamento.ESPERA_MAXIMA_FALHA
+
+
+def test_falha_recente_nao_e_resubmetida(monkeypatch):
+    monkeypatch.setattr(utils_carregamento, "_falhas", {"A": {"tentativas": 3, "em": time.time()}})
+    assert not utils_carregamento._expirado("A", futuro_com_erro())
+
+
+def test_falha_antiga_e_resubmetida(monkeypatch):
+    monkeypatch.setattr(utils_carregamento, "_falhas", {"A": {"tentativas": 1, "em": time.time() - 60}})
+    assert utils_carregamento._expirado("A", futuro_com_erro())
+
+
+def test_prefetch_inclui_apenas_visitados_recentes(monkeypatch):
+    agora = time.time()
+    monkeypatch.setattr(utils_carregamento, "PROJETOS", {"A": {}, "B": {}, "C": {}})
+    monkeypatch.setattr(utils_carregamento, "_visitas", {"A": agora, "B": agora - utils_carregamento.JANELA_VISITAS - 1})
+    assert utils_carregamento.visitados_recentemente() == ["A"]
+
+
+def test_progresso_informa_erro_e_descarta_parcial(monkeypatch):
+    def iterar_com_falha(jira_url, board_id, headers):
+        yield [{"id": "1"}], 2
+        raise RuntimeError("jira fora do ar")
+
+    monkeypatch.setattr(utils_carregamento, "get_projeto_config", lambda nome: ("https://exemplo.atlassian.net", 1, {}))
+    monkeypatch.setattr(utils_carregamento, "marca_carga", lambda *args: {})
+    monkeypatch.setattr(utils_carregamento, "iterar_issues", iterar_com_falha)
+    monkeypatch.setattr(utils_carregamento, "_futuros", {})
+    monkeypatch.setattr(utils_carregamento, "_falhas", {})
+    monkeypatch.setattr(utils_carregamento, "_progresso", {})
+
+    utils_carregamento._obter_futuro("A").exception()
+    progresso = utils_carregamento.progresso_projeto("A")
+
+    assert progresso["status"] == "erro"
+    assert str(progresso["erro"]) == "jira fora do ar"
+    assert utils_carregamento._progresso == {}
+    assert utils_carregamento._falhas["A"]["tentativas"] == 1
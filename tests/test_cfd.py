@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from utils_cfd import calcular_cfd, cfd_incremental, eventos_fluxo, eventos_incrementais
+
+
+def data(dia):
+    return datetime(2024, 1, dia, 12, tzinfo=timezone.utc)
+
+
+def eventos_exemplo(transicoes):
+    return eventos_fluxo(
+        transicoes,
+        {"P-1": data(1), "P-2": data(2)},
+        {"P-1": "Concluído", "P-2": "A Fazer"},
+    )
+
+
+def test_cfd_conta_issues_por_status_a_cada_dia():
+    eventos = eventos_exemplo({
+        "P-1": [("A Fazer", "Em Andamento", data(2)), ("Em Andamento", "Concluído", data(3))],
+    })
+    cfd = calcular_cfd(eventos, ate="2024-01-04")
+
+    assert list(cfd.columns) == ["A Fazer", "Em Andamento", "Concluído"]
+    assert cfd.loc["2024-01-01"].tolist() == [1, 0, 0]
+    assert cfd.loc["2024-01-02"].tolist() == [1, 1, 0]
+    assert cfd.loc["2024-01-04"].tolist() == [1, 0, 1]
+    assert (cfd.sum(axis=1) == [1, 2, 2, 2]).all()
+
+
+def test_cfd_incremental_igual_ao_calculo_completo():
+    inicial = {"P-1": [("A Fazer", "Em Andamento", data(2))]}
+    completo = {"P-1": inicial["P-1"] + [("Em Andamento", "Concluído", data(5))]}
+
+    cfd_incremental("teste", eventos_exemplo(inicial), ate="2024-01-04")
+    incremental = cfd_incremental("teste", eventos_exemplo(completo), ate="2024-01-06")
+
+    pd.testing.assert_frame_equal(incremental, calcular_cfd(eventos_exemplo(completo), ate="2024-01-06"), check_names=False, check_freq=False)
+
+
+def test_eventos_incrementais_acrescentam_apenas_transicoes_novas():
+    criacao = {"P-1": data(1), "P-2": data(2)}
+    status = {"P-1": "Concluído", "P-2": "A Fazer"}
+    inicial = {"P-1": [("A Fazer", "Em Andamento", data(2))]}
+    completo = {"P-1": inicial["P-1"] + [("Em Andamento", "Concluído", data(5))]}
+
+    primeiro = eventos_incrementais("incremental", 1, inicial, criacao, status)
+    assert eventos_incrementais("incremental", 1, {}, {}, {}) is primeiro
+
+    segundo = eventos_incrementais("incremental", 2, completo, criacao, status)
+    pd.testing.assert_frame_equal(segundo, eventos_fluxo(completo, criacao, status))
+    pd.testing.assert_frame_equal(segundo.iloc[:len(primeiro)], primeiro)
+
+
+def test_eventos_incrementais_recalculam_quando_historico_muda():
+    criacao = {"P-1": data(1), "P-2": data(2)}
+    status = {"P-1": "Concluído", "P-2": "A Fazer"}
+    eventos_incrementais("reescrito", 1, {"P-1": [("A Fazer", "Em Andamento", data(2))]}, criacao, status)
+
+    reescrito = {"P-1": [("A Fazer", "Em Revisão", data(3))]}
+    sem_p2 = {"P-1": criacao["P-1"]}
+    pd.testing.assert_frame_equal(
+        eventos_incrementais("reescrito", 2, reescrito, criacao, status),
+        eventos_fluxo(reescrito, criacao, status),
+    )
+    pd.testing.assert_frame_equal(
+        eventos_incrementais("reescrito", 3, reescrito, sem_p2, status),
+        eventos_fluxo(reescrito, sem_p2, status),
+    )
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import utils_computacao
+from utils_computacao import _desempacotar, _empacotar, computar, normalizar_json
+
+
+@pytest.fixture
+def sem_pool(monkeypatch):
+    monkeypatch.setattr(utils_computacao, "_pool", lambda: None)
+    monkeypatch.setattr(utils_computacao, "_resultados", utils_computacao.OrderedDict())
+
+
+def test_dataframe_homogeneo_trafega_em_arrow():
+    df = pd.DataFrame({"chave": ["P-1", "P-2"], "pontos": [3, 5]})
+    tipo, valor = _empacotar(df)
+    assert tipo == "arrow"
+    pd.testing.assert_frame_equal(_desempacotar((tipo, valor)), df)
+
+
+def test_coluna_mista_cai_para_pickle():
+    df = normalizar_json([{"campo": 1}, {"campo": "texto"}, {"campo": [1, 2]}])
+    tipo, valor = _empacotar(df)
+    assert tipo == "bruto"
+    pd.testing.assert_frame_equal(_desempacotar((tipo, valor)), df)
+
+
+def test_computar_reaproveita_resultado_da_mesma_versao(sem_pool):
+    chamadas = []
+
+    def contar(dados):
+        chamadas.append(dados)
+        return len(dados)
+
+    assert computar("contagem", ("url", 1, 1), contar, [1, 2]) == 2
+    assert computar("contagem", ("url", 1, 1), contar, [1, 2, 3]) == 2
+    assert computar("contagem", ("url", 1, 2), contar, [1, 2, 3]) == 3
+    assert computar("contagem", None, contar, [1]) == 1
+    assert computar("contagem", None, contar, [1]) == 1
+    assert len(chamadas) == 4
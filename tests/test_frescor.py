@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+import utils_frescor
+
+
+class RespostaBusca:
+    def __init__(self, issues):
+        self.issues = issues
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def jira(monkeypatch):
+    estado = {"sprints": [{"id": 1, "name": "Sprint 1", "state": "active"}], "alteradas": [], "buscas": []}
+
+    def jira_get(url, headers, params=None):
+        estado["buscas"].append(params["jql"])
+        return RespostaBusca({"issues": estado["alteradas"]})
+
+    monkeypatch.setattr(utils_frescor, "get_sprints", lambda jira_url, board_id, headers: estado["sprints"])
+    monkeypatch.setattr(utils_frescor, "jira_get", jira_get)
+    monkeypatch.setattr(utils_frescor, "json_resposta", lambda resposta: resposta.issues)
+    monkeypatch.setattr(utils_frescor, "_projetos", {("url", "1"): "10"})
+    return estado
+
+
+def test_sessao_sem_carga_registrada_recarrega_tudo(jira):
+    desatualizadas, marca = utils_frescor.sondar_frescor("url", 1, {})
+    assert desatualizadas == {"issues", "sprints"}
+    assert marca["sprints"] == utils_frescor.hash_sprints(jira["sprints"])
+
+
+def test_sondagem_compara_com_a_carga_da_sessao(jira):
+    marca = utils_frescor.marca_carga("url", 1, {}, time.time() - 3600)
+
+    desatualizadas, nova = utils_frescor.sondar_frescor("url", 1, {}, marca)
+    assert desatualizadas == set()
+    assert "updated >= -63m" in jira["buscas"][-1]
+    assert nova["issues"] > marca["issues"]
+
+    jira["alteradas"] = [{"id": "1"}]
+    jira["sprints"] = [{"id": 1, "name": "Sprint 1", "state": "closed"}]
+    desatualizadas, _ = utils_frescor.sondar_frescor("url", 1, {}, marca)
+    assert desatualizadas == {"issues", "sprints"}
+
+
+def test_sessoes_diferentes_mantem_marcas_proprias(jira):
+    antiga = utils_frescor.marca_carga("url", 1, {}, time.time() - 7200)
+    recente = utils_frescor.marca_carga("url", 1, {}, time.time() - 60)
+
+    utils_frescor.sondar_frescor("url", 1, {}, recente)
+    utils_frescor.sondar_frescor("url", 1, {}, antiga)
+    assert "updated >= -4m" in jira["buscas"][0]
+    assert "updated >= -123m" in jira["buscas"][1]
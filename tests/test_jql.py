@@ -0,0 +1,46 @@
+from config import CAMPO_SPRINT
+from utils_jql import filtrar_issues, montar_jql, nomes_status_entregues
+
+
+def issue(status, categoria="In Progress", sprints=None, resolvida="2026-03-10T12:00:00.000+0000"):
+    return {
+        "fields": {
+            "status": {"name": status, "statusCategory": {"name": categoria}},
+            "resolutiondate": resolvida,
+            CAMPO_SPRINT: sprints or [],
+        }
+    }
+
+
+def test_montar_jql_escapa_valores_e_filtra_entregues():
+    jql = montar_jql("10", entregues=True, tipos=['Bug "crítico"'], sprint="Sprint 1",
+                     status_entregues=["Concluído com ressalvas"])
+    assert jql == (
+        'project = "10" AND (statusCategory = Done OR status in ("Concluído com ressalvas")) '
+        'AND issuetype in ("Bug \\"crítico\\"") AND sprint = "Sprint 1" ORDER BY created DESC'
+    )
+
+
+def test_montar_jql_sem_status_entregues_usa_categoria():
+    assert montar_jql(entregues=True, status_entregues=[], ordem=None) == "statusCategory = Done"
+
+
+def test_nomes_status_entregues_incluem_variantes_por_substring():
+    statuses = [
+        {"name": "Concluído com ressalvas", "statusCategory": {"name": "In Progress"}},
+        {"name": "Aprovado pelo PO", "statusCategory": {"name": "To Do"}},
+        {"name": "Em Andamento", "statusCategory": {"name": "In Progress"}},
+        {"name": "Pronto", "statusCategory": {"name": "Done"}},
+    ]
+    assert nomes_status_entregues(statuses) == ["Aprovado pelo PO", "Concluído com ressalvas", "Pronto"]
+
+
+def test_filtrar_issues_por_status_data_e_sprint():
+    issues = [
+        issue("Concluído com ressalvas", sprints=[{"id": 7, "name": "Sprint 7"}]),
+        issue("Em Andamento", sprints=[{"id": 7, "name": "Sprint 7"}]),
+        issue("Fechado", sprints=[{"id": 8, "name": "Sprint 8"}]),
+        issue("Resolvido", resolvida="2025-01-01T00:00:00.000+0000", sprints=[{"id": 7, "name": "Sprint 7"}]),
+    ]
+    filtradas = filtrar_issues(issues, entregues=True, entregue_desde="2026-03-01", sprint=7)
+    assert filtradas == [issues[0]]
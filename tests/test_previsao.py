@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from utils_previsao import PERCENTIS_CONCLUSAO, prever_conclusao, prever_itens_ate, throughput_diario
+
+
+def test_throughput_diario_conta_entregas_por_dia_na_janela():
+    datas = [
+        "2026-03-10T10:00:00.000-0300", "2026-03-10T20:30:00.000-0300",
+        "2026-03-08T09:00:00.000-0300", "2026-01-01T09:00:00.000-0300", None,
+    ]
+    throughput = throughput_diario(datas, dias_historico=3, hoje="2026-03-10")
+    assert throughput.tolist() == [1, 0, 2]
+
+
+def test_prever_conclusao_com_throughput_constante():
+    previsao = prever_conclusao(np.array([2, 2, 2]), itens=10, tentativas=500, semente=0)
+    assert previsao["percentis"] == {p: 5.0 for p in PERCENTIS_CONCLUSAO}
+    assert previsao["probabilidade"][previsao["dias"] == 5][0] == 1
+
+
+def test_prever_conclusao_alem_do_horizonte_e_infinito_nao_nan():
+    throughput = np.array([1] + [0] * 99)
+    previsao = prever_conclusao(throughput, itens=50, tentativas=2_000, semente=0)
+    percentis = previsao["percentis"]
+    assert not any(np.isnan(valor) for valor in percentis.values())
+    assert percentis[95] == np.inf
+    assert previsao["horizonte"] == len(previsao["dias"])
+
+
+def test_prever_sem_entregas_ou_sem_itens():
+    assert prever_conclusao(np.zeros(10, dtype=np.int32), itens=5) is None
+    assert prever_conclusao(np.array([1, 2]), itens=0) is None
+    assert prever_itens_ate(np.array([1, 2]), dias=0) is None
+
+
+def test_prever_itens_ate_com_throughput_constante():
+    previsao = prever_itens_ate(np.array([3]), dias=4, tentativas=100, semente=0)
+    assert previsao["percentis"] == {p: 12 for p in PERCENTIS_CONCLUSAO}
+    assert previsao["totais"][12] == 100
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+import utils_quota
+from utils_quota import INTERATIVA, SEGUNDO_PLANO, aguardar_vez, definir_sessao, limitador, prioridade, suspender_quota
+
+URL = "https://exemplo.atlassian.net"
+
+
+@pytest.fixture(autouse=True)
+def limitadores(monkeypatch):
+    monkeypatch.setattr(utils_quota, "_limitadores", {})
+
+
+def em_fila(estado):
+    return sum(len(fila) for filas in estado["filas"].values() for fila in filas.values())
+
+
+def test_rajada_atendida_sem_espera():
+    estado = limitador(utils_quota.chave_quota(URL))
+    for _ in range(int(estado["capacidade"])):
+        assert aguardar_vez(URL) < 0.05
+    assert em_fila(estado) == 0
+
+
+def test_interativa_passa_na_frente_do_segundo_plano():
+    suspender_quota(URL, segundos=0.2)
+    ordem = []
+
+    def pedir(classe, sessao):
+        definir_sessao(sessao)
+        with prioridade(classe):
+            aguardar_vez(URL)
+        ordem.append(classe)
+
+    fundo = threading.Thread(target=pedir, args=(SEGUNDO_PLANO, "a"))
+    fundo.start()
+    time.sleep(0.05)
+    frente = threading.Thread(target=pedir, args=(INTERATIVA, "b"))
+    frente.start()
+    fundo.join(2)
+    frente.join(2)
+
+    assert ordem == [INTERATIVA, SEGUNDO_PLANO]
+
+
+class CondicaoInterrompida(threading.Condition):
+    def wait(self, timeout=None):
+        raise KeyboardInterrupt
+
+
+def test_senha_removida_quando_espera_e_interrompida():
+    estado = limitador(utils_quota.chave_quota(URL))
+    suspender_quota(URL, segundos=60)
+    estado["condicao"] = CondicaoInterrompida()
+
+    with pytest.raises(KeyboardInterrupt):
+        aguardar_vez(URL)
+
+    assert em_fila(estado) == 0
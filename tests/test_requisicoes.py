@@ -0,0 +1,26 @@
+import pytest
+
+from utils_requisicoes import contabilidade_atual, contabilizar, nova_contabilidade, registrar_chamada, total_chamadas
+
+
+def test_contabilizar_mescla_mesmo_com_excecao():
+    sessao = nova_contabilidade()
+    with pytest.raises(RuntimeError):
+        with contabilizar(sessao):
+            registrar_chamada("search/jql", 0.1, 100)
+            raise RuntimeError("st.stop")
+
+    assert total_chamadas(sessao) == 1
+    assert contabilidade_atual() is None
+
+
+def test_contabilizar_aninhado_conta_uma_vez():
+    sessao = nova_contabilidade()
+    with contabilizar(sessao) as rerun:
+        registrar_chamada("board", 0.1, 10)
+        with contabilizar(sessao) as fragmento:
+            registrar_chamada("board/sprint", 0.1, 10)
+        assert fragmento is rerun
+
+    assert total_chamadas(rerun) == 2
+    assert total_chamadas(sessao) == 2
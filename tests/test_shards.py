@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+import utils_dados
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(utils_dados, "MAX_SHARDS_PARALELOS", 1)
+    monkeypatch.setattr(utils_dados, "planejar_shards", lambda jira_url, project_id, headers: (["a", "b", "c"], 30))
+    return chamadas
+
+
+def test_shards_deduplicam_issues_entre_faixas(shards, monkeypatch):
+    paginas = {"a": [[{"id": 1}, {"id": 2}]], "b": [[{"id": 2}, {"id": 3}]], "c": [[{"id": "3"}]]}
+    monkeypatch.setattr(utils_dados, "iterar_paginas_jql", lambda jira_url, jql, headers: iter(paginas[jql]))
+
+    issues = [issue["id"] for pagina, _ in utils_dados.iterar_issues_projeto("url", "10", {}) for issue in pagina]
+    assert issues == [1, 2, 3]
+
+
+def test_falha_de_shard_interrompe_e_cancela_pendentes(shards, monkeypatch):
+    def paginas(jira_url, jql, headers):
+        shards.append(jql)
+        yield [{"id": jql}]
+        raise RuntimeError(f"falhou {jql}")
+
+    monkeypatch.setattr(utils_dados, "iterar_paginas_jql", paginas)
+
+    with pytest.raises(RuntimeError, match="falhou a"):
+        list(utils_dados.iterar_issues_projeto("url", "10", {}))
+    time.sleep(0.1)
+    assert shards == ["a"]
+
+
+def test_fechar_iterador_interrompe_shards(shards, monkeypatch):
+    parado = threading.Event()
+
+    def paginas(jira_url, jql, headers):
+        shards.append(jql)
+        try:
+            numero = 0
+            while True:
+                numero += 1
+                yield [{"id": f"{jql}{numero}"}]
+        finally:
+            parado.set()
+
+    monkeypatch.setattr(utils_dados, "iterar_paginas_jql", paginas)
+
+    iterador = utils_dados.iterar_issues_projeto("url", "10", {})
+    next(iterador)
+    iterador.close()
+
+    assert parado.wait(5)
+    time.sleep(0.1)
+    assert shards == ["a"]
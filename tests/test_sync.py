@@ -0,0 +1,21 @@
+from utils_armazenamento import ler_indice_issues, upsert_issues
+from sync_jira import remover_ausentes
+
+
+def issue(issue_id, project_id="10"):
+    return {"id": issue_id, "key": f"P-{issue_id}", "fields": {"updated": "2024-01-01T10:00:00.000+0000", "project": {"id": project_id}}}
+
+
+def test_remove_issues_que_sumiram_do_projeto(armazenamento):
+    upsert_issues(armazenamento, [issue("1"), issue("2"), issue("3"), issue("4", project_id="20")])
+
+    assert remover_ausentes(armazenamento, "10", [issue("1"), issue("3")]) == ["P-2"]
+    assert sorted(ler_indice_issues(armazenamento)["id"]) == ["1", "3", "4"]
+
+
+def test_issue_movida_sai_do_projeto_antigo(armazenamento):
+    upsert_issues(armazenamento, [issue("1"), issue("2")])
+    upsert_issues(armazenamento, [issue("2", project_id="20")])
+
+    assert remover_ausentes(armazenamento, "10", [issue("1")]) == []
+    assert sorted(ler_indice_issues(armazenamento)["id"]) == ["1", "2"]
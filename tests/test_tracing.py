@@ -0,0 +1,55 @@
+import contextvars
+import json
+
+import pytest
+
+import utils_tracing
+from utils_tracing import anotar, definir_sessao_trace, exportar_jsonl, exportar_prometheus, resumo_spans, span, traces_recentes
+
+
+@pytest.fixture(autouse=True)
+def metricas_limpas():
+    utils_tracing.limpar_metricas()
+    yield
+    utils_tracing.limpar_metricas()
+
+
+def test_spans_aninhados_formam_um_trace():
+    with span("render.pagina") as raiz:
+        with span("fetch.issues"):
+            anotar(contagem=3, tamanho_bytes=100, cache=False)
+
+    filho = raiz["filhos"][0]
+    assert filho["trace_id"] == raiz["trace_id"] and filho["pai_id"] == raiz["id"]
+    assert (filho["contagem"], filho["bytes"], filho["cache"]) == (3, 100, "miss")
+    assert [trace["nome"] for trace in traces_recentes()] == ["render.pagina"]
+    assert resumo_spans()["fetch.issues"]["cache_miss"] == 1
+
+
+def test_erro_registrado_no_span():
+    with pytest.raises(ValueError):
+        with span("falha") as registro:
+            raise ValueError
+    assert registro["erro"] == "ValueError"
+
+
+def test_exportacao_filtra_traces_pela_sessao():
+    def registrar(sessao):
+        definir_sessao_trace(sessao)
+        with span(f"render.{sessao}"):
+            pass
+
+    for sessao in ("a", "b"):
+        contextvars.copy_context().run(registrar, sessao)
+
+    linhas = [json.loads(linha) for linha in exportar_jsonl("a").splitlines()]
+    assert [linha["nome"] for linha in linhas] == ["render.a"]
+    assert len(exportar_jsonl().splitlines()) == 2
+
+
+def test_prometheus_tem_quantis_e_contagem():
+    with span("render.x"):
+        pass
+    texto = exportar_prometheus()
+    assert 'jira_dashboard_span_duration_seconds{span="render.x",quantile="0.95"}' in texto
+    assert 'jira_dashboard_span_duration_seconds_count{span="render.x"} 1' in texto
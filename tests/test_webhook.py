@@ -0,0 +1,54 @@
+import hashlib
+import hmac
+import http.client
+import threading
+from http.server import ThreadingHTTPServer
+
+from webhook_jira import TAMANHO_MAXIMO_CORPO, ReceptorWebhook, assinatura_valida, publicacao_devida
+
+SEGREDO = "segredo"
+CORPO = b'{"webhookEvent": "jira:issue_updated"}'
+
+
+def assinar(algoritmo, corpo=CORPO):
+    return f"{algoritmo}={hmac.new(SEGREDO.encode(), corpo, algoritmo).hexdigest()}"
+
+
+def test_aceita_hmac_sha256():
+    assert assinatura_valida(CORPO, assinar("sha256"), SEGREDO)
+
+
+def test_rejeita_outros_algoritmos():
+    assert not assinatura_valida(CORPO, assinar("md5"), SEGREDO)
+    assert not assinatura_valida(CORPO, assinar("sha1"), SEGREDO)
+
+
+def test_rejeita_assinatura_ausente_ou_corpo_alterado():
+    assert not assinatura_valida(CORPO, None, SEGREDO)
+    assert not assinatura_valida(CORPO, hashlib.sha256(CORPO).hexdigest(), SEGREDO)
+    assert not assinatura_valida(CORPO + b" ", assinar("sha256"), SEGREDO)
+
+
+def test_sem_segredo_aceita_tudo():
+    assert assinatura_valida(CORPO, None, None)
+
+
+def test_corpo_acima_do_limite_recusado_sem_leitura():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ReceptorWebhook)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        conexao = http.client.HTTPConnection("127.0.0.1", servidor.server_address[1], timeout=5)
+        conexao.putrequest("POST", "/")
+        conexao.putheader("Content-Length", str(TAMANHO_MAXIMO_CORPO + 1))
+        conexao.endheaders()
+        assert conexao.getresponse().status == 413
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_publicacao_espera_silencio_ou_atraso_maximo():
+    assert not publicacao_devida({"primeiro": 0, "ultimo": 0}, 5)
+    assert publicacao_devida({"primeiro": 0, "ultimo": 0}, 30)
+    assert not publicacao_devida({"primeiro": 0, "ultimo": 290}, 299)
+    assert publicacao_devida({"primeiro": 0, "ultimo": 299}, 300)
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from utils_armazenamento import completar_chaves_worklogs, ler_worklogs, upsert_worklogs
+from utils_worklogs import COLUNA_TEMPO_REGISTRADO, adicionar_tempo_registrado, horas_por_sprint, horas_registradas, normalizar_worklog
+
+
+def worklog(worklog_id, issue_id, autor, inicio, segundos):
+    return {
+        "id": worklog_id,
+        "issueId": issue_id,
+        "author": {"displayName": autor},
+        "started": inicio,
+        "timeSpentSeconds": segundos,
+        "updated": inicio,
+    }
+
+
+WORKLOGS = [
+    normalizar_worklog(worklog(1, 10, "Ana", "2024-01-02T09:00:00.000+0000", 3600), "P-10"),
+    normalizar_worklog(worklog(2, 10, "Bruno", "2024-01-02T14:00:00.000+0000", 1800), "P-10"),
+    normalizar_worklog(worklog(3, 11, "Ana", "2024-01-20T09:00:00.000+0000", 7200), "P-11"),
+]
+
+
+def test_horas_por_issue_e_por_dia():
+    df = pd.DataFrame(WORKLOGS)
+    por_issue = horas_registradas(df, ["issue_key"]).set_index("issue_key")["horas"]
+    assert por_issue.to_dict() == {"P-10": 1.5, "P-11": 2.0}
+
+    por_dia = horas_registradas(df, ["autor", "dia"])
+    assert por_dia.loc[por_dia["autor"] == "Ana", "horas"].tolist() == [1.0, 2.0]
+
+
+def test_horas_por_sprint_ignora_worklogs_fora_das_janelas():
+    sprints = [{"name": "Sprint 1", "startDate": "2024-01-01T00:00:00.000Z", "endDate": "2024-01-14T23:59:00.000Z"}]
+    resultado = horas_por_sprint(pd.DataFrame(WORKLOGS), sprints)
+    assert resultado.set_index("autor")["horas"].to_dict() == {"Ana": 1.0, "Bruno": 0.5}
+
+
+def test_tempo_registrado_por_issue():
+    df = adicionar_tempo_registrado(pd.DataFrame({"Issue Key": ["P-10", "P-12"]}), pd.DataFrame(WORKLOGS))
+    assert df[COLUNA_TEMPO_REGISTRADO].tolist() == [1.5, 0.0]
+
+
+def test_worklog_sem_issue_sincronizada_recebe_chave_depois(armazenamento):
+    upsert_worklogs(armazenamento, [normalizar_worklog(worklog(4, 12, "Ana", "2024-01-03T09:00:00.000+0000", 600))])
+    assert completar_chaves_worklogs(armazenamento, {"12": "P-12"}) == 1
+    assert ler_worklogs(armazenamento)["issue_key"].tolist() == ["P-12"]
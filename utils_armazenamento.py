@@ -0,0 +1,551 @@
+import contextvars
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from config import DIRETORIO_DADOS
+from utils_json import carregar_json, serializar_json
+from utils_tracing import anotar, span
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+VERSAO_ESQUEMA = 2
+COMPRESSAO = "zstd"
+PARTES_ISSUES = 16
+COLUNAS_INDICE = ["id", "key", "project_id", "updated", "hash"]
+COLUNAS_WORKLOG = ["worklog_id", "issue_id", "issue_key", "autor", "inicio", "segundos", "atualizado"]
+TABELAS_PUBLICADAS = ("issues", "transicoes", "worklogs")
+PUBLICACOES_MANTIDAS = 2
+
+_lock = threading.Lock()
+_memoria = {}
+_leitores = ThreadPoolExecutor(max_workers=4, thread_name_prefix="armazenamento")
+_mapeadas = {}
+_bloqueios = {}
+
+
+def _slug(texto):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(texto)).strip("_")
+
+
+def instancia(jira_url):
+    return urlparse(jira_url).netloc or jira_url
+
+
+def caminho_instancia(jira_url):
+    return os.path.join(DIRETORIO_DADOS, _slug(instancia(jira_url)), f"v{VERSAO_ESQUEMA}")
+
+
+def _caminho_tabela(jira_url, tabela):
+    return os.path.join(caminho_instancia(jira_url), f"{tabela}.parquet")
+
+
+def _caminho_marcas(jira_url):
+    return os.path.join(caminho_instancia(jira_url), "marcas.json")
+
+
+def _caminho_board(jira_url, board_id):
+    return os.path.join(caminho_instancia(jira_url), "boards", f"board_{_slug(board_id)}.json")
+
+
+def _escrever_atomico(caminho, escrever):
+    diretorio = os.path.dirname(caminho)
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=f"{os.path.basename(caminho)}.", suffix=".tmp")
+    os.close(descritor)
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _travar_arquivo(arquivo):
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.1)
+
+
+def _destravar_arquivo(arquivo):
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def bloqueio_instancia(jira_url):
+    with _lock:
+        bloqueio = _bloqueios.setdefault(instancia(jira_url), {"trava": threading.RLock(), "nivel": 0, "arquivo": None})
+
+    with bloqueio["trava"]:
+        if bloqueio["nivel"] == 0:
+            os.makedirs(caminho_instancia(jira_url), exist_ok=True)
+            arquivo = open(os.path.join(caminho_instancia(jira_url), ".lock"), "a+b")
+            _travar_arquivo(arquivo)
+            bloqueio["arquivo"] = arquivo
+        bloqueio["nivel"] += 1
+        try:
+            yield
+        finally:
+            bloqueio["nivel"] -= 1
+            if bloqueio["nivel"] == 0:
+                _destravar_arquivo(bloqueio["arquivo"])
+                bloqueio["arquivo"].close()
+                bloqueio["arquivo"] = None
+
+
+def _bloqueado(funcao):
+    @wraps(funcao)
+    def wrapper(jira_url, *args, **kwargs):
+        with bloqueio_instancia(jira_url):
+            return funcao(jira_url, *args, **kwargs)
+    return wrapper
+
+
+def salvar_tabela(jira_url, tabela, df):
+    caminho = _caminho_tabela(jira_url, tabela)
+    with span("store.escrever", tabela=tabela):
+        _escrever_atomico(caminho, lambda destino: df.to_parquet(destino, index=False, compression=COMPRESSAO))
+        anotar(contagem=len(df), tamanho_bytes=os.path.getsize(caminho))
+
+
+def ler_tabela(jira_url, tabela, colunas=None):
+    caminho = _caminho_tabela(jira_url, tabela)
+    if not os.path.exists(caminho):
+        return pd.DataFrame()
+    with span("store.ler", tabela=tabela):
+        df = pd.read_parquet(caminho, columns=colunas)
+        anotar(contagem=len(df), tamanho_bytes=os.path.getsize(caminho))
+        return df
+
+
+def _diretorio_publicacoes(jira_url):
+    return os.path.join(caminho_instancia(jira_url), "publicado")
+
+
+def _caminho_publicado(jira_url, versao, tabela):
+    return os.path.join(_diretorio_publicacoes(jira_url), versao, f"{tabela}.arrow")
+
+
+def versao_publicada(jira_url):
+    caminho = os.path.join(_diretorio_publicacoes(jira_url), "ATUAL")
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        return arquivo.read().strip() or None
+
+
+def _tabela_mapeada(jira_url, versao, tabela):
+    chave = (instancia(jira_url), versao, tabela)
+    with _lock:
+        if chave in _mapeadas:
+            return _mapeadas[chave]
+
+    caminho = _caminho_publicado(jira_url, versao, tabela)
+    if not os.path.exists(caminho):
+        return None
+    with span("store.mapear", tabela=tabela):
+        mapeada = pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+        anotar(contagem=mapeada.num_rows, tamanho_bytes=os.path.getsize(caminho))
+
+    with _lock:
+        for antiga in [c for c in _mapeadas if c[0] == chave[0] and c[2] == tabela and c[1] != versao]:
+            del _mapeadas[antiga]
+        _mapeadas[chave] = mapeada
+    return mapeada
+
+
+def ler_publicado(jira_url, tabela, colunas=None, filtro=None):
+    versao = versao_publicada(jira_url)
+    mapeada = _tabela_mapeada(jira_url, versao, tabela) if versao else None
+    if mapeada is None:
+        return None
+
+    if filtro is not None:
+        coluna, valores = filtro
+        mapeada = mapeada.filter(pc.is_in(mapeada[coluna], value_set=pa.array(list(valores), type=mapeada.schema.field(coluna).type)))
+    if colunas is not None:
+        mapeada = mapeada.select(colunas)
+    return mapeada.to_pandas()
+
+
+def _escrever_arrow(caminho, df):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+
+    def escrever(destino):
+        with pa.OSFile(destino, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+    _escrever_atomico(caminho, escrever)
+
+
+@_bloqueado
+def publicar_versao(jira_url):
+    versao = str(time.time_ns())
+    with span("store.publicar", versao=versao):
+        fontes = {
+            "issues": lambda: _ler_partes(jira_url, _partes_existentes(jira_url)),
+            "transicoes": lambda: ler_tabela(jira_url, "transicoes"),
+            "worklogs": lambda: ler_tabela(jira_url, "worklogs"),
+        }
+        for tabela in TABELAS_PUBLICADAS:
+            df = fontes[tabela]()
+            if not df.empty:
+                _escrever_arrow(_caminho_publicado(jira_url, versao, tabela), df)
+
+        diretorio = _diretorio_publicacoes(jira_url)
+        os.makedirs(diretorio, exist_ok=True)
+
+        def escrever_ponteiro(destino):
+            with open(destino, "w", encoding="utf-8") as arquivo:
+                arquivo.write(versao)
+
+        _escrever_atomico(os.path.join(diretorio, "ATUAL"), escrever_ponteiro)
+
+        anteriores = sorted(v for v in os.listdir(diretorio) if v.isdigit() and v != versao)
+        for antiga in anteriores[:max(0, len(anteriores) - PUBLICACOES_MANTIDAS + 1)]:
+            shutil.rmtree(os.path.join(diretorio, antiga), ignore_errors=True)
+    return versao
+
+
+def _escrever_json(caminho, dados):
+    def escrever(destino):
+        with open(destino, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False, indent=2, default=str)
+
+    _escrever_atomico(caminho, escrever)
+
+
+def _ler_json(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+@_bloqueado
+def salvar_board(jira_url, board_id, project_id, sprints, **metadados):
+    _escrever_json(_caminho_board(jira_url, board_id), {
+        "board_id": board_id,
+        "project_id": str(project_id),
+        "sprints": sprints,
+        **metadados,
+    })
+
+
+def ler_board(jira_url, board_id):
+    return _ler_json(_caminho_board(jira_url, board_id))
+
+
+@_bloqueado
+def atualizar_sprint_board(jira_url, board_id, sprint, removida=False):
+    board = ler_board(jira_url, board_id)
+    if not board:
+        return False
+    sprints = [s for s in board.get("sprints", []) if s.get("id") != sprint.get("id")]
+    if not removida:
+        sprints.append(sprint)
+    board["sprints"] = sorted(sprints, key=lambda s: s.get("id", 0))
+    _escrever_json(_caminho_board(jira_url, board_id), board)
+    return True
+
+
+def ler_marca(jira_url, nome, padrao=None):
+    return _ler_json(_caminho_marcas(jira_url)).get(nome, padrao)
+
+
+@_bloqueado
+def salvar_marca(jira_url, nome, valor):
+    caminho = _caminho_marcas(jira_url)
+    _escrever_json(caminho, {**_ler_json(caminho), nome: valor})
+
+
+def existe_snapshot(jira_url, board_id):
+    return bool(ler_board(jira_url, board_id).get("sincronizado_em"))
+
+
+def idade_snapshot(jira_url, board_id):
+    sincronizado_em = ler_board(jira_url, board_id).get("sincronizado_em")
+    return time.time() - sincronizado_em if sincronizado_em else None
+
+
+def _project_id(issue):
+    return str(((issue.get("fields") or {}).get("project") or {}).get("id", ""))
+
+
+def compartilhar_issues(jira_url, issues):
+    with _lock:
+        memoria = _memoria.setdefault(instancia(jira_url), {"mtime": None, "issues": {}})
+        compartilhadas = []
+        for issue in issues:
+            issue_id = str(issue.get("id"))
+            existente = memoria["issues"].get(issue_id)
+            if existente is not None and existente.get("fields", {}).get("updated") == issue.get("fields", {}).get("updated"):
+                compartilhadas.append(existente)
+            else:
+                memoria["issues"][issue_id] = issue
+                compartilhadas.append(issue)
+        return compartilhadas
+
+
+def _parte(issue_id):
+    issue_id = str(issue_id)
+    return (int(issue_id) if issue_id.isdigit() else zlib.crc32(issue_id.encode())) % PARTES_ISSUES
+
+
+def _tabela_parte(parte):
+    return f"issues/parte_{parte:02d}"
+
+
+def _partes_existentes(jira_url):
+    return [
+        parte for parte in range(PARTES_ISSUES)
+        if os.path.exists(_caminho_tabela(jira_url, _tabela_parte(parte)))
+    ]
+
+
+def _ler_partes(jira_url, partes, colunas=None):
+    futuros = [
+        _leitores.submit(contextvars.copy_context().run, ler_tabela, jira_url, _tabela_parte(parte), colunas)
+        for parte in partes
+    ]
+    tabelas = [futuro.result() for futuro in futuros]
+    tabelas = [df for df in tabelas if not df.empty]
+    return pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame(columns=colunas)
+
+
+def _hash_payload(payload):
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def ler_indice_issues(jira_url):
+    return _ler_partes(jira_url, _partes_existentes(jira_url), COLUNAS_INDICE)
+
+
+def ler_issues_instancia(jira_url, project_id=None):
+    versao = versao_publicada(jira_url)
+    if versao is not None:
+        filtro = ("project_id", [str(project_id)]) if project_id is not None else None
+        df = ler_publicado(jira_url, "issues", colunas=["id", "payload"], filtro=filtro)
+        if df is not None:
+            return {issue_id: carregar_json(payload) for issue_id, payload in zip(df["id"], df["payload"])}
+
+    partes = _partes_existentes(jira_url)
+    if not partes:
+        return {}
+
+    assinatura = tuple(os.path.getmtime(_caminho_tabela(jira_url, _tabela_parte(p))) for p in partes)
+    chave = instancia(jira_url)
+    with _lock:
+        memoria = _memoria.get(chave)
+        if memoria is not None and memoria["mtime"] == assinatura:
+            return memoria["issues"]
+
+    df = _ler_partes(jira_url, partes, ["id", "payload"])
+    issues = {issue_id: carregar_json(payload) for issue_id, payload in zip(df["id"], df["payload"])}
+    with _lock:
+        _memoria[chave] = {"mtime": assinatura, "issues": issues}
+    return issues
+
+
+@_bloqueado
+def upsert_issues(jira_url, issues):
+    payloads = [serializar_json(i) for i in issues]
+    novas = pd.DataFrame({
+        "id": [str(i.get("id")) for i in issues],
+        "key": [i.get("key") for i in issues],
+        "project_id": [_project_id(i) for i in issues],
+        "updated": [i.get("fields", {}).get("updated") for i in issues],
+        "hash": [_hash_payload(p) for p in payloads],
+        "payload": payloads,
+    }).drop_duplicates(subset="id", keep="last")
+
+    indice = ler_indice_issues(jira_url)
+    anteriores = indice.set_index("id")["hash"] if not indice.empty else pd.Series(dtype=str)
+    alteradas = novas[novas["hash"].ne(novas["id"].map(anteriores))]
+    if alteradas.empty:
+        return set()
+
+    with span("store.upsert_issues", alteradas=len(alteradas)):
+        for parte, grupo in alteradas.groupby(alteradas["id"].map(_parte)):
+            existentes = ler_tabela(jira_url, _tabela_parte(parte))
+            if not existentes.empty:
+                grupo = pd.concat([existentes[~existentes["id"].isin(grupo["id"])], grupo], ignore_index=True)
+            salvar_tabela(jira_url, _tabela_parte(parte), grupo)
+    return set(alteradas["id"])
+
+
+@_bloqueado
+def remover_issues(jira_url, issue_ids):
+    issue_ids = {str(i) for i in issue_ids}
+    chaves = []
+    for parte in {_parte(i) for i in issue_ids}:
+        existentes = ler_tabela(jira_url, _tabela_parte(parte))
+        if existentes.empty:
+            continue
+        removidas = existentes["id"].isin(issue_ids)
+        chaves.extend(existentes.loc[removidas, "key"])
+        if removidas.any():
+            salvar_tabela(jira_url, _tabela_parte(parte), existentes[~removidas])
+
+    transicoes = ler_tabela(jira_url, "transicoes")
+    if not transicoes.empty and transicoes["issue_id"].isin(issue_ids).any():
+        salvar_tabela(jira_url, "transicoes", transicoes[~transicoes["issue_id"].isin(issue_ids)])
+    worklogs = ler_tabela(jira_url, "worklogs")
+    if not worklogs.empty and worklogs["issue_id"].isin(issue_ids).any():
+        salvar_tabela(jira_url, "worklogs", worklogs[~worklogs["issue_id"].isin(issue_ids)])
+    return chaves
+
+
+def ler_issues(jira_url, board_id):
+    board = ler_board(jira_url, board_id)
+    project_id = board.get("project_id")
+    return [
+        issue for issue in ler_issues_instancia(jira_url, project_id).values()
+        if _project_id(issue) == project_id
+    ]
+
+
+def ler_sprints(jira_url, board_id):
+    return ler_board(jira_url, board_id).get("sprints", [])
+
+
+def transicoes_para_df(transicoes_por_issue, ids_por_chave):
+    linhas = [
+        {"issue_id": ids_por_chave.get(key), "issue_key": key, "de": de, "para": para, "data": data}
+        for key, transicoes in transicoes_por_issue.items()
+        for de, para, data in transicoes
+    ]
+    df = pd.DataFrame(linhas, columns=["issue_id", "issue_key", "de", "para", "data"])
+    df["data"] = pd.to_datetime(df["data"], utc=True)
+    return df
+
+
+@_bloqueado
+def anexar_transicoes(jira_url, transicoes_por_issue, ids_por_chave):
+    existentes = ler_tabela(jira_url, "transicoes")
+    novas = transicoes_para_df(transicoes_por_issue, ids_por_chave)
+
+    if not existentes.empty and not novas.empty:
+        ultima = existentes.groupby("issue_key")["data"].max()
+        limite = novas["issue_key"].map(ultima)
+        novas = novas[limite.isna() | (novas["data"] > limite)]
+
+    if novas.empty:
+        return 0
+    salvar_tabela(jira_url, "transicoes", pd.concat([existentes, novas], ignore_index=True) if not existentes.empty else novas)
+    return len(novas)
+
+
+def ler_marcas_changelog(jira_url):
+    df = ler_tabela(jira_url, "changelog_sincronizado")
+    return dict(zip(df["issue_id"], df["updated"])) if not df.empty else {}
+
+
+def issues_com_changelog_pendente(jira_url, issues):
+    marcas = ler_marcas_changelog(jira_url)
+    pendentes = []
+    for issue in issues:
+        marca = marcas.get(str(issue.get("id")))
+        updated = issue.get("fields", {}).get("updated")
+        if marca is None or (updated and pd.Timestamp(updated) > pd.Timestamp(marca)):
+            pendentes.append(issue)
+    return pendentes
+
+
+@_bloqueado
+def salvar_marcas_changelog(jira_url, issues):
+    existentes = ler_tabela(jira_url, "changelog_sincronizado")
+    novas = pd.DataFrame({
+        "issue_id": [str(i.get("id")) for i in issues],
+        "issue_key": [i.get("key") for i in issues],
+        "updated": [i.get("fields", {}).get("updated") for i in issues],
+    })
+    if not existentes.empty:
+        novas = pd.concat([existentes, novas], ignore_index=True).drop_duplicates(subset="issue_id", keep="last")
+    salvar_tabela(jira_url, "changelog_sincronizado", novas)
+
+
+def ler_transicoes(jira_url, chaves=None):
+    df = ler_publicado(jira_url, "transicoes", filtro=("issue_key", chaves) if chaves is not None else None)
+    if df is None:
+        df = ler_tabela(jira_url, "transicoes")
+        if chaves is not None and not df.empty:
+            df = df[df["issue_key"].isin(list(chaves))]
+    transicoes_por_issue = {}
+    if df.empty:
+        return transicoes_por_issue
+    df = df.sort_values("data")
+    for key, de, para, data in df[["issue_key", "de", "para", "data"]].itertuples(index=False):
+        transicoes_por_issue.setdefault(key, []).append((de, para, data.to_pydatetime()))
+    return transicoes_por_issue
+
+
+@_bloqueado
+def upsert_worklogs(jira_url, worklogs):
+    existentes = ler_tabela(jira_url, "worklogs")
+    novos = pd.DataFrame(worklogs, columns=COLUNAS_WORKLOG)
+    if not existentes.empty:
+        novos = pd.concat([existentes, novos], ignore_index=True).drop_duplicates(subset="worklog_id", keep="last")
+    salvar_tabela(jira_url, "worklogs", novos)
+
+
+@_bloqueado
+def completar_chaves_worklogs(jira_url, chaves_por_id):
+    existentes = ler_tabela(jira_url, "worklogs")
+    if existentes.empty:
+        return 0
+    sem_chave = existentes["issue_key"].isna() & existentes["issue_id"].isin(list(chaves_por_id))
+    if sem_chave.any():
+        existentes.loc[sem_chave, "issue_key"] = existentes.loc[sem_chave, "issue_id"].map(chaves_por_id)
+        salvar_tabela(jira_url, "worklogs", existentes)
+    return int(sem_chave.sum())
+
+
+@_bloqueado
+def remover_worklogs(jira_url, worklog_ids):
+    existentes = ler_tabela(jira_url, "worklogs")
+    if existentes.empty:
+        return 0
+    restantes = existentes[~existentes["worklog_id"].isin(list(worklog_ids))]
+    if len(restantes) != len(existentes):
+        salvar_tabela(jira_url, "worklogs", restantes)
+    return len(existentes) - len(restantes)
+
+
+def ler_worklogs(jira_url, issue_ids=None):
+    df = ler_publicado(jira_url, "worklogs", filtro=("issue_id", issue_ids) if issue_ids is not None else None)
+    if df is not None:
+        return df
+    df = ler_tabela(jira_url, "worklogs")
+    if issue_ids is not None and not df.empty:
+        df = df[df["issue_id"].isin(list(issue_ids))]
+    return df
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from utils_tracing import anotar, span
+
+MAX_FIGURAS = 256
+
+_lock = threading.Lock()
+_versoes = {}
+_figuras = OrderedDict()
+_estatisticas = {"hits": 0, "misses": 0}
+
+
+def versao_dados(*origem):
+    with _lock:
+        return origem + (_versoes.get(origem, 0),)
+
+
+def nova_versao_dados(*origem):
+    with _lock:
+        _versoes[origem] = _versoes.get(origem, 0) + 1
+        return origem + (_versoes[origem],)
+
+
+def _hash_filtros(filtros):
+    serializado = json.dumps(filtros, sort_keys=True, default=str)
+    return hashlib.md5(serializado.encode()).hexdigest()
+
+
+def cache_figura(chart_id, versao, filtros, construir):
+    with span(f"render.{chart_id}"):
+        return _cache_figura(chart_id, versao, filtros, construir)
+
+
+def _cache_figura(chart_id, versao, filtros, construir):
+    if versao is None:
+        return construir()
+
+    chave = (chart_id, versao, _hash_filtros(filtros))
+
+    with _lock:
+        if chave in _figuras:
+            _figuras.move_to_end(chave)
+            _estatisticas["hits"] += 1
+            anotar(cache=True)
+            return _figuras[chave]
+        _estatisticas["misses"] += 1
+
+    anotar(cache=False)
+    figura = construir()
+
+    with _lock:
+        _figuras[chave] = figura
+        _figuras.move_to_end(chave)
+        while len(_figuras) > MAX_FIGURAS:
+            _figuras.popitem(last=False)
+
+    return figura
+
+
+def estatisticas_cache_figuras():
+    with _lock:
+        return {**_estatisticas, "tamanho": len(_figuras), "capacidade": MAX_FIGURAS}
+
+
+def limpar_cache_figuras():
+    with _lock:
+        _figuras.clear()
@@ -0,0 +1,157 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import MAX_PROJETOS_PARALELOS, PROJETOS, get_projeto_config
+from utils_cache import nova_versao_dados
+from utils_armazenamento import compartilhar_issues
+from utils_dados import iterar_issues
+from utils_frescor import marca_carga
+from utils_quota import SEGUNDO_PLANO, prioridade
+from utils_requisicoes import iniciar_contabilidade
+from utils_tracing import anotar, definir_sessao_trace, span
+
+TTL_DADOS = 600
+JANELA_VISITAS = 1800
+ESPERA_INICIAL_FALHA = 5
+ESPERA_MAXIMA_FALHA = 600
+
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=MAX_PROJETOS_PARALELOS, thread_name_prefix="carregamento")
+_futuros = {}
+_falhas = {}
+_visitas = {}
+_progresso = {}
+
+
+def carregar_projeto(nome_projeto):
+    with span("load.projeto", projeto=nome_projeto):
+        jira_url, board_id, headers = get_projeto_config(nome_projeto)
+        progresso = {"issues": [], "paginas": 0, "total": None, "inicio": time.time()}
+        with _lock:
+            _progresso[nome_projeto] = progresso
+        try:
+            marca = marca_carga(jira_url, board_id, headers, progresso["inicio"])
+
+            for pagina, total in iterar_issues(jira_url, board_id, headers):
+                progresso["issues"].extend(pagina)
+                progresso["paginas"] += 1
+                progresso["total"] = total
+        finally:
+            with _lock:
+                if _progresso.get(nome_projeto) is progresso:
+                    del _progresso[nome_projeto]
+
+        issues = compartilhar_issues(jira_url, progresso["issues"])
+        anotar(contagem=len(issues), paginas=progresso["paginas"])
+        return {
+            "issues": issues,
+            "versao": nova_versao_dados("issues", jira_url, board_id),
+            "marca": marca,
+            "carregado_em": time.time(),
+        }
+
+
+def _carregar_isolado(nome_projeto):
+    contabilidade = iniciar_contabilidade()
+    definir_sessao_trace(None)
+    try:
+        dados = carregar_projeto(nome_projeto)
+    except Exception:
+        with _lock:
+            tentativas = _falhas.get(nome_projeto, {}).get("tentativas", 0) + 1
+            _falhas[nome_projeto] = {"tentativas": tentativas, "em": time.time()}
+        raise
+    with _lock:
+        _falhas.pop(nome_projeto, None)
+    return {**dados, "contabilidade": contabilidade}
+
+
+def espera_apos_falha(tentativas):
+    return min(ESPERA_MAXIMA_FALHA, ESPERA_INICIAL_FALHA * 2 ** (tentativas - 1))
+
+
+def _expirado(nome_projeto, futuro):
+    if not futuro.done():
+        return False
+    if futuro.exception() is not None:
+        falha = _falhas.get(nome_projeto)
+        return falha is None or time.time() - falha["em"] > espera_apos_falha(falha["tentativas"])
+    return time.time() - futuro.result()["carregado_em"] > TTL_DADOS
+
+
+def _obter_futuro(nome_projeto, forcar=False):
+    with _lock:
+        futuro = _futuros.get(nome_projeto)
+        if futuro is None or forcar or _expirado(nome_projeto, futuro):
+            contexto = contextvars.copy_context()
+            futuro = _executor.submit(contexto.run, _carregar_isolado, nome_projeto)
+            _futuros[nome_projeto] = futuro
+        return futuro
+
+
+def visitados_recentemente():
+    limite = time.time() - JANELA_VISITAS
+    with _lock:
+        return [nome for nome, visita in _visitas.items() if visita >= limite and nome in PROJETOS]
+
+
+def iniciar_prefetch(nomes_projetos=None, prioritario=None):
+    if prioritario:
+        with _lock:
+            _visitas[prioritario] = time.time()
+        _obter_futuro(prioritario)
+    with prioridade(SEGUNDO_PLANO):
+        for nome_projeto in nomes_projetos or visitados_recentemente():
+            _obter_futuro(nome_projeto)
+
+
+def obter_dados_projeto(nome_projeto, timeout=None):
+    return _obter_futuro(nome_projeto).result(timeout=timeout)
+
+
+def progresso_projeto(nome_projeto):
+    futuro = _obter_futuro(nome_projeto)
+    with _lock:
+        progresso = _progresso.get(nome_projeto) or {"issues": [], "paginas": 0, "total": None, "inicio": time.time()}
+
+    issues = progresso["issues"][:]
+    decorrido = time.time() - progresso["inicio"]
+    total = progresso["total"]
+    faltam = (total or 0) - len(issues)
+    erro = futuro.exception() if futuro.done() else None
+    return {
+        "pronto": futuro.done(),
+        "status": "erro" if erro is not None else "pronto" if futuro.done() else "carregando",
+        "erro": erro,
+        "issues": issues,
+        "paginas": progresso["paginas"],
+        "total": total,
+        "decorrido": decorrido,
+        "eta": decorrido / len(issues) * faltam if issues and faltam > 0 else None,
+    }
+
+
+def invalidar_projeto(nome_projeto):
+    with _lock:
+        _futuros.pop(nome_projeto, None)
+
+
+def dados_carregados():
+    with _lock:
+        futuros = dict(_futuros)
+    return {
+        nome: futuro.result()
+        for nome, futuro in futuros.items()
+        if futuro.done() and futuro.exception() is None
+    }
+
+
+def status_carregamento():
+    with _lock:
+        futuros = dict(_futuros)
+    return {
+        nome: "erro" if futuro.done() and futuro.exception() is not None else "pronto" if futuro.done() else "carregando"
+        for nome, futuro in futuros.items()
+    }
@@ -0,0 +1,141 @@
+import threading
+
+import pandas as pd
+from utils_tracing import anotar, span
+
+_lock = threading.Lock()
+_estados = {}
+_eventos = {}
+
+
+def _linhas_fluxo(transicoes_por_issue, criacao_por_issue, status_por_issue, vistos):
+    linhas = []
+    processados = {}
+    for key, criado in criacao_por_issue.items():
+        transicoes = transicoes_por_issue.get(key, [])
+        inicial = transicoes[0][0] if transicoes else status_por_issue.get(key)
+        anterior = vistos.get(key)
+        if anterior is None:
+            linhas.append((criado, inicial, 1))
+            inicio = 0
+        elif anterior["criado"] != criado or anterior["inicial"] != inicial or anterior["transicoes"] > len(transicoes) \
+                or (anterior["transicoes"] and transicoes[anterior["transicoes"] - 1][2] != anterior["ultima"]):
+            return None, None
+        else:
+            inicio = anterior["transicoes"]
+        for de, para, data in transicoes[inicio:]:
+            linhas.append((data, de, -1))
+            linhas.append((data, para, 1))
+        processados[key] = {
+            "criado": criado,
+            "inicial": inicial,
+            "transicoes": len(transicoes),
+            "ultima": transicoes[-1][2] if transicoes else None,
+        }
+    if any(key not in processados for key in vistos):
+        return None, None
+    return linhas, processados
+
+
+def _montar_eventos(linhas):
+    eventos = pd.DataFrame(linhas, columns=["data", "status", "delta"]).dropna(subset=["data", "status"])
+    eventos["data"] = pd.to_datetime(eventos["data"], utc=True)
+    eventos["dia"] = eventos["data"].dt.tz_convert(None).dt.normalize()
+    return eventos.sort_values("data", kind="stable", ignore_index=True)
+
+
+def eventos_fluxo(transicoes_por_issue, criacao_por_issue, status_por_issue):
+    linhas, _ = _linhas_fluxo(transicoes_por_issue, criacao_por_issue, status_por_issue, {})
+    return _montar_eventos(linhas)
+
+
+def eventos_incrementais(chave, versao, transicoes_por_issue, criacao_por_issue, status_por_issue):
+    with span("aggregate.eventos_fluxo", chave=str(chave)):
+        with _lock:
+            estado = _eventos.get(chave)
+        if estado is not None and estado["versao"] == versao:
+            anotar(cache=True)
+            return estado["eventos"]
+
+        linhas, vistos = (None, None) if estado is None else _linhas_fluxo(
+            transicoes_por_issue, criacao_por_issue, status_por_issue, estado["vistos"]
+        )
+        anotar(cache=False, incremental=linhas is not None)
+        if linhas is None:
+            linhas, vistos = _linhas_fluxo(transicoes_por_issue, criacao_por_issue, status_por_issue, {})
+            eventos = _montar_eventos(linhas)
+        else:
+            anteriores, novos = estado["eventos"], _montar_eventos(linhas)
+            if novos.empty or anteriores.empty:
+                eventos = anteriores if novos.empty else novos
+            else:
+                eventos = pd.concat([anteriores, novos], ignore_index=True)
+                if novos["data"].iloc[0] < anteriores["data"].iloc[-1]:
+                    eventos = eventos.sort_values("data", kind="stable", ignore_index=True)
+        anotar(contagem=len(linhas))
+
+        with _lock:
+            _eventos[chave] = {"versao": versao, "eventos": eventos, "vistos": vistos}
+        return eventos
+
+
+def _ordem_status(eventos):
+    entradas = eventos[eventos["delta"] > 0]
+    return list(entradas.groupby("status")["data"].min().sort_values().index)
+
+
+def _acumular(eventos, dias, colunas, base=None):
+    diario = eventos.pivot_table(index="dia", columns="status", values="delta", aggfunc="sum", fill_value=0)
+    diario = diario.reindex(index=dias, columns=colunas, fill_value=0)
+    if base is not None:
+        diario.iloc[0] += base.reindex(colunas, fill_value=0)
+    return diario.cumsum()
+
+
+def calcular_cfd(eventos, ate=None):
+    if eventos.empty:
+        return pd.DataFrame()
+    ate = pd.Timestamp(ate or pd.Timestamp.now()).normalize()
+    dias = pd.date_range(eventos["dia"].min(), max(ate, eventos["dia"].max()), freq="D")
+    return _acumular(eventos, dias, _ordem_status(eventos))
+
+
+def _estender(estado, eventos, ate):
+    cfd = estado["cfd"]
+    novos = eventos.iloc[estado["eventos"]:]
+    inicio = min(novos["dia"].min(), cfd.index[-1] + pd.Timedelta(days=1)) if not novos.empty else cfd.index[-1] + pd.Timedelta(days=1)
+
+    colunas = list(cfd.columns) + [s for s in _ordem_status(novos) if s not in cfd.columns] if not novos.empty else list(cfd.columns)
+    anterior = cfd[cfd.index < inicio]
+    base = anterior.iloc[-1] if not anterior.empty else None
+    dias = pd.date_range(inicio, max(ate, eventos["dia"].max()), freq="D")
+    cauda = _acumular(eventos[eventos["dia"] >= inicio], dias, colunas, base)
+    return pd.concat([anterior.reindex(columns=colunas, fill_value=0), cauda])
+
+
+def cfd_incremental(chave, eventos, ate=None):
+    ate = pd.Timestamp(ate or pd.Timestamp.now()).normalize()
+    with span("aggregate.cfd", chave=str(chave)):
+        with _lock:
+            estado = _estados.get(chave)
+
+        reaproveitavel = (
+            estado is not None
+            and len(eventos) >= estado["eventos"]
+            and (estado["eventos"] == 0 or eventos["data"].iloc[estado["eventos"] - 1] == estado["ultimo_evento"])
+            and (len(eventos) == estado["eventos"] or eventos["data"].iloc[estado["eventos"]] >= estado["ultimo_evento"])
+        )
+
+        if reaproveitavel and len(eventos) == estado["eventos"] and estado["cfd"].index[-1] >= ate:
+            anotar(cache=True)
+            return estado["cfd"]
+
+        anotar(cache=False, incremental=reaproveitavel)
+        cfd = _estender(estado, eventos, ate) if reaproveitavel and not estado["cfd"].empty else calcular_cfd(eventos, ate)
+        with _lock:
+            _estados[chave] = {
+                "cfd": cfd,
+                "eventos": len(eventos),
+                "ultimo_evento": eventos["data"].iloc[-1] if not eventos.empty else None,
+            }
+        return cfd
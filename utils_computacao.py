@@ -0,0 +1,124 @@
+import io
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from config import MAX_PROCESSOS_COMPUTACAO
+from utils_json import carregar_json, serializar_json
+from utils_tracing import anotar, span
+
+MAX_RESULTADOS = 64
+
+_lock = threading.Lock()
+_executor = None
+_resultados = OrderedDict()
+
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None and MAX_PROCESSOS_COMPUTACAO > 0:
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_PROCESSOS_COMPUTACAO,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _descartar_pool():
+    global _executor
+    with _lock:
+        _executor = None
+
+
+def df_para_arrow(df):
+    sink = pa.BufferOutputStream()
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    with ipc.new_stream(sink, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return sink.getvalue()
+
+
+def arrow_para_df(buffer):
+    return ipc.open_stream(buffer).read_all().to_pandas()
+
+
+def _datas_mistas(df):
+    return any(
+        df[coluna].dtype == object and pd.api.types.infer_dtype(df[coluna], skipna=True) == "datetime"
+        for coluna in df.columns
+    )
+
+
+def _empacotar(valor):
+    if isinstance(valor, pd.DataFrame) and not _datas_mistas(valor):
+        try:
+            return "arrow", df_para_arrow(valor)
+        except pa.ArrowException:
+            anotar(arrow=False)
+    if isinstance(valor, list):
+        return "json", serializar_json(valor).encode()
+    return "bruto", valor
+
+
+def _desempacotar(pacote):
+    tipo, valor = pacote
+    if tipo == "arrow":
+        return arrow_para_df(valor)
+    if tipo == "json":
+        return carregar_json(valor)
+    return valor
+
+
+def _executar(funcao, pacote, args):
+    return _empacotar(funcao(_desempacotar(pacote), *args))
+
+
+def _em_processo(funcao, dados, args):
+    pool = _pool()
+    if pool is None:
+        return funcao(dados, *args)
+    try:
+        return _desempacotar(pool.submit(_executar, funcao, _empacotar(dados), args).result())
+    except BrokenProcessPool:
+        _descartar_pool()
+        anotar(pool_quebrado=True)
+        return funcao(dados, *args)
+
+
+def computar(nome, versao, funcao, dados, *args):
+    chave = (nome, versao) if versao is not None else None
+    with span(f"compute.{nome}"):
+        with _lock:
+            if chave in _resultados:
+                _resultados.move_to_end(chave)
+                anotar(cache=True)
+                resultado = _resultados[chave]
+                return resultado.copy() if isinstance(resultado, pd.DataFrame) else resultado
+
+        anotar(cache=False)
+        resultado = _em_processo(funcao, dados, args)
+
+        if chave is not None:
+            with _lock:
+                _resultados[chave] = resultado
+                while len(_resultados) > MAX_RESULTADOS:
+                    _resultados.popitem(last=False)
+        return resultado.copy() if isinstance(resultado, pd.DataFrame) else resultado
+
+
+def gerar_excel(df, aba):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name=aba)
+    return output.getvalue()
+
+
+def normalizar_json(issues):
+    return pd.json_normalize(issues)
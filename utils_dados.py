@@ -1,13 +1,22 @@
 import base64
-import holidays
-import requests
 from datetime import datetime, timedelta
 from dateutil.parser import parse
 import pandas as pd
-import time
+import contextvars
 import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from streamlit import cache_data
 import unicodedata
+from config import CAMPO_SPRINT, MAX_SHARDS_PARALELOS
+from service_jira import get_issues_from_sprint, get_sprints, get_transicoes_em_lote, jira_get, jira_post
+from utils_armazenamento import compartilhar_issues, existe_snapshot, ler_issues, ler_sprints, ler_transicoes, ler_worklogs, versao_publicada
+from utils_computacao import computar
+from utils_jql import CAMPOS_ENTREGAS, filtrar_issues, montar_jql, nomes_status_entregues
+from utils_json import json_resposta
+from utils_tracing import anotar, span
+from utils_worklogs import adicionar_tempo_registrado, normalizar_worklog
 
 
 @functools.lru_cache(maxsize=128)
@@ -15,6 +24,11 @@ import unicodedata
 def get_all_issues_cached(_jira_url, _board_id, _headers):
     return get_all_issues(_jira_url, _board_id, _headers)
 
+ISSUES_POR_SHARD = 2000
+MAX_SHARDS = 32
+
+_status_entregues = {}
+
 def get_issues_batch(jira_url, issue_keys, headers):
     jql = f'key in ({",".join(issue_keys)})'
     params = {
@@ -23,34 +37,121 @@ def get_issues_batch(jira_url, issue_keys, headers):
         "fields": "*all,-comment",
         "expand": "changelog"
     }
-    response = requests.get(
+    response = jira_get(
         f"{jira_url}/rest/api/3/search/jql",
-        headers=headers,
+        headers,
         params=params
     )
     response.raise_for_status()
-    return response.json().get("issues", [])
+    return json_resposta(response).get("issues", [])
 
 def autenticar(email, token):
     return base64.b64encode(f"{email}:{token}".encode()).decode()
 
-def get_all_issues(jira_url, board_id, headers):
-    delay_per_request = 0.12
-
+def get_project_id(jira_url, board_id, headers):
     board_url = f"{jira_url}/rest/agile/1.0/board/{board_id}"
-    board_resp = requests.get(board_url, headers=headers)
+    board_resp = jira_get(board_url, headers)
     board_resp.raise_for_status()
-    board_data = board_resp.json()
+    board_data = json_resposta(board_resp)
 
     project_id = board_data.get("location", {}).get("projectId")
     if not project_id:
         raise Exception("Não foi possível identificar o projeto pelo board_id")
+    return str(project_id)
 
+def get_all_issues(jira_url, board_id, headers):
+    with span("fetch.issues", board_id=board_id):
+        project_id = get_project_id(jira_url, board_id, headers)
+        issues = get_all_issues_projeto(jira_url, project_id, headers)
+        anotar(contagem=len(issues))
+        return issues
+
+def get_all_issues_projeto(jira_url, project_id, headers):
+    issues = [issue for pagina, _ in iterar_issues_projeto(jira_url, project_id, headers) for issue in pagina]
+    return sorted(issues, key=lambda i: i.get("fields", {}).get("created") or "", reverse=True)
+
+def iterar_issues_projeto(jira_url, project_id, headers):
+    shards, total = planejar_shards(jira_url, project_id, headers)
+    if len(shards) == 1:
+        for pagina in iterar_paginas_jql(jira_url, shards[0], headers):
+            yield pagina, total
+        return
+
+    fila = queue.Queue()
+    cancelado = threading.Event()
+
+    def consumir(jql):
+        try:
+            for pagina in iterar_paginas_jql(jira_url, jql, headers):
+                if cancelado.is_set():
+                    return
+                fila.put(pagina)
+        except Exception as erro:
+            fila.put(erro)
+        finally:
+            fila.put(None)
+
+    executor = ThreadPoolExecutor(max_workers=MAX_SHARDS_PARALELOS, thread_name_prefix="shard")
+    try:
+        for jql in shards:
+            executor.submit(contextvars.copy_context().run, consumir, jql)
+        restantes = len(shards)
+        vistos = set()
+        while restantes:
+            pagina = fila.get()
+            if pagina is None:
+                restantes -= 1
+                continue
+            if isinstance(pagina, Exception):
+                raise pagina
+            novas = [issue for issue in pagina if str(issue.get("id")) not in vistos]
+            vistos.update(str(issue.get("id")) for issue in novas)
+            yield novas, total
+    finally:
+        cancelado.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def contar_issues_jql(jira_url, jql, headers):
+    response = jira_post(f"{jira_url}/rest/api/3/search/approximate-count", headers, json={"jql": jql})
+    if response.status_code != 200:
+        return None
+    return json_resposta(response).get("count")
+
+def _data_criacao_extrema(jira_url, project_id, headers, ordem):
+    params = {"jql": montar_jql(project_id, ordem=f"created {ordem}"), "maxResults": 1, "fields": "created"}
+    response = jira_get(f"{jira_url}/rest/api/3/search/jql", headers, params=params)
+    response.raise_for_status()
+    issues = json_resposta(response).get("issues", [])
+    return pd.Timestamp(issues[0]["fields"]["created"]) if issues else None
+
+def planejar_shards(jira_url, project_id, headers):
+    with span("fetch.planejar_shards", project_id=project_id):
+        total = contar_issues_jql(jira_url, montar_jql(project_id, ordem=None), headers)
+        if total is not None and total <= ISSUES_POR_SHARD:
+            return [montar_jql(project_id)], total
+
+        primeira = _data_criacao_extrema(jira_url, project_id, headers, "ASC")
+        ultima = _data_criacao_extrema(jira_url, project_id, headers, "DESC")
+        if primeira is None or ultima is None or ultima <= primeira:
+            return [montar_jql(project_id)], total
+
+        quantidade = min(MAX_SHARDS, -(-total // ISSUES_POR_SHARD)) if total is not None else MAX_SHARDS_PARALELOS
+        limites = pd.date_range(primeira, ultima, periods=quantidade + 1)[1:-1].floor("min").unique()
+        anotar(contagem=total or 0, shards=len(limites) + 1)
+
+        bordas = [None, *limites, None]
+        return [
+            montar_jql(project_id, criado_desde=desde, criado_ate=ate)
+            for desde, ate in zip(bordas[:-1], bordas[1:])
+        ], total
+
+def buscar_issues_jql(jira_url, jql, headers, campos=None):
+    return [issue for pagina in iterar_paginas_jql(jira_url, jql, headers, campos) for issue in pagina]
+
+def iterar_paginas_jql(jira_url, jql, headers, campos=None):
     search_url = f"{jira_url}/rest/api/3/search/jql"
 
-    jql = f'project = "{project_id}" ORDER BY created DESC'
-
-    fields = "*all,-comment"
+    fields = ",".join(campos) if campos else "*all,-comment"
 
     params = {
         "jql": jql,
@@ -59,7 +160,6 @@ def get_all_issues(jira_url, board_id, headers):
         "validateQuery": "warn"
     }
 
-    all_issues = []
     next_page_token = None
 
     while True:
@@ -68,20 +168,63 @@ def get_all_issues(jira_url, board_id, headers):
         else:
             params.pop("nextPageToken", None)
 
-        response = requests.get(search_url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+        with span("fetch.pagina"):
+            response = jira_get(search_url, headers, params=params)
+            response.raise_for_status()
+            data = json_resposta(response)
+
+            issues = data.get("issues", [])
+            anotar(contagem=len(issues), tamanho_bytes=len(response.content))
 
-        issues = data.get("issues", [])
-        all_issues.extend(issues)
+        yield issues
 
         if data.get("isLast", True):
             break
 
         next_page_token = data.get("nextPageToken")
-        time.sleep(delay_per_request)
 
-    return all_issues
+def carregar_issues(jira_url, board_id, headers):
+    if existe_snapshot(jira_url, board_id):
+        return ler_issues(jira_url, board_id)
+    return compartilhar_issues(jira_url, get_all_issues(jira_url, board_id, headers))
+
+def iterar_issues(jira_url, board_id, headers):
+    if existe_snapshot(jira_url, board_id):
+        issues = ler_issues(jira_url, board_id)
+        yield issues, len(issues)
+        return
+    yield from iterar_issues_projeto(jira_url, get_project_id(jira_url, board_id, headers), headers)
+
+def get_status_entregues(jira_url, headers):
+    if jira_url not in _status_entregues:
+        response = jira_get(f"{jira_url}/rest/api/3/status", headers)
+        response.raise_for_status()
+        _status_entregues[jira_url] = nomes_status_entregues(json_resposta(response))
+    return _status_entregues[jira_url]
+
+def carregar_issues_entregues(jira_url, board_id, headers, desde=None, ate=None, tipos=None, sprint=None):
+    filtros = {"entregues": True, "entregue_desde": desde, "entregue_ate": ate, "tipos": tipos, "sprint": sprint}
+    if existe_snapshot(jira_url, board_id):
+        return filtrar_issues(ler_issues(jira_url, board_id), **filtros)
+
+    with span("fetch.entregues", board_id=board_id):
+        jql = montar_jql(get_project_id(jira_url, board_id, headers), status_entregues=get_status_entregues(jira_url, headers), **filtros)
+        issues = buscar_issues_jql(jira_url, jql, headers, campos=CAMPOS_ENTREGAS)
+        anotar(contagem=len(issues), jql=jql)
+        return issues
+
+def carregar_sprints(jira_url, board_id, headers):
+    if existe_snapshot(jira_url, board_id):
+        return ler_sprints(jira_url, board_id)
+    return get_sprints(jira_url, board_id, headers)
+
+def carregar_issues_sprint(jira_url, board_id, sprint_id, headers):
+    if existe_snapshot(jira_url, board_id):
+        return [
+            issue for issue in ler_issues(jira_url, board_id)
+            if any(s.get("id") == sprint_id for s in sprints_da_issue(issue))
+        ]
+    return get_issues_from_sprint(jira_url, sprint_id, headers)
 
 def get_prioridade(issue):
     priority_translation = {
@@ -130,13 +273,18 @@ def get_epic_color(issue):
     if epic_color in color_map:
         return color_map[epic_color]
 
+@functools.lru_cache(maxsize=1)
+def get_feriados():
+    import holidays
+    return holidays.Brazil(state='SP') # Adicione o estado se necessário
+
 def calcular_dias_uteis(inicio, fim):
     if not inicio or not fim:
         return None, [], []
 
     inicio_date = pd.to_datetime(inicio).date()
     fim_date = pd.to_datetime(fim).date()
-    feriados = holidays.Brazil(state='SP') # Adicione o estado se necessário
+    feriados = get_feriados()
     dias_uteis = [
         dia for dia in pd.date_range(inicio_date, fim_date)
         if dia.weekday() < 5 and dia.date() not in feriados
@@ -176,16 +324,133 @@ def count_bugs(subtasks):
         )
     )
 
-def get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome="Sprint"):
+def calcular_tempo_por_status(created_raw, transitions):
+    status_times = {}
+    if not transitions:
+        return status_times
+
+    first_status = transitions[0][0]
+    first_date = transitions[0][2]
+    created_date = parse(created_raw)
+    if created_date < first_date:
+        status_times[first_status] = calculate_working_hours(created_date, first_date)
+
+    prev_status, prev_date = first_status, first_date
+    for from_status, to_status, change_date in transitions:
+        if prev_status and prev_date:
+            hours = calculate_working_hours(prev_date, change_date)
+            status_times[prev_status] = status_times.get(prev_status, 0) + hours
+        prev_status = to_status
+        prev_date = change_date
+
+    if prev_status and prev_date:
+        hours = calculate_working_hours(prev_date, datetime.now(prev_date.tzinfo))
+        status_times[prev_status] = status_times.get(prev_status, 0) + hours
+
+    return status_times
+
+def montar_linha_transicoes(issue, sprint_name, transitions):
+    key = issue['key']
+    fields_issue = issue['fields']
+    assignee_field = fields_issue.get('assignee')
+    dev_nome_original = assignee_field['displayName'] if assignee_field else "Não atribuído"
+
+    created_raw = fields_issue.get("created")
+    created_dt = parse(created_raw) if created_raw else None
+
+    updated_raw = fields_issue.get("updated")
+    updated_dt = parse(updated_raw) if updated_raw else None
+
+    resolution_raw = fields_issue.get("resolutiondate")
+    resolution_dt = parse(resolution_raw) if resolution_raw else None
+
+    estimate = convert_time_to_hours((fields_issue.get('timetracking') or {}).get('originalEstimate'))
+    spent = convert_time_to_hours((fields_issue.get('timetracking') or {}).get('timeSpent'))
+
+    epic = fields_issue.get('parent', {}).get('fields', {}).get('summary', '-') if 'parent' in fields_issue else "-"
+    status_atual = fields_issue.get('status', {}).get('name', '-')
+
+    status_times = calcular_tempo_por_status(created_raw, transitions) if created_raw else {}
+
+    bug_count = count_bugs(fields_issue.get('subtasks', []))
+
+    row = {
+        "Sprint": sprint_name,
+        "Issue Key": key,
+        "Épico": epic,
+        "Tipo da Issue": fields_issue['issuetype']['name'],
+        "Status Atual": status_atual,
+        "Prioridade": (fields_issue.get('priority') or {}).get('name', 'Prioridade não definida'),
+        "Título": fields_issue.get('summary', '-'),
+        "Nome Original": dev_nome_original,
+        "Data Atualização": updated_dt,
+        "Data Criação": created_dt,
+        "Data Entrega": resolution_dt,
+        "Estimativa em Horas": estimate,
+        "Tempo Registrado(h))": spent,
+        "Quantidade de Bugs": bug_count
+    }
+    row.update(status_times)
+    return row
+
+def sprints_da_issue(issue):
+    sprint_field = issue.get('fields', {}).get(CAMPO_SPRINT)
+    if isinstance(sprint_field, list):
+        return [s for s in sprint_field if isinstance(s, dict)]
+    if isinstance(sprint_field, dict):
+        return [sprint_field]
+    return []
+
+def montar_df_transicoes(issues, transicoes_por_issue, filtro_nome="Sprint"):
+    with span("normalize.transicoes", origem="local"):
+        data = []
+        for issue in issues:
+            for sprint in sprints_da_issue(issue):
+                sprint_name = sprint.get('name', '')
+                if filtro_nome.lower() not in sprint_name.lower():
+                    continue
+                transitions = transicoes_por_issue.get(issue['key'], [])
+                data.append(montar_linha_transicoes(issue, sprint_name, transitions))
+        anotar(contagem=len(data))
+        return pd.DataFrame(data) if data else pd.DataFrame()
+
+def carregar_issues_com_transicoes(jira_url, board_id, headers, filtro_nome="Sprint", com_transicoes=False):
+    if existe_snapshot(jira_url, board_id):
+        issues = ler_issues(jira_url, board_id)
+        transicoes = ler_transicoes(jira_url, {issue["key"] for issue in issues})
+        publicada = versao_publicada(jira_url)
+        versao = (jira_url, board_id, filtro_nome, publicada) if publicada else None
+        df = computar("transicoes", versao, montar_df_transicoes, issues, transicoes, filtro_nome)
+        df = adicionar_tempo_registrado(df, ler_worklogs(jira_url, {str(issue["id"]) for issue in issues}))
+        return (df, transicoes) if com_transicoes else df
+    return get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome, com_transicoes)
+
+def extrair_worklogs(issues):
+    worklogs = []
+    for issue in issues:
+        worklog_field = issue.get("fields", {}).get("worklog") or {}
+        for worklog in worklog_field.get("worklogs", []):
+            worklogs.append({**normalizar_worklog(worklog, issue.get("key")), "issue_id": str(issue.get("id"))})
+    return worklogs
+
+def get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome="Sprint", com_transicoes=False):
+    with span("fetch.transicoes", board_id=board_id):
+        df, transicoes = _get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome)
+        anotar(contagem=len(df))
+        return (df, transicoes) if com_transicoes else df
+
+def _get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome):
     sprint_url = f"{jira_url}/rest/agile/1.0/board/{board_id}/sprint"
     endpoint = f"{jira_url}/rest/api/3/search/jql"
 
-    response = requests.get(sprint_url, headers=headers)
+    response = jira_get(sprint_url, headers)
     response.raise_for_status()
-    sprints = response.json()["values"]
+    sprints = json_resposta(response)["values"]
     target_sprints = [s for s in sprints if filtro_nome.lower() in s["name"].lower()]
 
     sprint_dataframes = []
+    worklogs = []
+    transicoes_por_issue = {}
     for sprint in target_sprints:
         sprint_id = sprint["id"]
         sprint_name = sprint["name"]
@@ -197,103 +462,30 @@ def get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome="Sp
             "jql": jql,
             "fields": fields,
             "maxResults": 100,
-            "validateQuery": "warn",
-            "expand": "changelog"
+            "validateQuery": "warn"
         }
 
-        response = requests.get(endpoint, params=params, headers=headers)
-        if response.status_code != 200:
-            continue
-
-        issues = response.json().get("issues", [])
-        data = []
+        with span("fetch.sprint_issues", sprint=sprint_name):
+            response = jira_get(endpoint, headers, params=params)
+            if response.status_code != 200:
+                continue
 
-        for issue in issues:
-            key = issue['key']
-            fields_issue = issue['fields']
-            assignee_field = fields_issue.get('assignee')
-            dev_nome_original = assignee_field['displayName'] if assignee_field else "Não atribuído"
-
-            created_raw = fields_issue.get("created")
-            created_dt = parse(created_raw) if created_raw else None
-
-            updated_raw = fields_issue.get("updated")
-            updated_dt = parse(updated_raw) if updated_raw else None
-
-            resolution_raw = fields_issue.get("resolutiondate")
-            resolution_dt = parse(resolution_raw) if resolution_raw else None
-
-            sprints_field = fields_issue.get('sprints', [])
-            sprint_name_issue = sprints_field[0].get('name') if sprints_field and len(sprints_field) > 0 else "-"
-
-            estimate = convert_time_to_hours(fields_issue.get('timetracking', {}).get('originalEstimate'))
-            spent = convert_time_to_hours(fields_issue.get('timetracking', {}).get('timeSpent'))
-
-            epic = fields_issue.get('parent', {}).get('fields', {}).get('summary', '-') if 'parent' in fields_issue else "-"
-            status_atual = fields_issue.get('status', {}).get('name', '-')
-
-            status_times = {}
-            url = f"{jira_url}/rest/api/3/issue/{key}?expand=changelog"
-            res_status = requests.get(url, headers=headers)
-            if res_status.status_code == 200:
-                transitions = []
-                for history in res_status.json().get("changelog", {}).get("histories", []):
-                    for item in history.get("items", []):
-                        if item.get("field") == "status":
-                            from_status = item.get("fromString", "N/A")
-                            to_status = item.get("toString", "N/A")
-                            change_date = datetime.strptime(history["created"], "%Y-%m-%dT%H:%M:%S.%f%z")
-                            transitions.append((from_status, to_status, change_date))
-                transitions.sort(key=lambda x: x[2])
-
-                if transitions:
-                    first_status = transitions[0][0]
-                    first_date = transitions[0][2]
-                    created_date = parse(fields_issue.get("created"))
-                    if created_date < first_date:
-                        status_times[first_status] = calculate_working_hours(created_date, first_date)
-
-                    prev_status, prev_date = first_status, first_date
-                    for from_status, to_status, change_date in transitions:
-                        if prev_status and prev_date:
-                            hours = calculate_working_hours(prev_date, change_date)
-                            status_times[prev_status] = status_times.get(prev_status, 0) + hours
-                        prev_status = to_status
-                        prev_date = change_date
-
-                    if prev_status and prev_date:
-                        hours = calculate_working_hours(prev_date, datetime.now(prev_date.tzinfo))
-                        status_times[prev_status] = status_times.get(prev_status, 0) + hours
-
-            bug_count = count_bugs(fields_issue.get('subtasks', []))
-
-            row = {
-                "Sprint": sprint_name,
-                "Issue Key": key,
-                "Épico": epic,
-                "Tipo da Issue": fields_issue['issuetype']['name'],
-                "Status Atual": status_atual,
-                "Prioridade": fields_issue.get('priority', {}).get('name', 'Prioridade não definida'),
-                "Título": fields_issue.get('summary', '-'),
-                "Nome Original": dev_nome_original,
-                "Data Atualização": updated_dt,
-                "Data Criação": created_dt,
-                "Data Entrega": resolution_dt,
-                "Estimativa em Horas": estimate,
-                "Tempo Registrado(h))": spent,
-                "Quantidade de Bugs": bug_count
-            }
-            row.update(status_times)
-            data.append(row)
+            issues = json_resposta(response).get("issues", [])
+            anotar(contagem=len(issues), tamanho_bytes=len(response.content))
+        transicoes = get_transicoes_em_lote(jira_url, issues, headers)
+        transicoes_por_issue.update(transicoes)
+        data = [montar_linha_transicoes(issue, sprint_name, transicoes.get(issue["key"], [])) for issue in issues]
+        worklogs.extend(extrair_worklogs(issues))
 
         if data:
             sprint_dataframes.append(pd.DataFrame(data))
 
     if not sprint_dataframes:
-        return pd.DataFrame()
+        return pd.DataFrame(), transicoes_por_issue
 
-    df = pd.concat(sprint_dataframes, ignore_index=True)
-    return df
+    with span("normalize.transicoes"):
+        df = pd.concat(sprint_dataframes, ignore_index=True)
+        return adicionar_tempo_registrado(df, pd.DataFrame(worklogs)), transicoes_por_issue
 
 def remover_acentos(texto: str) -> str:
     if not texto:
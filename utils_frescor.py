@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+
+from service_jira import get_sprints, jira_get
+from utils_dados import get_project_id
+from utils_jql import montar_jql
+from utils_json import json_resposta, serializar_json
+from utils_tracing import anotar, span
+
+FONTES = ("issues", "sprints")
+MARGEM_SONDAGEM = 120
+CAMPOS_SPRINT = ("id", "name", "state", "startDate", "endDate", "completeDate", "goal")
+
+_lock = threading.Lock()
+_projetos = {}
+_artefatos = {}
+
+
+def registrar_artefato(nome, fontes, invalidar):
+    with _lock:
+        _artefatos[nome] = {"fontes": tuple(fontes), "invalidar": invalidar}
+
+
+def hash_sprints(sprints):
+    resumo = sorted(([sprint.get(campo) for campo in CAMPOS_SPRINT] for sprint in sprints), key=lambda s: str(s[0]))
+    return hashlib.md5(serializar_json(resumo).encode()).hexdigest()
+
+
+def marca_carga(jira_url, board_id, headers, inicio=None):
+    return {"issues": inicio or time.time(), "sprints": hash_sprints(get_sprints(jira_url, board_id, headers))}
+
+
+def _projeto(jira_url, board_id, headers):
+    chave = (jira_url, str(board_id))
+    if chave not in _projetos:
+        _projetos[chave] = get_project_id(jira_url, board_id, headers)
+    return _projetos[chave]
+
+
+def _issues_alteradas(jira_url, board_id, headers, desde):
+    minutos = (time.time() - desde + MARGEM_SONDAGEM) // 60 + 1
+    jql = montar_jql(_projeto(jira_url, board_id, headers), atualizado_ha_minutos=minutos, ordem=None)
+    response = jira_get(f"{jira_url}/rest/api/3/search/jql", headers, params={"jql": jql, "maxResults": 1, "fields": "id"})
+    response.raise_for_status()
+    return bool(json_resposta(response).get("issues"))
+
+
+def sondar_frescor(jira_url, board_id, headers, marca=None):
+    inicio = time.time()
+    with span("fetch.frescor", board_id=board_id):
+        marca = marca or {"issues": None, "sprints": None}
+
+        desatualizadas = set()
+        if marca["issues"] is None or _issues_alteradas(jira_url, board_id, headers, marca["issues"]):
+            desatualizadas.add("issues")
+
+        assinatura = hash_sprints(get_sprints(jira_url, board_id, headers))
+        if assinatura != marca["sprints"]:
+            desatualizadas.add("sprints")
+
+        anotar(desatualizadas=",".join(sorted(desatualizadas)) or "-")
+        return desatualizadas, {"issues": inicio, "sprints": assinatura}
+
+
+def artefatos_dependentes(fontes):
+    with _lock:
+        return [nome for nome, artefato in _artefatos.items() if set(artefato["fontes"]) & set(fontes)]
+
+
+def invalidar_fontes(fontes, jira_url, board_id, headers):
+    invalidados = artefatos_dependentes(fontes)
+    for nome in invalidados:
+        _artefatos[nome]["invalidar"](jira_url, board_id, headers)
+    return invalidados
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+LIMITE_PONTOS_SVG = 2000
+LIMITE_PONTOS_WEBGL = 50000
+BINS_DENSIDADE = 60
+
+
+def histograma_pre_binado(serie, nbins=20, titulo="", rotulo_x=""):
+    valores = pd.to_numeric(serie, errors="coerce").dropna().to_numpy(dtype=float)
+
+    if len(valores) == 0:
+        contagens, bordas = np.zeros(0), np.array([0.0, 1.0])
+    else:
+        contagens, bordas = np.histogram(valores, bins=nbins)
+
+    centros = (bordas[:-1] + bordas[1:]) / 2
+    larguras = np.diff(bordas)
+
+    fig = go.Figure(go.Bar(
+        x=centros,
+        y=contagens,
+        width=larguras,
+        customdata=np.column_stack([bordas[:-1], bordas[1:]]) if len(contagens) else None,
+        hovertemplate="%{customdata[0]:.1f} – %{customdata[1]:.1f}<br>Quantidade: %{y}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=rotulo_x,
+        yaxis_title="Quantidade",
+        bargap=0,
+    )
+    return fig
+
+
+def scatter_escalavel(df, x, y, cor=None, titulo=""):
+    colunas = [c for c in (x, y, cor) if c and c in df.columns]
+    dados = df[colunas].dropna(subset=[x, y])
+    cor = cor if cor in dados.columns else None
+    n_pontos = len(dados)
+
+    if n_pontos <= LIMITE_PONTOS_SVG:
+        return px.scatter(dados, x=x, y=y, color=cor, title=titulo)
+
+    if n_pontos <= LIMITE_PONTOS_WEBGL:
+        return px.scatter(dados, x=x, y=y, color=cor, title=titulo, render_mode="webgl")
+
+    return _densidade_pre_binada(dados, x, y, titulo)
+
+
+def _densidade_pre_binada(dados, x, y, titulo):
+    eixo_x = dados[x]
+    eh_data = pd.api.types.is_datetime64_any_dtype(eixo_x)
+    valores_x = eixo_x.to_numpy(dtype="datetime64[ns]").astype("int64") if eh_data else eixo_x.to_numpy(dtype=float)
+    valores_y = dados[y].to_numpy(dtype=float)
+
+    contagens, bordas_x, bordas_y = np.histogram2d(valores_x, valores_y, bins=BINS_DENSIDADE)
+
+    centros_x = (bordas_x[:-1] + bordas_x[1:]) / 2
+    centros_y = (bordas_y[:-1] + bordas_y[1:]) / 2
+    if eh_data:
+        centros_x = pd.to_datetime(centros_x.astype("int64"))
+
+    fig = go.Figure(go.Heatmap(
+        x=centros_x,
+        y=centros_y,
+        z=np.where(contagens.T > 0, contagens.T, np.nan),
+        colorscale="Blues",
+        colorbar=dict(title="Entregas"),
+        hovertemplate="%{x}<br>%{y:.1f}<br>Entregas: %{z}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"{titulo}<br><sup>{len(dados)} pontos agregados por densidade</sup>",
+        xaxis_title=x,
+        yaxis_title=y,
+    )
+    return fig
@@ -0,0 +1,109 @@
+import pandas as pd
+from config import CAMPO_SPRINT
+
+STATUS_ENTREGUES = ("Concluído", "Fechado", "Aprovado", "Resolvido")
+
+CAMPOS_ENTREGAS = (
+    "summary", "status", "issuetype", "assignee", "created", "updated",
+    "resolutiondate", "subtasks", CAMPO_SPRINT,
+)
+
+JANELAS_ENTREGA = {
+    "Últimos 90 dias": 90,
+    "Últimos 180 dias": 180,
+    "Último ano": 365,
+    "Todo o histórico": None,
+}
+
+
+def _aspas(valor):
+    return '"' + str(valor).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _lista(valores):
+    return "(" + ", ".join(_aspas(v) for v in valores) + ")"
+
+
+def _data(valor):
+    return _aspas(pd.Timestamp(valor).strftime("%Y-%m-%d"))
+
+
+def _data_hora(valor):
+    return _aspas(pd.Timestamp(valor).strftime("%Y-%m-%d %H:%M"))
+
+
+def montar_jql(project_id=None, entregues=False, entregue_desde=None, entregue_ate=None, tipos=None, sprint=None,
+               criado_desde=None, criado_ate=None, atualizado_ha_minutos=None, ordem="created DESC",
+               status_entregues=STATUS_ENTREGUES):
+    clausulas = []
+    if project_id is not None:
+        clausulas.append(f"project = {_aspas(project_id)}")
+    if criado_desde is not None:
+        clausulas.append(f"created >= {_data_hora(criado_desde)}")
+    if criado_ate is not None:
+        clausulas.append(f"created < {_data_hora(criado_ate)}")
+    if atualizado_ha_minutos is not None:
+        clausulas.append(f"updated >= -{int(atualizado_ha_minutos)}m")
+    if entregues:
+        if status_entregues:
+            clausulas.append(f"(statusCategory = Done OR status in {_lista(status_entregues)})")
+        else:
+            clausulas.append("statusCategory = Done")
+    if entregue_desde is not None:
+        desde = _data(entregue_desde)
+        clausulas.append(f"(resolutiondate >= {desde} OR (resolution IS EMPTY AND updated >= {desde}))")
+    if entregue_ate is not None:
+        ate = _data(pd.Timestamp(entregue_ate) + pd.Timedelta(days=1))
+        clausulas.append(f"(resolutiondate < {ate} OR (resolution IS EMPTY AND updated < {ate}))")
+    if tipos:
+        clausulas.append(f"issuetype in {_lista(tipos)}")
+    if sprint is not None:
+        clausulas.append(f"sprint = {sprint if isinstance(sprint, int) else _aspas(sprint)}")
+
+    jql = " AND ".join(clausulas)
+    return f"{jql} ORDER BY {ordem}" if ordem else jql
+
+
+def status_entregue(status):
+    nome = (status.get("name") or "").lower()
+    categoria = status.get("statusCategory", {}).get("name", "").lower()
+    return "done" in categoria or any(s.lower() in nome for s in STATUS_ENTREGUES)
+
+
+def issue_entregue(issue):
+    return status_entregue(issue.get("fields", {}).get("status") or {})
+
+
+def nomes_status_entregues(statuses):
+    return sorted({s["name"] for s in statuses if s.get("name") and status_entregue(s)})
+
+
+def data_entrega(issue):
+    fields = issue.get("fields", {})
+    data = fields.get("resolutiondate") or fields.get("updated")
+    return pd.to_datetime(data).tz_convert(None) if data else pd.NaT
+
+
+def filtrar_issues(issues, entregues=False, entregue_desde=None, entregue_ate=None, tipos=None, sprint=None):
+    desde = pd.Timestamp(entregue_desde) if entregue_desde is not None else None
+    ate = pd.Timestamp(entregue_ate) + pd.Timedelta(days=1) if entregue_ate is not None else None
+    tipos = set(tipos) if tipos else None
+
+    filtradas = []
+    for issue in issues:
+        fields = issue.get("fields", {})
+        if entregues and not issue_entregue(issue):
+            continue
+        if desde is not None or ate is not None:
+            data = data_entrega(issue)
+            if pd.isna(data) or (desde is not None and data < desde) or (ate is not None and data >= ate):
+                continue
+        if tipos is not None and (fields.get("issuetype") or {}).get("name") not in tipos:
+            continue
+        if sprint is not None:
+            sprints = fields.get(CAMPO_SPRINT) or []
+            sprints = sprints if isinstance(sprints, list) else [sprints]
+            if not any(isinstance(s, dict) and sprint in (s.get("id"), s.get("name")) for s in sprints):
+                continue
+        filtradas.append(issue)
+    return filtradas
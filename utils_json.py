@@ -0,0 +1,22 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def carregar_json(conteudo):
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+def serializar_json(dados):
+    if orjson is not None:
+        return orjson.dumps(dados, default=str).decode()
+    return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+def json_resposta(response):
+    return carregar_json(response.content)
@@ -1,18 +1,28 @@
 import streamlit as st
+import pandas as pd
 from functools import wraps
 import time
 import hashlib
+from utils_tracing import anotar, exportar_jsonl, exportar_prometheus, resumo_spans, span
+from utils_quota import estado_quotas
+from utils_requisicoes import contabilizar, folga_rate_limit, nova_contabilidade, total_chamadas
+
+MAX_SPANS_SIDEBAR = 5
 
 def measure_performance(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        if 'performance_metrics' not in st.session_state:
-            st.session_state.performance_metrics = {}
-        st.session_state.performance_metrics[func.__name__] = end - start
-        return result
+        with span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+def contabilizar_fragmento(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if 'api_sessao' not in st.session_state:
+            st.session_state.api_sessao = nova_contabilidade()
+        with contabilizar(st.session_state.api_sessao):
+            return func(*args, **kwargs)
     return wrapper
 
 def cache_jira_data(ttl=300):
@@ -21,28 +31,123 @@ def cache_jira_data(ttl=300):
         def wrapper(*args, **kwargs):
             key_parts = [func.__name__, str(args), str(kwargs)]
             cache_key = hashlib.md5("|".join(key_parts).encode()).hexdigest()
-            
+
             if 'jira_cache' not in st.session_state:
                 st.session_state.jira_cache = {}
-            
+
             current_time = time.time()
-            
-            if (cache_key in st.session_state.jira_cache and 
+
+            if (cache_key in st.session_state.jira_cache and
                 current_time - st.session_state.jira_cache[cache_key]['timestamp'] < ttl):
+                anotar(cache=True)
                 return st.session_state.jira_cache[cache_key]['data']
-            
+
+            anotar(cache=False)
             result = func(*args, **kwargs)
             st.session_state.jira_cache[cache_key] = {
                 'data': result,
                 'timestamp': current_time
             }
-            
+
             return result
         return wrapper
     return decorator
 
-def show_performance_metrics():
-    if hasattr(st.session_state, 'performance_metrics') and st.session_state.performance_metrics:
-        st.sidebar.subheader(" Performance")
-        for func_name, duration in st.session_state.performance_metrics.items():
-            st.sidebar.metric(f"{func_name}", f"{duration:.2f}s")
\ No newline at end of file
+def show_performance_metrics(container=None):
+    container = container or st.sidebar
+    resumo = resumo_spans()
+    if not resumo:
+        return
+
+    container.subheader(" Performance")
+    principais = sorted(resumo.items(), key=lambda item: item[1]["segundos"], reverse=True)
+    for nome, dados in principais[:MAX_SPANS_SIDEBAR]:
+        container.metric(
+            nome,
+            f"{dados['ultimo']:.2f}s",
+            help=f"p50 {dados['p50']:.2f}s · p95 {dados['p95']:.2f}s · p99 {dados['p99']:.2f}s · {dados['chamadas']} chamada(s)"
+        )
+
+    with container.expander("Detalhes dos spans"):
+        df = pd.DataFrame([
+            {
+                "Span": nome,
+                "Chamadas": dados["chamadas"],
+                "p50 (s)": round(dados["p50"], 3),
+                "p95 (s)": round(dados["p95"], 3),
+                "p99 (s)": round(dados["p99"], 3),
+                "Itens": dados["contagem"],
+                "Bytes": dados["bytes"],
+                "Cache hit/miss": f"{dados['cache_hit']}/{dados['cache_miss']}",
+            }
+            for nome, dados in principais
+        ])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        if st.button("📦 Preparar exportação"):
+            st.session_state.exportacao_traces = (exportar_jsonl(st.session_state.get("sessao_id")), exportar_prometheus())
+        if "exportacao_traces" in st.session_state:
+            traces, metricas = st.session_state.pop("exportacao_traces")
+            st.download_button("📥 Traces desta sessão (JSON Lines)", traces, file_name="traces.jsonl", mime="application/x-ndjson")
+            st.download_button("📥 Métricas (Prometheus)", metricas, file_name="metrics.prom", mime="text/plain")
+
+def _tabela_endpoints(contabilidade):
+    return pd.DataFrame([
+        {
+            "Endpoint": endpoint,
+            "Chamadas": dados["chamadas"],
+            "Latência média (s)": round(dados["segundos"] / dados["chamadas"], 3) if dados["chamadas"] else 0,
+            "KB": round(dados["bytes"] / 1024, 1),
+            "Retentativas": dados["retentativas"],
+            "Erros": dados["erros"],
+        }
+        for endpoint, dados in sorted(contabilidade["endpoints"].items(), key=lambda item: -item[1]["chamadas"])
+    ])
+
+def _tabela_quotas():
+    return pd.DataFrame([
+        {
+            "Quota": quota["quota"],
+            "Classe": quota["classe"],
+            "Na fila": quota["fila"],
+            "Sessões": quota["sessoes_na_fila"],
+            "Atendidas": quota["atendidas"],
+            "Espera p50 (s)": round(quota["espera_p50_s"], 2),
+            "Espera p95 (s)": round(quota["espera_p95_s"], 2),
+        }
+        for quota in estado_quotas()
+    ])
+
+def show_api_metrics(contabilidade_rerun, contabilidade_sessao, orcamento, container=None):
+    container = container or st.sidebar
+    chamadas_rerun = total_chamadas(contabilidade_rerun)
+    chamadas_sessao = total_chamadas(contabilidade_sessao)
+
+    container.subheader(" API Jira")
+    col1, col2 = container.columns(2)
+    col1.metric("Chamadas (render)", chamadas_rerun)
+    col2.metric("Chamadas (sessão)", chamadas_sessao)
+
+    if chamadas_rerun > orcamento:
+        container.error(f"⚠️ Render excedeu o orçamento de {orcamento} chamadas à API ({chamadas_rerun}).")
+
+    folga = folga_rate_limit(contabilidade_sessao)
+    rate_limit = contabilidade_sessao.get("rate_limit") or {}
+    if folga is not None:
+        container.progress(max(0.0, min(1.0, folga)), text=f"Folga do rate limit: {folga:.0%}")
+    elif rate_limit:
+        container.caption("Rate limit: " + ", ".join(f"{k}={v}" for k, v in rate_limit.items() if k != "atualizado"))
+
+    if contabilidade_sessao["endpoints"]:
+        with container.expander("Chamadas por endpoint"):
+            if contabilidade_rerun["endpoints"]:
+                st.caption("Este render")
+                st.dataframe(_tabela_endpoints(contabilidade_rerun), use_container_width=True, hide_index=True)
+            st.caption("Sessão")
+            st.dataframe(_tabela_endpoints(contabilidade_sessao), use_container_width=True, hide_index=True)
+
+    quotas = _tabela_quotas()
+    if not quotas.empty:
+        if quotas["Na fila"].sum():
+            container.caption(f"⏳ {quotas['Na fila'].sum()} requisição(ões) aguardando a quota compartilhada")
+        with container.expander("Quota compartilhada"):
+            st.dataframe(quotas, use_container_width=True, hide_index=True)
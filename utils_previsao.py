@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+TENTATIVAS_PADRAO = 10_000
+BLOCO_TENTATIVAS = 10_000
+HORIZONTE_MAXIMO = 730
+PERCENTIS_CONCLUSAO = (50, 85, 95)
+
+
+def throughput_diario(datas_entrega, dias_historico=90, hoje=None):
+    hoje = pd.Timestamp(hoje or pd.Timestamp.now()).normalize()
+    inicio = hoje - pd.Timedelta(days=dias_historico - 1)
+    dias = pd.to_datetime(pd.Series(datas_entrega), utc=True).dropna().dt.tz_convert(None).dt.normalize()
+    contagem = dias[(dias >= inicio) & (dias <= hoje)].value_counts()
+    return contagem.reindex(pd.date_range(inicio, hoje, freq="D"), fill_value=0).to_numpy(dtype=np.int32)
+
+
+def _simular(throughput, tentativas, dias, semente):
+    rng = np.random.default_rng(semente)
+    for inicio in range(0, tentativas, BLOCO_TENTATIVAS):
+        bloco = min(BLOCO_TENTATIVAS, tentativas - inicio)
+        yield np.cumsum(rng.choice(throughput, size=(bloco, dias)), axis=1, dtype=np.int32)
+
+
+def prever_conclusao(throughput, itens, tentativas=TENTATIVAS_PADRAO, semente=None):
+    if itens <= 0 or throughput.sum() == 0:
+        return None
+
+    horizonte = min(HORIZONTE_MAXIMO, int(np.ceil(itens / throughput.mean() * 3)) + 1)
+    dias_conclusao = np.concatenate([
+        np.where(acumulado[:, -1] >= itens, np.argmax(acumulado >= itens, axis=1) + 1, np.inf)
+        for acumulado in _simular(throughput, tentativas, horizonte, semente)
+    ])
+
+    dias_ordenados = np.sort(dias_conclusao)
+    dias = np.arange(1, horizonte + 1)
+    return {
+        "percentis": {p: float(np.percentile(dias_conclusao, p, method="inverted_cdf")) for p in PERCENTIS_CONCLUSAO},
+        "horizonte": horizonte,
+        "dias": dias,
+        "probabilidade": np.searchsorted(dias_ordenados, dias, side="right") / len(dias_conclusao),
+        "tentativas": len(dias_conclusao),
+    }
+
+
+def prever_itens_ate(throughput, dias, tentativas=TENTATIVAS_PADRAO, semente=None):
+    if dias <= 0:
+        return None
+
+    totais = np.concatenate([acumulado[:, -1] for acumulado in _simular(throughput, tentativas, dias, semente)])
+    return {
+        "percentis": {p: int(np.percentile(totais, 100 - p)) for p in PERCENTIS_CONCLUSAO},
+        "totais": np.bincount(totais),
+        "tentativas": len(totais),
+    }
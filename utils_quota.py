@@ -0,0 +1,169 @@
+import contextvars
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from config import ORCAMENTO_REQUISICOES_MINUTO, REQUISICOES_POR_SEGUNDO
+
+INTERATIVA = "interativa"
+SEGUNDO_PLANO = "segundo_plano"
+CLASSES_PRIORIDADE = (INTERATIVA, SEGUNDO_PLANO)
+ESPERAS_REGISTRADAS = 500
+
+_lock = threading.Lock()
+_limitadores = {}
+_senhas = itertools.count()
+_prioridade = contextvars.ContextVar("prioridade_quota", default=INTERATIVA)
+_sessao = contextvars.ContextVar("sessao_quota", default="processo")
+
+
+def instancia_jira(url):
+    return urlparse(url).netloc or url
+
+
+def chave_quota(url, headers=None):
+    autorizacao = (headers or {}).get("Authorization", "")
+    token = hashlib.sha1(autorizacao.encode()).hexdigest()[:8] if autorizacao else "anonimo"
+    return f"{instancia_jira(url)}/{token}"
+
+
+def definir_sessao(sessao_id):
+    _sessao.set(sessao_id)
+
+
+@contextmanager
+def prioridade(classe):
+    token = _prioridade.set(classe)
+    try:
+        yield
+    finally:
+        _prioridade.reset(token)
+
+
+def _novo_limitador(orcamento_minuto, rajada):
+    taxa = orcamento_minuto / 60
+    return {
+        "taxa": taxa,
+        "capacidade": float(max(1, rajada)),
+        "tokens": float(max(1, rajada)),
+        "ultimo": time.monotonic(),
+        "suspenso_ate": 0.0,
+        "condicao": threading.Condition(),
+        "filas": {classe: OrderedDict() for classe in CLASSES_PRIORIDADE},
+        "esperas": {classe: deque(maxlen=ESPERAS_REGISTRADAS) for classe in CLASSES_PRIORIDADE},
+        "atendidas": {classe: 0 for classe in CLASSES_PRIORIDADE},
+    }
+
+
+def limitador(chave):
+    with _lock:
+        if chave not in _limitadores:
+            _limitadores[chave] = _novo_limitador(ORCAMENTO_REQUISICOES_MINUTO, REQUISICOES_POR_SEGUNDO)
+        return _limitadores[chave]
+
+
+def _proxima(estado):
+    for classe in CLASSES_PRIORIDADE:
+        for sessao, fila in estado["filas"][classe].items():
+            return classe, sessao, fila[0]
+    return None
+
+
+def _liberar(estado, classe, sessao):
+    filas = estado["filas"][classe]
+    filas[sessao].popleft()
+    if filas[sessao]:
+        filas.move_to_end(sessao)
+    else:
+        del filas[sessao]
+
+
+def _desistir(estado, classe, sessao, senha):
+    filas = estado["filas"][classe]
+    fila = filas.get(sessao)
+    if fila is not None and senha in fila:
+        fila.remove(senha)
+        if not fila:
+            del filas[sessao]
+    estado["condicao"].notify_all()
+
+
+def aguardar_vez(url, headers=None):
+    estado = limitador(chave_quota(url, headers))
+    if estado["taxa"] <= 0:
+        return 0.0
+
+    classe, sessao, senha = _prioridade.get(), _sessao.get(), next(_senhas)
+    inicio = time.monotonic()
+    with estado["condicao"]:
+        estado["filas"][classe].setdefault(sessao, deque()).append(senha)
+        estado["condicao"].notify_all()
+        try:
+            while True:
+                agora = time.monotonic()
+                estado["tokens"] = min(estado["capacidade"], estado["tokens"] + (agora - estado["ultimo"]) * estado["taxa"])
+                estado["ultimo"] = agora
+                livre = agora >= estado["suspenso_ate"] and estado["tokens"] >= 1
+
+                if livre and _proxima(estado)[2] == senha:
+                    estado["tokens"] -= 1
+                    _liberar(estado, classe, sessao)
+                    esperado = agora - inicio
+                    estado["esperas"][classe].append(esperado)
+                    estado["atendidas"][classe] += 1
+                    estado["condicao"].notify_all()
+                    return esperado
+
+                if agora < estado["suspenso_ate"]:
+                    espera = estado["suspenso_ate"] - agora
+                elif not livre:
+                    espera = (1 - estado["tokens"]) / estado["taxa"]
+                else:
+                    espera = 1.0
+                estado["condicao"].wait(espera)
+        except BaseException:
+            _desistir(estado, classe, sessao, senha)
+            raise
+
+
+def suspender_quota(url, headers=None, segundos=1.0):
+    estado = limitador(chave_quota(url, headers))
+    with estado["condicao"]:
+        estado["suspenso_ate"] = max(estado["suspenso_ate"], time.monotonic() + segundos)
+        estado["tokens"] = 0.0
+
+
+def _percentil(valores, q):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def estado_quotas():
+    with _lock:
+        limitadores = dict(_limitadores)
+
+    resumo = []
+    for chave, estado in limitadores.items():
+        with estado["condicao"]:
+            suspenso = max(0.0, estado["suspenso_ate"] - time.monotonic())
+            for classe in CLASSES_PRIORIDADE:
+                esperas = list(estado["esperas"][classe])
+                resumo.append({
+                    "quota": chave,
+                    "classe": classe,
+                    "fila": sum(len(fila) for fila in estado["filas"][classe].values()),
+                    "sessoes_na_fila": len(estado["filas"][classe]),
+                    "atendidas": estado["atendidas"][classe],
+                    "espera_p50_s": _percentil(esperas, 0.50),
+                    "espera_p95_s": _percentil(esperas, 0.95),
+                    "espera_max_s": max(esperas, default=0.0),
+                    "orcamento_minuto": estado["taxa"] * 60,
+                    "suspenso_s": suspenso,
+                })
+    return resumo
@@ -0,0 +1,132 @@
+import contextvars
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+CABECALHOS_RATE_LIMIT = (
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+    "X-RateLimit-NearLimit",
+    "RateLimit-Reason",
+    "Retry-After",
+)
+
+_PADROES_ENDPOINT = [
+    (re.compile(r"/rest/api/3/search/jql$"), "search/jql"),
+    (re.compile(r"/rest/api/3/search/approximate-count$"), "search/approximate-count"),
+    (re.compile(r"/rest/agile/1\.0/board/[^/]+/sprint$"), "board/sprint"),
+    (re.compile(r"/rest/agile/1\.0/board/[^/]+$"), "board"),
+    (re.compile(r"/rest/api/3/issue/[^/]+/changelog$"), "issue/changelog"),
+    (re.compile(r"/rest/api/3/changelog/bulkfetch$"), "changelog/bulkfetch"),
+    (re.compile(r"/rest/api/3/worklog/updated$"), "worklog/updated"),
+    (re.compile(r"/rest/api/3/worklog/list$"), "worklog/list"),
+    (re.compile(r"/rest/api/3/worklog/deleted$"), "worklog/deleted"),
+    (re.compile(r"/rest/api/3/issue/[^/]+$"), "issue"),
+]
+
+_lock = threading.Lock()
+_contabilidade_atual = contextvars.ContextVar("contabilidade_atual", default=None)
+
+
+def nova_contabilidade():
+    return {
+        "endpoints": defaultdict(lambda: {"chamadas": 0, "segundos": 0.0, "bytes": 0, "retentativas": 0, "erros": 0}),
+        "rate_limit": {},
+        "inicio": time.time(),
+    }
+
+
+_contabilidade_processo = nova_contabilidade()
+
+
+def classificar_endpoint(url, params=None):
+    caminho = url.split("?", 1)[0].rstrip("/")
+    for padrao, nome in _PADROES_ENDPOINT:
+        if padrao.search(caminho):
+            expand = (params or {}).get("expand", "") if isinstance(params, dict) else ""
+            if nome == "issue" and ("expand=changelog" in url or "changelog" in expand):
+                return "issue?expand=changelog"
+            return nome
+    return caminho.rsplit("/rest/", 1)[-1]
+
+
+def iniciar_contabilidade():
+    contabilidade = nova_contabilidade()
+    _contabilidade_atual.set(contabilidade)
+    return contabilidade
+
+
+def contabilidade_atual():
+    return _contabilidade_atual.get()
+
+
+@contextmanager
+def contabilizar(destino):
+    atual = _contabilidade_atual.get()
+    if atual is not None:
+        yield atual
+        return
+
+    contabilidade = nova_contabilidade()
+    token = _contabilidade_atual.set(contabilidade)
+    try:
+        yield contabilidade
+    finally:
+        _contabilidade_atual.reset(token)
+        mesclar_contabilidade(destino, contabilidade)
+
+
+def _acumular(contabilidade, endpoint, duracao, tamanho, retentativas, erro, rate_limit):
+    dados = contabilidade["endpoints"][endpoint]
+    dados["chamadas"] += 1
+    dados["segundos"] += duracao
+    dados["bytes"] += tamanho
+    dados["retentativas"] += retentativas
+    dados["erros"] += 1 if erro else 0
+    if rate_limit:
+        contabilidade["rate_limit"] = {**rate_limit, "atualizado": time.time()}
+
+
+def registrar_chamada(endpoint, duracao, tamanho, retentativas=0, erro=False, headers=None):
+    rate_limit = {
+        nome: headers[nome]
+        for nome in CABECALHOS_RATE_LIMIT
+        if headers is not None and nome in headers
+    }
+    with _lock:
+        _acumular(_contabilidade_processo, endpoint, duracao, tamanho, retentativas, erro, rate_limit)
+        atual = _contabilidade_atual.get()
+        if atual is not None:
+            _acumular(atual, endpoint, duracao, tamanho, retentativas, erro, rate_limit)
+
+
+def mesclar_contabilidade(destino, origem):
+    with _lock:
+        for endpoint, dados in origem["endpoints"].items():
+            alvo = destino["endpoints"][endpoint]
+            for campo, valor in dados.items():
+                alvo[campo] += valor
+        if origem["rate_limit"]:
+            destino["rate_limit"] = dict(origem["rate_limit"])
+    return destino
+
+
+def total_chamadas(contabilidade):
+    return sum(d["chamadas"] for d in contabilidade["endpoints"].values())
+
+
+def contabilidade_processo():
+    return _contabilidade_processo
+
+
+def folga_rate_limit(contabilidade):
+    rate_limit = contabilidade.get("rate_limit") or {}
+    try:
+        limite = int(rate_limit["X-RateLimit-Limit"])
+        restante = int(rate_limit["X-RateLimit-Remaining"])
+    except (KeyError, ValueError):
+        return None
+    return restante / limite if limite else None
@@ -0,0 +1,214 @@
+import contextvars
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+JANELA_HISTOGRAMA = 500
+MAX_TRACES = 50
+MAX_FILHOS = 200
+QUANTIS = (0.5, 0.95, 0.99)
+PREFIXO_METRICAS = "jira_dashboard"
+
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_span_atual = contextvars.ContextVar("span_atual", default=None)
+_sessao = contextvars.ContextVar("sessao_trace", default=None)
+
+_duracoes = defaultdict(lambda: deque(maxlen=JANELA_HISTOGRAMA))
+_totais = defaultdict(lambda: {"chamadas": 0, "segundos": 0.0, "bytes": 0, "contagem": 0, "cache_hit": 0, "cache_miss": 0})
+_traces = deque(maxlen=MAX_TRACES)
+
+
+def _novo_span(nome, pai, atributos):
+    return {
+        "id": next(_ids),
+        "trace_id": pai["trace_id"] if pai else None,
+        "pai_id": pai["id"] if pai else None,
+        "nome": nome,
+        "inicio": time.time(),
+        "duracao": None,
+        "contagem": 0,
+        "bytes": 0,
+        "cache": None,
+        "erro": None,
+        "atributos": dict(atributos),
+        "filhos": [],
+        "filhos_omitidos": 0,
+    }
+
+
+@contextmanager
+def span(nome, **atributos):
+    pai = _span_atual.get()
+    registro = _novo_span(nome, pai, atributos)
+    if registro["trace_id"] is None:
+        registro["trace_id"] = registro["id"]
+        registro["sessao"] = _sessao.get()
+    if pai is not None:
+        with _lock:
+            if len(pai["filhos"]) < MAX_FILHOS:
+                pai["filhos"].append(registro)
+            else:
+                pai["filhos_omitidos"] += 1
+
+    token = _span_atual.set(registro)
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    except Exception as e:
+        registro["erro"] = type(e).__name__
+        raise
+    finally:
+        registro["duracao"] = time.perf_counter() - inicio
+        _span_atual.reset(token)
+        _finalizar(registro, raiz=pai is None)
+
+
+def _finalizar(registro, raiz):
+    nome = registro["nome"]
+    with _lock:
+        _duracoes[nome].append(registro["duracao"])
+        totais = _totais[nome]
+        totais["chamadas"] += 1
+        totais["segundos"] += registro["duracao"]
+        totais["bytes"] += registro["bytes"]
+        totais["contagem"] += registro["contagem"]
+        if registro["cache"] == "hit":
+            totais["cache_hit"] += 1
+        elif registro["cache"] == "miss":
+            totais["cache_miss"] += 1
+        if raiz:
+            _traces.append(registro)
+
+
+def definir_sessao_trace(sessao_id):
+    _sessao.set(sessao_id)
+
+
+def span_atual():
+    return _span_atual.get()
+
+
+def anotar(contagem=0, tamanho_bytes=0, cache=None, **atributos):
+    registro = _span_atual.get()
+    if registro is None:
+        return
+    registro["contagem"] += contagem
+    registro["bytes"] += tamanho_bytes
+    if cache is not None:
+        registro["cache"] = "hit" if cache else "miss"
+    registro["atributos"].update(atributos)
+
+
+def rastrear(nome=None):
+    def decorator(func):
+        nome_span = nome or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(nome_span):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def contexto_atual():
+    return contextvars.copy_context()
+
+
+def _quantil(valores_ordenados, q):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(round(q * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+def resumo_spans():
+    with _lock:
+        copia = {nome: (list(valores), dict(_totais[nome])) for nome, valores in _duracoes.items()}
+
+    resumo = {}
+    for nome, (valores, totais) in copia.items():
+        ordenados = sorted(valores)
+        resumo[nome] = {
+            **totais,
+            "p50": _quantil(ordenados, 0.5),
+            "p95": _quantil(ordenados, 0.95),
+            "p99": _quantil(ordenados, 0.99),
+            "ultimo": valores[-1] if valores else 0.0,
+        }
+    return resumo
+
+
+def traces_recentes(sessao=None):
+    with _lock:
+        return [trace for trace in _traces if sessao is None or trace.get("sessao") == sessao]
+
+
+def _achatar(registro):
+    linha = {k: v for k, v in registro.items() if k != "filhos"}
+    yield linha
+    for filho in registro["filhos"]:
+        yield from _achatar(filho)
+
+
+def exportar_jsonl(sessao=None):
+    linhas = []
+    for trace in traces_recentes(sessao):
+        for registro in _achatar(trace):
+            linhas.append(json.dumps(registro, default=str, ensure_ascii=False))
+    return "\n".join(linhas) + ("\n" if linhas else "")
+
+
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def exportar_prometheus():
+    resumo = resumo_spans()
+    with _lock:
+        janelas = {nome: sorted(valores) for nome, valores in _duracoes.items()}
+
+    metrica = f"{PREFIXO_METRICAS}_span_duration_seconds"
+    linhas = [
+        f"# HELP {metrica} Duração dos spans (janela móvel de {JANELA_HISTOGRAMA} amostras).",
+        f"# TYPE {metrica} summary",
+    ]
+    for nome, dados in sorted(resumo.items()):
+        rotulo = _rotulo(nome)
+        for q in QUANTIS:
+            linhas.append(f'{metrica}{{span="{rotulo}",quantile="{q}"}} {_quantil(janelas[nome], q):.6f}')
+        linhas.append(f'{metrica}_sum{{span="{rotulo}"}} {dados["segundos"]:.6f}')
+        linhas.append(f'{metrica}_count{{span="{rotulo}"}} {dados["chamadas"]}')
+
+    contadores = [
+        ("span_bytes_total", "Bytes processados pelos spans.", "bytes"),
+        ("span_items_total", "Itens contados pelos spans.", "contagem"),
+    ]
+    for sufixo, ajuda, campo in contadores:
+        metrica = f"{PREFIXO_METRICAS}_{sufixo}"
+        linhas.append(f"# HELP {metrica} {ajuda}")
+        linhas.append(f"# TYPE {metrica} counter")
+        for nome, dados in sorted(resumo.items()):
+            linhas.append(f'{metrica}{{span="{_rotulo(nome)}"}} {dados[campo]}')
+
+    metrica = f"{PREFIXO_METRICAS}_span_cache_total"
+    linhas.append(f"# HELP {metrica} Acertos e faltas de cache por span.")
+    linhas.append(f"# TYPE {metrica} counter")
+    for nome, dados in sorted(resumo.items()):
+        if dados["cache_hit"] or dados["cache_miss"]:
+            linhas.append(f'{metrica}{{span="{_rotulo(nome)}",resultado="hit"}} {dados["cache_hit"]}')
+            linhas.append(f'{metrica}{{span="{_rotulo(nome)}",resultado="miss"}} {dados["cache_miss"]}')
+
+    return "\n".join(linhas) + "\n"
+
+
+def limpar_metricas():
+    with _lock:
+        _duracoes.clear()
+        _totais.clear()
+        _traces.clear()
@@ -0,0 +1,62 @@
+import pandas as pd
+from utils_armazenamento import COLUNAS_WORKLOG
+
+COLUNA_TEMPO_REGISTRADO = "Tempo Registrado (Worklog em Horas)"
+
+
+def normalizar_worklog(worklog, issue_key=None):
+    return {
+        "worklog_id": str(worklog.get("id")),
+        "issue_id": str(worklog.get("issueId")),
+        "issue_key": issue_key,
+        "autor": (worklog.get("author") or {}).get("displayName", "Não atribuído"),
+        "inicio": worklog.get("started"),
+        "segundos": worklog.get("timeSpentSeconds", 0),
+        "atualizado": worklog.get("updated"),
+    }
+
+
+def worklogs_para_df(worklogs):
+    df = pd.DataFrame(worklogs, columns=COLUNAS_WORKLOG)
+    df["inicio"] = pd.to_datetime(df["inicio"], utc=True, errors="coerce")
+    df["horas"] = pd.to_numeric(df["segundos"], errors="coerce").fillna(0) / 3600
+    return df
+
+
+def horas_registradas(df_worklogs, por):
+    if df_worklogs.empty:
+        return pd.DataFrame(columns=[*por, "horas"])
+    df = df_worklogs
+    if "horas" not in df.columns or not pd.api.types.is_datetime64_any_dtype(df["inicio"]):
+        df = worklogs_para_df(df[COLUNAS_WORKLOG])
+    if "dia" in por:
+        df = df.assign(dia=df["inicio"].dt.tz_convert(None).dt.normalize())
+    return df.groupby(list(por), as_index=False)["horas"].sum()
+
+
+def horas_por_sprint(df_worklogs, sprints):
+    janelas = pd.DataFrame([
+        {"sprint": s.get("name"), "inicio_sprint": s.get("startDate"), "fim_sprint": s.get("endDate")}
+        for s in sprints if s.get("startDate") and s.get("endDate")
+    ], columns=["sprint", "inicio_sprint", "fim_sprint"])
+    if df_worklogs.empty or janelas.empty:
+        return pd.DataFrame(columns=["sprint", "autor", "horas"])
+
+    janelas["inicio_sprint"] = pd.to_datetime(janelas["inicio_sprint"], utc=True)
+    janelas["fim_sprint"] = pd.to_datetime(janelas["fim_sprint"], utc=True)
+    df = worklogs_para_df(df_worklogs[COLUNAS_WORKLOG]).dropna(subset=["inicio"])
+
+    combinados = pd.merge_asof(
+        df.sort_values("inicio"), janelas.sort_values("inicio_sprint"),
+        left_on="inicio", right_on="inicio_sprint", direction="backward"
+    )
+    combinados = combinados[combinados["inicio"] <= combinados["fim_sprint"]]
+    return combinados.groupby(["sprint", "autor"], as_index=False)["horas"].sum()
+
+
+def adicionar_tempo_registrado(df, df_worklogs, coluna_chave="Issue Key"):
+    if df.empty:
+        return df
+    horas = horas_registradas(df_worklogs, ["issue_key"]).set_index("issue_key")["horas"]
+    df[COLUNA_TEMPO_REGISTRADO] = df[coluna_chave].map(horas).fillna(0.0)
+    return df
@@ -1,21 +1,19 @@
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import defaultdict
 import altair as alt
-from utils_dados import calcular_dias_uteis, convert_time_to_hours
+from utils_dados import calcular_dias_uteis, carregar_issues_sprint, carregar_sprints, convert_time_to_hours
 
 def burndown_tab(jira_url, board_id, headers):
     st.header("📉 Burndown da Sprint Atual")
 
-    sprint_url = f"{jira_url}/rest/agile/1.0/board/{board_id}/sprint"
-    response = requests.get(sprint_url, headers=headers)
-    if response.status_code != 200:
-        st.error(f"Erro ao buscar sprints: {response.status_code}")
+    try:
+        sprints = carregar_sprints(jira_url, board_id, headers)
+    except Exception as e:
+        st.error(f"Erro ao buscar sprints: {e}")
         return
 
-    sprints = response.json()["values"]
     sprint = next((s for s in sprints if s["state"] == "active" and "Sprint" in s["name"]), None)
     if not sprint:
         st.warning("Nenhuma sprint ativa com nome encontrada.")
@@ -30,24 +28,12 @@ def burndown_tab(jira_url, board_id, headers):
     HORAS_POR_DIA = 8
     horas_disponiveis = dias_uteis_count * HORAS_POR_DIA
 
-    issues_url = f"{jira_url}/rest/api/3/search/jql"
-    jql = f"sprint = {sprint_id} ORDER BY created DESC"
-    fields = "*all,-comment"
-
-    params = {
-        "jql": jql,
-        "fields": fields,
-        "maxResults": 100,
-        "validateQuery": "warn"
-    }
-
-    issues_resp = requests.get(issues_url, headers=headers, params=params)
-    if issues_resp.status_code != 200:
-        st.error(f"Erro ao buscar issues: {issues_resp.status_code}")
-        st.error(f"Detalhes: {issues_resp.text}")
+    try:
+        issues = carregar_issues_sprint(jira_url, board_id, sprint_id, headers)
+    except Exception as e:
+        st.error(f"Erro ao buscar issues: {e}")
         return
 
-    issues = issues_resp.json().get("issues", [])
     issues_extras = [i for i in issues if 'extra' in i['fields'].get('summary', '').lower()]
 
     total_estimate = 0
@@ -1,19 +1,22 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import io
 import pytz
 import re
 import requests
 from datetime import datetime
-from utils_dados import calcular_dias_uteis
-from service_jira import get_sprints
+from utils_armazenamento import versao_publicada
+from utils_dados import calcular_dias_uteis, carregar_sprints
+from utils_cache import cache_figura, nova_versao_dados, versao_dados
+from utils_computacao import computar, gerar_excel
+from utils_frescor import registrar_artefato
+from utils_performance import contabilizar_fragmento
 
 def sprint_tab(jira_url, board_id, headers):
     st.title("📋 Análise de Datas das Sprints")
 
     try:
-        sprints_data = get_sprints_data(jira_url, board_id, headers)
+        sprints_data = get_sprints_data(jira_url, board_id, headers, versao_publicada(jira_url))
     except Exception as e:
         st.error(str(e))
         return
@@ -22,6 +25,31 @@ def sprint_tab(jira_url, board_id, headers):
         st.warning("Nenhuma sprint encontrada.")
         return
 
+    versao = versao_dados("sprints", jira_url, board_id)
+    mostrar_sprint_selecionada(sprints_data, versao)
+
+    st.subheader("📊 Totais Agregados de Dias (Todas as Sprints)")
+    fig_totais = cache_figura(
+        "totais_dias", versao, {},
+        lambda: criar_grafico_totais_dias(sprints_data)
+    )
+    st.plotly_chart(fig_totais, use_container_width=True)
+
+    timezone_brazil = pytz.timezone('America/Sao_Paulo')
+    now_brazil = datetime.now(timezone_brazil)
+    file_name = f"Sprints_{now_brazil.strftime('%d_%m_%y')}.xlsx"
+    output = computar("excel_sprints", versao, gerar_excel, sprints_data.drop(columns=["Número da Sprint"]), "Dados Sprints")
+
+    st.download_button(
+        label="📥 Download Excel",
+        data=output,
+        file_name=file_name,
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+@st.fragment
+@contabilizar_fragmento
+def mostrar_sprint_selecionada(sprints_data, versao):
     opcoes_sprints = ["Todas"] + sprints_data["Nome da Sprint"].dropna().unique().tolist()
     sprint_selecionada = st.selectbox("Selecione a Sprint", opcoes_sprints)
 
@@ -33,6 +61,13 @@ def sprint_tab(jira_url, board_id, headers):
     st.dataframe(df_filtrado.drop(columns=["Número da Sprint"]), use_container_width=True)
 
     st.subheader("📊 Gráfico de Dias por Sprint")
+    fig = cache_figura(
+        "dias_por_sprint", versao, {"sprint": sprint_selecionada},
+        lambda: criar_grafico_dias_por_sprint(df_filtrado)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def criar_grafico_dias_por_sprint(df_filtrado):
     df_grafico = df_filtrado[["Nome da Sprint", "Dias de Atraso", "Dias Úteis Totais", "Dias Totais"]].copy()
     df_grafico = df_grafico.melt(id_vars="Nome da Sprint", var_name="Métrica", value_name="Dias").dropna()
     df_grafico["Dias"] = pd.to_numeric(df_grafico["Dias"], errors="coerce")
@@ -52,10 +87,9 @@ def sprint_tab(jira_url, board_id, headers):
         legend_title="Legenda",
         xaxis=dict(categoryorder="array", categoryarray=df_filtrado["Nome da Sprint"].tolist())
     )
-    st.plotly_chart(fig, use_container_width=True)
-
-    st.subheader("📊 Totais Agregados de Dias (Todas as Sprints)")
+    return fig
 
+def criar_grafico_totais_dias(sprints_data):
     totais = {
         "Dias de Atraso": sprints_data["Dias de Atraso"].sum(skipna=True),
         "Dias Úteis Totais": sprints_data["Dias Úteis Totais"].sum(skipna=True),
@@ -77,31 +111,16 @@ def sprint_tab(jira_url, board_id, headers):
         yaxis_title="Total de Dias",
         showlegend=False
     )
+    return fig_totais
 
-    st.plotly_chart(fig_totais, use_container_width=True)
-
-    timezone_brazil = pytz.timezone('America/Sao_Paulo')
-    now_brazil = datetime.now(timezone_brazil)
-    file_name = f"Sprints_{now_brazil.strftime('%d_%m_%y')}.xlsx"
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        sprints_data.drop(columns=["Número da Sprint"]).to_excel(writer, index=False, sheet_name="Dados Sprints")
-    output.seek(0)
-
-    st.download_button(
-        label="📥 Download Excel",
-        data=output,
-        file_name=file_name,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-
-@st.cache_data
-def get_sprints_data(jira_url, board_id, headers):
+@st.cache_data(max_entries=20)
+def get_sprints_data(jira_url, board_id, headers, publicada):
     try:
-        sprints = get_sprints(jira_url, board_id, headers)
+        sprints = carregar_sprints(jira_url, board_id, headers)
     except Exception as e:
         raise Exception(f"Erro ao buscar sprints: {str(e)}")
 
+    nova_versao_dados("sprints", jira_url, board_id)
     sprints_data = []
 
     for sprint in sprints:
@@ -149,4 +168,9 @@ def get_sprints_data(jira_url, board_id, headers):
             df[col] = df[col].apply(extrair_valor_simples)
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    return df if not df.empty else pd.DataFrame()
\ No newline at end of file
+    return df if not df.empty else pd.DataFrame()
+
+registrar_artefato(
+    "sprints", ("sprints",),
+    lambda jira_url, board_id, headers: get_sprints_data.clear(jira_url, board_id, headers, versao_publicada(jira_url))
+)
@@ -1,21 +1,48 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from config import CAMPO_SPRINT
+from utils_armazenamento import versao_publicada
+from utils_cache import cache_figura, nova_versao_dados, versao_dados
+from utils_computacao import computar
+from utils_frescor import registrar_artefato
+from utils_jql import JANELAS_ENTREGA, data_entrega, filtrar_issues, issue_entregue
+from utils_performance import contabilizar_fragmento
+from utils_tracing import rastrear, span
 from utils_dados import (
-    get_all_issues,
+    carregar_issues_entregues,
     count_bugs,
     normalizar_primeiro_nome,
     construir_mapa_dev_mais_recente,
 )
 
-def entregas_tab(jira_url, board_id, headers, all_issues_data=None):
+@st.cache_data(ttl=600, max_entries=20)
+def carregar_entregas_janela(jira_url, board_id, headers, dias, publicada):
+    desde = (pd.Timestamp.now().normalize() - pd.Timedelta(days=dias)) if dias else None
+    issues = carregar_issues_entregues(jira_url, board_id, headers, desde=desde)
+    nova_versao_dados("entregas", jira_url, board_id, dias)
+    return issues
+
+def invalidar_entregas_janela(jira_url, board_id, headers):
+    for dias in JANELAS_ENTREGA.values():
+        carregar_entregas_janela.clear(jira_url, board_id, headers, dias, versao_publicada(jira_url))
+
+registrar_artefato("entregas", ("issues",), invalidar_entregas_janela)
+
+def entregas_tab(jira_url, board_id, headers, all_issues_data=None, versao=None):
     st.header("🚀 Análise de Entregas por Desenvolvedor")
 
+    janela = st.selectbox("Janela de Entregas", options=list(JANELAS_ENTREGA), index=len(JANELAS_ENTREGA) - 1)
+    dias = JANELAS_ENTREGA[janela]
+
     try:
         if all_issues_data is not None:
-            issues = all_issues_data
+            desde = (pd.Timestamp.now().normalize() - pd.Timedelta(days=dias)) if dias else None
+            issues = filtrar_issues(all_issues_data, entregues=True, entregue_desde=desde)
+            versao = versao + (dias,) if versao is not None else None
         else:
-            issues = get_all_issues(jira_url, board_id, headers)
+            issues = carregar_entregas_janela(jira_url, board_id, headers, dias, versao_publicada(jira_url))
+            versao = versao_dados("entregas", jira_url, board_id, dias)
     except Exception as e:
         st.error(f"Erro ao buscar issues: {e}")
         return
@@ -24,12 +51,17 @@ def entregas_tab(jira_url, board_id, headers, all_issues_data=None):
         st.warning("Nenhuma issue encontrada.")
         return
 
-    dados_entregas = processar_dados_entregas(issues)
+    dados_entregas = computar("entregas", versao, processar_dados_entregas, issues)
 
     if dados_entregas.empty:
         st.warning("Nenhuma issue entregue encontrada.")
         return
 
+    mostrar_entregas_filtradas(dados_entregas, versao)
+
+@st.fragment
+@contabilizar_fragmento
+def mostrar_entregas_filtradas(dados_entregas, versao):
     st.subheader("🔧 Filtros")
     with st.container():
         col1, col2, col3 = st.columns(3)
@@ -58,18 +90,25 @@ def entregas_tab(jira_url, board_id, headers, all_issues_data=None):
                 default=tipos_disponiveis
             )
 
-    dados_filtrados = dados_entregas.copy()
-    dados_filtrados = dados_filtrados[
-        (dados_filtrados['Desenvolvedor'].isin(devs_selecionados)) &
-        (dados_filtrados['Tipo'].isin(tipos_selecionados))
-    ]
-    if sprint_selecionada != "Todas":
-        dados_filtrados = dados_filtrados[dados_filtrados['Sprint'] == sprint_selecionada]
+    with span("aggregate.entregas_filtradas"):
+        dados_filtrados = dados_entregas.copy()
+        dados_filtrados = dados_filtrados[
+            (dados_filtrados['Desenvolvedor'].isin(devs_selecionados)) &
+            (dados_filtrados['Tipo'].isin(tipos_selecionados))
+        ]
+        if sprint_selecionada != "Todas":
+            dados_filtrados = dados_filtrados[dados_filtrados['Sprint'] == sprint_selecionada]
 
     if dados_filtrados.empty:
         st.warning("Nenhum dado encontrado com os filtros aplicados.")
         return
 
+    filtros = {
+        "sprint": sprint_selecionada,
+        "devs": devs_selecionados,
+        "tipos": tipos_selecionados
+    }
+
     st.subheader("📊 Métricas Gerais")
     col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -95,12 +134,18 @@ def entregas_tab(jira_url, board_id, headers, all_issues_data=None):
         st.metric("Total de Bugs durante Desenvolvimento", total_bugs)
 
     st.subheader("👨‍💻 Total de Entregas por Desenvolvedor")
-    fig_entregas_dev = criar_grafico_entregas_por_dev(dados_filtrados)
+    fig_entregas_dev = cache_figura(
+        "entregas_por_dev", versao, filtros,
+        lambda: criar_grafico_entregas_por_dev(dados_filtrados)
+    )
     st.plotly_chart(fig_entregas_dev, width="stretch", theme="streamlit")
 
     if total_bugs > 0:
         st.subheader("Índice de Retrabalho (Bugs) por Desenvolvedor")
-        fig_bugs_dev = criar_grafico_bugs_por_dev(dados_filtrados)
+        fig_bugs_dev = cache_figura(
+            "bugs_por_dev", versao, filtros,
+            lambda: criar_grafico_bugs_por_dev(dados_filtrados)
+        )
         if fig_bugs_dev:
             st.plotly_chart(fig_bugs_dev, width="stretch", theme="streamlit")
         else:
@@ -118,20 +163,28 @@ def entregas_tab(jira_url, board_id, headers, all_issues_data=None):
     ])
 
     with tab1:
-        mostrar_grafico_tipo(dados_filtrados, "História", "User Stories")
+        mostrar_grafico_tipo(dados_filtrados, "História", "User Stories", versao, filtros)
     with tab2:
-        mostrar_grafico_tipo(dados_filtrados, "Melhoria", "Melhorias")
+        mostrar_grafico_tipo(dados_filtrados, "Melhoria", "Melhorias", versao, filtros)
     with tab3:
-        mostrar_grafico_tipo(dados_filtrados, "Tarefa", "Tasks")
+        mostrar_grafico_tipo(dados_filtrados, "Tarefa", "Tasks", versao, filtros)
     with tab4:
-        mostrar_grafico_tipo(dados_filtrados, "Problema", "Problemas")
+        mostrar_grafico_tipo(dados_filtrados, "Problema", "Problemas", versao, filtros)
     with tab5:
-        mostrar_grafico_tipo(dados_filtrados, "Correção", "Correções")
+        mostrar_grafico_tipo(dados_filtrados, "Correção", "Correções", versao, filtros)
 
     st.subheader("📅 Evolução Temporal das Entregas")
-    fig_evolucao = criar_grafico_evolucao_temporal(dados_filtrados)
+    fig_evolucao = cache_figura(
+        "evolucao_temporal", versao, filtros,
+        lambda: criar_grafico_evolucao_temporal(dados_filtrados)
+    )
     st.plotly_chart(fig_evolucao, use_container_width=True)
-    
+
+    mostrar_detalhamento(dados_filtrados)
+
+@st.fragment
+@contabilizar_fragmento
+def mostrar_detalhamento(dados_filtrados):
     st.subheader("📋 Detalhamento das Entregas")
     col1, _ = st.columns(2)
     with col1:
@@ -159,29 +212,15 @@ def entregas_tab(jira_url, board_id, headers, all_issues_data=None):
 
     st.dataframe(dados_ordenados, use_container_width=True, height=400)
 
+@rastrear("normalize.entregas")
 def processar_dados_entregas(issues):
     dados = []
 
     for issue in issues:
         fields = issue.get('fields', {})
 
-        status = (fields.get('status') or {}).get('name', '').lower()
-        status_category = (fields.get('status') or {}).get('statusCategory', {}).get('name', '').lower()
-
-        is_entregue = (
-            'done' in status_category or
-            'concluído' in status or
-            'fechado' in status or
-            'aprovado' in status or
-            'resolvido' in status
-        )
-
-        if is_entregue:
-            resolution_date = fields.get('resolutiondate')
-            if resolution_date:
-                data_entrega = pd.to_datetime(resolution_date).tz_convert(None)
-            else:
-                data_entrega = pd.to_datetime(fields.get('updated')).tz_convert(None) if fields.get('updated') else pd.NaT
+        if issue_entregue(issue):
+            data = data_entrega(issue)
 
             assignee = fields.get('assignee', {})
             dev_original = assignee.get('displayName', 'Não atribuído') if assignee else 'Não atribuído'
@@ -191,7 +230,7 @@ def processar_dados_entregas(issues):
             subtasks = fields.get('subtasks', [])
             qtd_bugs = count_bugs(subtasks)
 
-            sprint_field = fields.get('customfield_10020')
+            sprint_field = fields.get(CAMPO_SPRINT)
             sprints = []
             if isinstance(sprint_field, list):
                 sprints = [s.get('name', 'Não atribuído') for s in sprint_field if isinstance(s, dict)]
@@ -208,11 +247,11 @@ def processar_dados_entregas(issues):
                     'Desenvolvedor': dev_original,
                     'Sprint': sprint,
                     'Status': fields.get('status', {}).get('name', ''),
-                    'Data Entrega': data_entrega,
+                    'Data Entrega': data,
                     'Data Criação': pd.to_datetime(fields.get('created')).tz_convert(None) if fields.get('created') else pd.NaT,
                     'Tempo Total de Resolução (dias)': (
-                        (data_entrega - pd.to_datetime(fields.get('created')).tz_convert(None)).days
-                        if fields.get('created') and pd.notna(data_entrega)
+                        (data - pd.to_datetime(fields.get('created')).tz_convert(None)).days
+                        if fields.get('created') and pd.notna(data)
                         else None
                     ),
                     'Qtd Bugs': qtd_bugs
@@ -287,10 +326,13 @@ def criar_grafico_por_tipo(dados, titulo):
     return fig
 
 
-def mostrar_grafico_tipo(dados, tipo, titulo):
+def mostrar_grafico_tipo(dados, tipo, titulo, versao=None, filtros=None):
     dados_tipo = dados[dados['Tipo'] == tipo]
     if not dados_tipo.empty:
-        fig = criar_grafico_por_tipo(dados_tipo, titulo)
+        fig = cache_figura(
+            f"tipo_{tipo}", versao, filtros,
+            lambda: criar_grafico_por_tipo(dados_tipo, titulo)
+        )
         st.plotly_chart(fig, use_container_width=True)
 
         col1, col2 = st.columns(2)
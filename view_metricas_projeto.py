@@ -1,22 +1,37 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
+from datetime import date
+from utils_armazenamento import versao_publicada
+from utils_cache import cache_figura, nova_versao_dados, versao_dados
+from utils_cfd import cfd_incremental, eventos_incrementais
+from utils_frescor import registrar_artefato
+from utils_graficos import histograma_pre_binado, scatter_escalavel
+from utils_performance import contabilizar_fragmento
+from utils_previsao import PERCENTIS_CONCLUSAO, prever_conclusao, prever_itens_ate, throughput_diario
 from utils_dados import (
-    get_all_issues_with_transitions,
+    carregar_issues_com_transicoes,
     normalizar_primeiro_nome,
     construir_mapa_dev_mais_recente,
 )
 
-@st.cache_data(ttl=900)
-def carregar_entregas(jira_url, board_id, headers):
-    df = get_all_issues_with_transitions(jira_url, board_id, headers)
-    return df if not df.empty else pd.DataFrame()
+@st.cache_data(ttl=900, max_entries=20)
+def carregar_entregas(jira_url, board_id, headers, publicada):
+    df, transicoes = carregar_issues_com_transicoes(jira_url, board_id, headers, com_transicoes=True)
+    nova_versao_dados("entregas_projeto", jira_url, board_id)
+    return (df if not df.empty else pd.DataFrame()), transicoes
+
+registrar_artefato(
+    "entregas_projeto", ("issues",),
+    lambda jira_url, board_id, headers: carregar_entregas.clear(jira_url, board_id, headers, versao_publicada(jira_url))
+)
 
 def entregas_projeto_tab(jira_url, board_id, headers):
 
     st.title("📦 Entregas do Projeto")
 
-    df = carregar_entregas(jira_url, board_id, headers)
+    df, transicoes = carregar_entregas(jira_url, board_id, headers, versao_publicada(jira_url))
     if df.empty:
         st.warning("Nenhum dado disponível.")
         return
@@ -30,6 +45,7 @@ def entregas_projeto_tab(jira_url, board_id, headers):
     df["Data Atualização"] = pd.to_datetime(df["Data Atualização"], errors="coerce")
     df["Data Entrega"] = pd.to_datetime(df["Data Entrega"], errors="coerce")
 
+    df_fluxo = df.dropna(subset=["Data Criação"]).drop_duplicates("Issue Key")
     df = df.dropna(subset=["Data Criação", "Data Entrega"])
 
     df["Entrega Dia"] = df["Data Entrega"].dt.date
@@ -39,7 +55,6 @@ def entregas_projeto_tab(jira_url, board_id, headers):
 
     df["Sprint_Num"] = df["Sprint"].astype(str).str.extract(r"(\d+)").astype(float)
     df_sprints_validas = df[df["Sprint"].str.contains("Sprint", case=False, na=False)]
-    df_sprints_finalizadas = df["Status"].str.lower().isin(["done", "concluído", "concluido"])
 
     throughput_sprint = (
         df_sprints_validas
@@ -77,7 +92,7 @@ def entregas_projeto_tab(jira_url, board_id, headers):
     st.subheader("📦 Throughput por Sprint (somente sprints finalizadas)")
 
     fig_sprint = px.bar(
-        df_sprints_finalizadas,
+        df_through,
         x="Sprint",
         y="Entregas",
         text="Entregas",
@@ -90,7 +105,8 @@ def entregas_projeto_tab(jira_url, board_id, headers):
 
     st.plotly_chart(fig_sprint, use_container_width=True)
 
-    st.plotly_chart(fig_sprint, use_container_width=True)
+    versao = versao_dados("entregas_projeto", jira_url, board_id)
+    mostrar_previsao(df, versao)
 
     st.header("📊 Médias do Projeto")
 
@@ -103,71 +119,61 @@ def entregas_projeto_tab(jira_url, board_id, headers):
     st.bar_chart(media_tipo)
     st.header("⏱ Lead Time")
 
-    fig_lead = px.histogram(
-        df,
-        x="Lead Time (dias)",
+    fig_lead = histograma_pre_binado(
+        df["Lead Time (dias)"],
         nbins=20,
-        title="Distribuição do Lead Time"
+        titulo="Distribuição do Lead Time",
+        rotulo_x="Lead Time (dias)"
     )
     st.plotly_chart(fig_lead, use_container_width=True)
 
-    df_scatter_lead = df.copy()
-    df_scatter_lead["Data_str"] = df_scatter_lead["Data Entrega"].dt.strftime("%Y-%m-%d")
-
-    fig_lead_scatter = px.scatter(
-        df_scatter_lead,
-        x="Data_str",
+    fig_lead_scatter = scatter_escalavel(
+        df,
+        x="Data Entrega",
         y="Lead Time (dias)",
-        color="Dev Responsável",
-        title="Lead Time por Entrega"
+        cor="Dev Responsável",
+        titulo="Lead Time por Entrega"
     )
     st.plotly_chart(fig_lead_scatter, use_container_width=True)
 
     
     st.header("🔄 Cycle Time")
 
-    fig_cycle = px.histogram(
-        df,
-        x="Cycle Time (dias)",
+    fig_cycle = histograma_pre_binado(
+        df["Cycle Time (dias)"],
         nbins=20,
-        title="Distribuição do Cycle Time"
+        titulo="Distribuição do Cycle Time",
+        rotulo_x="Cycle Time (dias)"
     )
     st.plotly_chart(fig_cycle, use_container_width=True)
 
-    df_scatter_cycle = df.copy()
-    df_scatter_cycle["Data_str"] = df_scatter_cycle["Data Entrega"].dt.strftime("%Y-%m-%d")
-
-    fig_cycle_scatter = px.scatter(
-        df_scatter_cycle,
-        x="Data_str",
+    fig_cycle_scatter = scatter_escalavel(
+        df,
+        x="Data Entrega",
         y="Cycle Time (dias)",
-        color="Dev Responsável",
-        title="Cycle Time por Entrega"
+        cor="Dev Responsável",
+        titulo="Cycle Time por Entrega"
     )
     st.plotly_chart(fig_cycle_scatter, use_container_width=True)
 
     
     st.header("📊 CFD - Cumulative Flow Diagram")
 
-    cols_status = [
-        c for c in df.columns
-        if c not in [
-            "Sprint", "Issue Key", "Título", "Dev Responsável",
-            "Estimativa em Horas", "Tempo Registrado",
-            "Tipo da Issue", "Prioridade", "Épico",
-            "Qtd Bugs", "Data Entrega",
-            "Data Criação", "Data Atualização"
-        ]
-    ]
-
-    if cols_status:
-        df_cfd = df[["Data Atualização"] + cols_status].copy()
-        df_cfd["Dia"] = df_cfd["Data Atualização"].dt.date
-        dados_cfd = df_cfd.groupby("Dia")[cols_status].sum()
-
-        fig_cfd = px.area(
-            dados_cfd,
-            title="CFD - Fluxo Acumulado"
+    eventos = eventos_incrementais(
+        (jira_url, board_id), versao, transicoes,
+        dict(zip(df_fluxo["Issue Key"], df_fluxo["Data Criação"])),
+        dict(zip(df_fluxo["Issue Key"], df_fluxo["Status Atual"]))
+    )
+    dados_cfd = cfd_incremental((jira_url, board_id), eventos)
+
+    if not dados_cfd.empty:
+        fig_cfd = cache_figura(
+            "cfd", versao, {"ate": date.today()},
+            lambda: px.area(
+                dados_cfd,
+                title="CFD - Fluxo Acumulado",
+                labels={"index": "Dia", "value": "Issues", "status": "Status"}
+            )
         )
         st.plotly_chart(fig_cfd, use_container_width=True)
     else:
@@ -203,3 +209,59 @@ def entregas_projeto_tab(jira_url, board_id, headers):
         use_container_width=True,
         height=450
     )
+
+
+@st.fragment
+@contabilizar_fragmento
+def mostrar_previsao(df, versao):
+    st.header("🔮 Previsão de Entregas (Monte Carlo)")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        itens = st.number_input("Itens restantes", min_value=1, value=20, step=1)
+    with col2:
+        data_alvo = st.date_input("Data alvo", value=pd.Timestamp.now().normalize() + pd.Timedelta(days=30))
+    with col3:
+        dias_historico = st.selectbox("Histórico considerado (dias)", [30, 60, 90, 180, 365], index=2)
+    with col4:
+        tentativas = st.select_slider("Simulações", options=[10_000, 25_000, 50_000, 100_000], value=10_000)
+
+    throughput = throughput_diario(df["Data Entrega"], dias_historico)
+    if throughput.sum() == 0:
+        st.info("Não há entregas no histórico considerado para simular.")
+        return
+
+    hoje = pd.Timestamp.now().normalize()
+    dias_ate_alvo = (pd.Timestamp(data_alvo) - hoje).days
+    filtros = {"itens": itens, "dias": dias_ate_alvo, "historico": dias_historico, "tentativas": tentativas, "hoje": hoje}
+    conclusao = cache_figura(
+        "previsao_conclusao", versao, filtros,
+        lambda: prever_conclusao(throughput, itens, tentativas, semente=0)
+    )
+    ate_alvo = cache_figura(
+        "previsao_itens_ate", versao, filtros,
+        lambda: prever_itens_ate(throughput, dias_ate_alvo, tentativas, semente=0)
+    )
+
+    st.subheader(f"Quando {itens} itens estarão concluídos?")
+    colunas = st.columns(len(PERCENTIS_CONCLUSAO))
+    for coluna, percentil in zip(colunas, PERCENTIS_CONCLUSAO):
+        dias = conclusao["percentis"][percentil]
+        valor = (hoje + pd.Timedelta(days=int(dias))).strftime("%d/%m/%Y") if np.isfinite(dias) else f"Além de {conclusao['horizonte']} dias"
+        coluna.metric(f"{percentil}% de confiança", valor)
+
+    fig_probabilidade = px.line(
+        x=hoje + pd.to_timedelta(conclusao["dias"], unit="D"),
+        y=conclusao["probabilidade"] * 100,
+        title=f"Probabilidade de concluir {itens} itens até a data",
+        labels={"x": "Data", "y": "Probabilidade (%)"}
+    )
+    st.plotly_chart(fig_probabilidade, use_container_width=True)
+
+    if ate_alvo:
+        st.subheader(f"Quantos itens até {pd.Timestamp(data_alvo).strftime('%d/%m/%Y')}?")
+        colunas = st.columns(len(PERCENTIS_CONCLUSAO))
+        for coluna, percentil in zip(colunas, PERCENTIS_CONCLUSAO):
+            coluna.metric(f"{percentil}% de confiança", f"{ate_alvo['percentis'][percentil]} itens ou mais")
+
+    st.caption(f"{conclusao['tentativas']:,} simulações a partir do throughput diário dos últimos {dias_historico} dias.".replace(",", "."))
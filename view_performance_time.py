@@ -2,20 +2,31 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
+from utils_armazenamento import versao_publicada
+from utils_cache import cache_figura, nova_versao_dados, versao_dados
+from utils_frescor import registrar_artefato
+from utils_tracing import span
 from utils_dados import (
-    get_all_issues_with_transitions,
+    carregar_issues_com_transicoes,
     normalizar_primeiro_nome,
     construir_mapa_dev_mais_recente,
 )
 
-@st.cache_data
-def carregar_dados(jira_url, board_id, headers):
-    return get_all_issues_with_transitions(jira_url, board_id, headers, filtro_nome="Sprint")
+@st.cache_data(max_entries=20)
+def carregar_dados(jira_url, board_id, headers, publicada):
+    df = carregar_issues_com_transicoes(jira_url, board_id, headers, filtro_nome="Sprint")
+    nova_versao_dados("transicoes", jira_url, board_id)
+    return df
+
+registrar_artefato(
+    "transicoes", ("issues", "sprints"),
+    lambda jira_url, board_id, headers: carregar_dados.clear(jira_url, board_id, headers, versao_publicada(jira_url))
+)
 
 def desempenho_tab(jira_url, board_id, headers):
     st.header("📊 Desempenho por Sprint")
 
-    df_all = carregar_dados(jira_url, board_id, headers)
+    df_all = carregar_dados(jira_url, board_id, headers, versao_publicada(jira_url))
     if df_all.empty:
         st.warning("Nenhum dado encontrado.")
         return
@@ -57,28 +68,29 @@ def desempenho_tab(jira_url, board_id, headers):
     if col_dev_efetivo not in df_sprint.columns:
         df_sprint[col_dev_efetivo] = 0.0
 
-    df_dev = df_sprint.groupby("Dev Responsável").agg({
-        "Estimativa em Horas": "sum",
-        "Tempo Registrado (Worklog em Horas)": "sum",
-        col_dev_efetivo: "sum",
-        "Issue Key": "count"
-    }).reset_index()
-
-    df_dev.rename(columns={
-        "Tempo Registrado (Worklog em Horas)": "Tempo Registrado",
-        col_dev_efetivo: "Desenvolvimento Efetivo",
-        "Issue Key": "Qtd Issues"
-    }, inplace=True)
-
-    df_dev["Acurácia (%)"] = (
-        df_dev["Tempo Registrado"] /
-        df_dev["Estimativa em Horas"].replace(0, 1)
-    ) * 100
+    with span("aggregate.desempenho_dev"):
+        df_dev = df_sprint.groupby("Dev Responsável").agg({
+            "Estimativa em Horas": "sum",
+            "Tempo Registrado (Worklog em Horas)": "sum",
+            col_dev_efetivo: "sum",
+            "Issue Key": "count"
+        }).reset_index()
+
+        df_dev.rename(columns={
+            "Tempo Registrado (Worklog em Horas)": "Tempo Registrado",
+            col_dev_efetivo: "Desenvolvimento Efetivo",
+            "Issue Key": "Qtd Issues"
+        }, inplace=True)
+
+        df_dev["Acurácia (%)"] = (
+            df_dev["Tempo Registrado"] /
+            df_dev["Estimativa em Horas"].replace(0, 1)
+        ) * 100
     
-    df_dev["Tempo Médio por Issue"] = (
-        df_dev["Tempo Registrado"] /
-        df_dev["Qtd Issues"].replace(0, 1)
-    )
+        df_dev["Tempo Médio por Issue"] = (
+            df_dev["Tempo Registrado"] /
+            df_dev["Qtd Issues"].replace(0, 1)
+        )
 
     df_dev_display = df_dev.copy()
     cols_to_format = [
@@ -95,8 +107,24 @@ def desempenho_tab(jira_url, board_id, headers):
     st.subheader("📋 Resumo por Desenvolvedor")
     st.dataframe(df_dev_display, use_container_width=True)
 
+    versao = versao_dados("transicoes", jira_url, board_id)
+    filtros = {"sprint": sprint_sel, "devs": devs_sel}
+
     st.subheader("⏱ Horas Estimadas, Registradas e Desenvolvimento Efetivo")
+    spec_lado_a_lado = cache_figura(
+        "horas_por_dev", versao, filtros,
+        lambda: criar_grafico_horas(df_dev).to_dict()
+    )
+    st.vega_lite_chart(spec_lado_a_lado, use_container_width=True)
 
+    st.subheader("Tempo Médio por Issue (h)")
+    spec_tempo_medio = cache_figura(
+        "tempo_medio_issue", versao, filtros,
+        lambda: criar_grafico_tempo_medio(df_dev).to_dict()
+    )
+    st.vega_lite_chart(spec_tempo_medio, use_container_width=True)
+
+def criar_grafico_horas(df_dev):
     horas_long = df_dev.melt(
         id_vars=["Dev Responsável"],
         value_vars=[
@@ -132,10 +160,9 @@ def desempenho_tab(jira_url, board_id, headers):
         tooltip=['Dev Responsável', 'Tipo de Hora', 'Horas']
     ).properties(width=600, height=400)
 
-    st.altair_chart(chart_lado_a_lado, use_container_width=True)
+    return chart_lado_a_lado
 
-    st.subheader("Tempo Médio por Issue (h)")
-    
+def criar_grafico_tempo_medio(df_dev):
     chart_tempo_medio = alt.Chart(df_dev).mark_bar().encode(
         x=alt.X(
             'Dev Responsável:N', 
@@ -147,4 +174,4 @@ def desempenho_tab(jira_url, board_id, headers):
         color=alt.value("blue")
     ).properties(height=400)
 
-    st.altair_chart(chart_tempo_medio, use_container_width=True)
+    return chart_tempo_medio
@@ -1,22 +1,22 @@
 import streamlit as st
 import pandas as pd
-import io
 import pytz
 from datetime import datetime
+from utils_computacao import computar, gerar_excel, normalizar_json
 from utils_dados import (
-    get_all_issues,
+    carregar_issues,
     normalizar_primeiro_nome,
     construir_mapa_dev_mais_recente,
 )
 
-def all_issues_tab(jira_url, board_id, headers, all_issues_data=None):
+def all_issues_tab(jira_url, board_id, headers, all_issues_data=None, versao=None):
     st.title("📋 Todas as Issues do Projeto")
 
     try:
         if all_issues_data is not None:
             issues = all_issues_data
         else:
-            issues = get_all_issues(jira_url, board_id, headers)
+            issues = carregar_issues(jira_url, board_id, headers)
     except Exception as e:
         st.error(f"Erro ao buscar issues: {e}")
         return
@@ -94,7 +94,7 @@ def all_issues_tab(jira_url, board_id, headers, all_issues_data=None):
     st.metric("Issues Filtradas", len(df_filtrado))
 
     try:
-        df2 = pd.json_normalize(issues)
+        df2 = computar("json_normalize", versao, normalizar_json, issues)
         with st.expander("📊 Dados Brutos da API"):
             st.dataframe(df2, use_container_width=True)
     except Exception as e:
@@ -104,10 +104,7 @@ def all_issues_tab(jira_url, board_id, headers, all_issues_data=None):
     now_brazil = datetime.now(timezone_brazil)
     file_name = f"Issues_{now_brazil.strftime('%d_%m_%y')}.xlsx"
 
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df_display.to_excel(writer, index=False, sheet_name="Issues")
-    output.seek(0)
+    output = computar("excel_issues", versao, gerar_excel, df_display, "Issues")
 
     st.download_button(
         label="📥 Download Excel",
@@ -1,18 +1,16 @@
 import os
-from dotenv import load_dotenv
 import plotly.express as px
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 from utils_dados import (
-    get_all_issues,
+    carregar_issues,
     get_prioridade,
     count_bugs,
     normalizar_primeiro_nome,
     construir_mapa_dev_mais_recente,
 )
 
-load_dotenv()
 excluidos = os.getenv("excluidos", "").split(",") if os.getenv("excluidos") else []
 
 def dados_gerais(jira_url, board_id, headers, all_issues_data=None):
@@ -21,7 +19,7 @@ def dados_gerais(jira_url, board_id, headers, all_issues_data=None):
     if all_issues_data is not None:
         issues = all_issues_data
     else:
-        issues = get_all_issues(jira_url, board_id, headers)
+        issues = carregar_issues(jira_url, board_id, headers)
 
     if not issues:
         st.warning("Nenhuma atividade encontrada.")
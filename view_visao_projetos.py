@@ -0,0 +1,87 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from config import PROJETOS
+from utils_cache import cache_figura
+from utils_computacao import computar
+from utils_carregamento import dados_carregados, iniciar_prefetch, status_carregamento
+from view_entregas_dev import processar_dados_entregas
+
+MESES_THROUGHPUT = 6
+
+def resumir_projeto(nome_projeto, dados):
+    entregas = computar("entregas", dados["versao"], processar_dados_entregas, dados["issues"])
+    if entregas.empty:
+        return None, pd.DataFrame()
+
+    entregas = entregas.drop_duplicates(subset="Chave")
+    entregas["Mês"] = entregas["Data Entrega"].dt.to_period("M").dt.to_timestamp()
+    throughput = entregas.groupby("Mês").size().rename("Entregas").reset_index()
+    throughput["Projeto"] = nome_projeto
+
+    lead_time = entregas["Tempo Total de Resolução (dias)"].dropna()
+    resumo = {
+        "Projeto": nome_projeto,
+        "Issues": len(dados["issues"]),
+        "Entregas": len(entregas),
+        f"Throughput Médio ({MESES_THROUGHPUT} meses)": round(throughput.tail(MESES_THROUGHPUT)["Entregas"].mean(), 1),
+        "Lead Time p50 (dias)": lead_time.quantile(0.5) if not lead_time.empty else None,
+        "Lead Time p85 (dias)": lead_time.quantile(0.85) if not lead_time.empty else None,
+    }
+    return resumo, throughput
+
+def visao_projetos_tab():
+    st.header("🌐 Visão entre Projetos")
+
+    iniciar_prefetch(list(PROJETOS))
+    carregados = dados_carregados()
+    status = status_carregamento()
+    pendentes = [nome for nome in PROJETOS if status.get(nome) != "pronto"]
+    if pendentes:
+        st.info("Ainda carregando ou com erro: " + ", ".join(f"{nome} ({status.get(nome, 'pendente')})" for nome in pendentes))
+
+    if not carregados:
+        st.warning("Nenhum projeto carregado até o momento.")
+        return
+
+    resumos = []
+    throughputs = []
+    for nome_projeto, dados in carregados.items():
+        resumo, throughput = cache_figura(
+            "resumo_projeto", dados["versao"], {"projeto": nome_projeto},
+            lambda: resumir_projeto(nome_projeto, dados)
+        )
+        if resumo:
+            resumos.append(resumo)
+            throughputs.append(throughput)
+
+    if not resumos:
+        st.warning("Nenhuma entrega encontrada nos projetos carregados.")
+        return
+
+    df_resumo = pd.DataFrame(resumos).sort_values("Entregas", ascending=False)
+    df_throughput = pd.concat(throughputs, ignore_index=True)
+    versao = tuple(sorted((nome, dados["versao"]) for nome, dados in carregados.items()))
+
+    st.subheader("📋 Resumo por Projeto")
+    st.dataframe(df_resumo, use_container_width=True, hide_index=True)
+
+    st.subheader("📅 Throughput Mensal por Projeto")
+    fig_throughput = cache_figura(
+        "throughput_projetos", versao, {},
+        lambda: px.line(df_throughput, x="Mês", y="Entregas", color="Projeto", markers=True)
+    )
+    st.plotly_chart(fig_throughput, use_container_width=True)
+
+    st.subheader("⏱ Lead Time por Projeto")
+    fig_lead = cache_figura(
+        "lead_time_projetos", versao, {},
+        lambda: px.bar(
+            df_resumo,
+            x="Projeto",
+            y=["Lead Time p50 (dias)", "Lead Time p85 (dias)"],
+            barmode="group",
+            labels={"value": "Dias", "variable": "Percentil"}
+        )
+    )
+    st.plotly_chart(fig_lead, use_container_width=True)
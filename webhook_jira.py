@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import hmac
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from config import WEBHOOK_ATRASO_MAXIMO_PUBLICACAO, WEBHOOK_PORTA, WEBHOOK_SEGREDO, WEBHOOK_SILENCIO_PUBLICACAO
+from service_jira import extrair_transicoes_status
+from utils_armazenamento import (
+    anexar_transicoes,
+    atualizar_sprint_board,
+    publicar_versao,
+    remover_issues,
+    upsert_issues,
+)
+from utils_json import carregar_json
+from utils_tracing import span
+
+INTERVALO_PUBLICACAO = 5
+ALGORITMO_ASSINATURA = "sha256"
+TAMANHO_MAXIMO_CORPO = 10 * 1024 * 1024
+EVENTOS_ISSUE = {"jira:issue_created", "jira:issue_updated"}
+EVENTOS_SPRINT = {"sprint_created", "sprint_updated", "sprint_started", "sprint_closed"}
+
+_lock = threading.Lock()
+_pendentes = {}
+
+
+def log(mensagem):
+    print(f"[{time.strftime('%H:%M:%S')}] {mensagem}", flush=True)
+
+
+def assinatura_valida(corpo, assinatura, segredo=WEBHOOK_SEGREDO):
+    if not segredo:
+        return True
+    if not assinatura or "=" not in assinatura:
+        return False
+    algoritmo, valor = assinatura.split("=", 1)
+    if algoritmo != ALGORITMO_ASSINATURA:
+        return False
+    esperado = hmac.new(segredo.encode(), corpo, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(esperado, valor)
+
+
+def url_base(recurso):
+    url = urlparse((recurso or {}).get("self", ""))
+    return f"{url.scheme}://{url.netloc}" if url.netloc else None
+
+
+def aplicar_evento_issue(evento):
+    issue = evento["issue"]
+    jira_url = url_base(issue)
+    upsert_issues(jira_url, [issue])
+
+    historico = {"created": evento.get("timestamp", int(time.time() * 1000)), "items": (evento.get("changelog") or {}).get("items", [])}
+    transicoes = extrair_transicoes_status([historico])
+    if transicoes:
+        anexar_transicoes(jira_url, {issue["key"]: transicoes}, {issue["key"]: str(issue["id"])})
+    return jira_url
+
+
+def aplicar_evento_remocao(evento):
+    issue = evento["issue"]
+    jira_url = url_base(issue)
+    remover_issues(jira_url, [issue["id"]])
+    return jira_url
+
+
+def aplicar_evento_sprint(evento, removida=False):
+    sprint = evento["sprint"]
+    jira_url = url_base(sprint)
+    if not atualizar_sprint_board(jira_url, sprint.get("originBoardId"), sprint, removida=removida):
+        return None
+    return jira_url
+
+
+def aplicar_evento(evento):
+    tipo = evento.get("webhookEvent")
+    with span("webhook.evento", tipo=tipo), _lock:
+        if tipo in EVENTOS_ISSUE:
+            jira_url = aplicar_evento_issue(evento)
+        elif tipo == "jira:issue_deleted":
+            jira_url = aplicar_evento_remocao(evento)
+        elif tipo in EVENTOS_SPRINT:
+            jira_url = aplicar_evento_sprint(evento)
+        elif tipo == "sprint_deleted":
+            jira_url = aplicar_evento_sprint(evento, removida=True)
+        else:
+            return None
+
+        if jira_url:
+            agora = time.time()
+            _pendentes.setdefault(jira_url, {"primeiro": agora})["ultimo"] = agora
+        return jira_url
+
+
+def publicacao_devida(pendente, agora):
+    return (
+        agora - pendente["ultimo"] >= WEBHOOK_SILENCIO_PUBLICACAO
+        or agora - pendente["primeiro"] >= WEBHOOK_ATRASO_MAXIMO_PUBLICACAO
+    )
+
+
+def publicar_pendentes(forcar=False):
+    agora = time.time()
+    with _lock:
+        for jira_url, pendente in list(_pendentes.items()):
+            if forcar or publicacao_devida(pendente, agora):
+                log(f"Versão publicada para {jira_url}: {publicar_versao(jira_url)}")
+                del _pendentes[jira_url]
+
+
+def _publicar_periodicamente():
+    while True:
+        time.sleep(INTERVALO_PUBLICACAO)
+        try:
+            publicar_pendentes()
+        except Exception as e:
+            log(f"Erro ao publicar versão: {e}")
+
+
+class ReceptorWebhook(BaseHTTPRequestHandler):
+    def _responder(self, status):
+        self.send_response(status)
+        self.end_headers()
+
+    def do_POST(self):
+        try:
+            tamanho = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            return self._responder(400)
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            self.close_connection = True
+            return self._responder(413)
+
+        corpo = self.rfile.read(tamanho)
+        if not assinatura_valida(corpo, self.headers.get("X-Hub-Signature")):
+            return self._responder(401)
+
+        try:
+            evento = carregar_json(corpo)
+            jira_url = aplicar_evento(evento)
+        except Exception as e:
+            log(f"Erro ao aplicar evento: {e}")
+            return self._responder(400)
+
+        log(f"{evento.get('webhookEvent')} {'aplicado' if jira_url else 'ignorado'}")
+        self._responder(204)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recebe webhooks do Jira e aplica as alterações no armazenamento local")
+    parser.add_argument("--porta", type=int, default=WEBHOOK_PORTA)
+    parser.add_argument("--aplicar", nargs="+", metavar="ARQUIVO", help="Aplica eventos gravados em arquivos JSON e sai")
+    args = parser.parse_args()
+
+    if args.aplicar:
+        for caminho in args.aplicar:
+            with open(caminho, "rb") as arquivo:
+                evento = carregar_json(arquivo.read())
+            log(f"{caminho}: {evento.get('webhookEvent')} {'aplicado' if aplicar_evento(evento) else 'ignorado'}")
+        publicar_pendentes(forcar=True)
+        return
+
+    threading.Thread(target=_publicar_periodicamente, daemon=True).start()
+    endereco = "" if WEBHOOK_SEGREDO else "127.0.0.1"
+    if not WEBHOOK_SEGREDO:
+        log("webhook_segredo não definido: aceitando apenas conexões locais (127.0.0.1)")
+    servidor = ThreadingHTTPServer((endereco, args.porta), ReceptorWebhook)
+    log(f"Recebendo webhooks na porta {args.porta}")
+    servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    main()